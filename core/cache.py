@@ -0,0 +1,191 @@
+"""저장소 read-through 캐시: 인프로세스 LRU/TTL + (옵션) Redis 무효화 채널, 불변 키용 LRU + 디스크 캐시."""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable
+
+
+class TTLCache:
+    """스레드 안전한 LRU + TTL 캐시. hit/miss 카운터를 함께 기록한다."""
+
+    def __init__(self, maxsize: int = 1024, ttl_seconds: float = 5.0):
+        self.maxsize = max(1, int(maxsize))
+        self.ttl_seconds = float(ttl_seconds)
+        self._data: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, key: str) -> Any | None:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] < now:
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: str, value: Any) -> None:
+        expires_at = time.monotonic() + self.ttl_seconds
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+            self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "enabled": True,
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+            }
+
+
+class ContentAddressedCache:
+    """키가 내용을 고정하는(커밋 SHA 포함) 문자열 값 캐시: 인프로세스 LRU + (옵션) 디스크 계층.
+
+    값이 바뀌지 않으므로 TTL/무효화 없이 LRU로만 밀어낸다. 디스크 계층은 프로세스 재시작과
+    prefork 자식 사이에서 재사용된다.
+    """
+
+    def __init__(self, maxsize: int = 512, disk_dir: str | None = None):
+        self.maxsize = max(1, int(maxsize))
+        self.disk_dir = disk_dir
+        self._data: OrderedDict[str, str] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _digest(key: tuple[str, ...]) -> str:
+        return hashlib.sha256("\0".join(key).encode("utf-8")).hexdigest()
+
+    def _disk_path(self, digest: str) -> str:
+        return os.path.join(self.disk_dir, digest[:2], digest)
+
+    def get(self, key: tuple[str, ...]) -> str | None:
+        digest = self._digest(key)
+        with self._lock:
+            value = self._data.get(digest)
+            if value is not None:
+                self._data.move_to_end(digest)
+                self.hits += 1
+                return value
+        if self.disk_dir:
+            try:
+                with open(self._disk_path(digest), encoding="utf-8") as f:
+                    value = f.read()
+            except OSError:
+                value = None
+            if value is not None:
+                self._remember(digest, value)
+                with self._lock:
+                    self.disk_hits += 1
+                return value
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, key: tuple[str, ...], value: str) -> None:
+        digest = self._digest(key)
+        self._remember(digest, value)
+        if not self.disk_dir:
+            return
+        path = self._disk_path(digest)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # 동시에 쓰는 다른 프로세스가 반쯤 쓴 파일을 읽지 않도록 임시 파일 후 rename
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path))
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(value)
+            os.replace(tmp, path)
+        except OSError:
+            # 디스크 계층은 선택이므로 실패해도 메모리 캐시만으로 동작한다.
+            pass
+
+    def _remember(self, digest: str, value: str) -> None:
+        with self._lock:
+            self._data[digest] = value
+            self._data.move_to_end(digest)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.disk_hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "disk_dir": self.disk_dir,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_ratio": round((self.hits + self.disk_hits) / total, 4) if total else 0.0,
+            }
+
+
+class RedisInvalidationBus:
+    """여러 pod의 캐시를 맞추기 위한 Redis pub/sub 무효화 채널."""
+
+    def __init__(
+        self,
+        redis_url: str,
+        on_invalidate: Callable[[str], None],
+        channel: str = "agent:repo_cache_invalidate",
+    ):
+        try:
+            import redis
+        except Exception as e:
+            raise RuntimeError(
+                "Redis 캐시 무효화 채널을 사용하려면 redis 패키지가 필요합니다."
+            ) from e
+        self.channel = channel
+        self.client = redis.Redis.from_url(redis_url, decode_responses=True)
+        self._on_invalidate = on_invalidate
+        self._pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        self._pubsub.subscribe(**{channel: self._handle})
+        self._thread = self._pubsub.run_in_thread(sleep_time=1.0, daemon=True)
+
+    def _handle(self, message: dict) -> None:
+        data = message.get("data")
+        if isinstance(data, str) and data:
+            self._on_invalidate(data)
+
+    def publish(self, key: str) -> None:
+        try:
+            self.client.publish(self.channel, key)
+        except Exception:
+            # 무효화 전파 실패는 TTL 만료로 수렴하므로 쓰기 경로를 막지 않는다.
+            pass
+
+    def close(self) -> None:
+        self._thread.stop()
+        self._pubsub.close()
@@ -0,0 +1,95 @@
+"""crew/워크플로를 자식 프로세스에서 실행하고, 기한을 넘기면 프로세스를 죽여 실제로 취소한다.
+
+스레드 타임아웃은 호출자만 풀어 줄 뿐 폭주한 crew는 백그라운드에서 LLM 호출을 계속한다.
+여기서는 결과/진행 이벤트를 pipe로 받고, 기한이 지나면 SIGKILL로 자식을 정리한다.
+"""
+
+from __future__ import annotations
+
+import multiprocessing as mp
+import threading
+import time
+from typing import Any, Callable
+
+
+class IsolatedTimeoutError(TimeoutError):
+    """자식 프로세스가 기한 안에 결과를 보내지 못해 강제 종료됨."""
+
+
+class IsolatedExecutionError(RuntimeError):
+    """자식 프로세스에서 예외가 났거나 결과 없이 종료됨."""
+
+
+def _start_method() -> str:
+    # 스레드가 도는 부모(대시보드 서버, 감시 스레드)를 그대로 fork하지 않는다.
+    return "forkserver" if "forkserver" in mp.get_all_start_methods() else "spawn"
+
+
+def _child_entry(conn, target: Callable[..., Any], args: tuple, forward_events: bool) -> None:
+    send_lock = threading.Lock()
+
+    def send(message: tuple) -> None:
+        # crew 콜백은 다른 스레드에서 불릴 수 있어 pipe 쓰기를 직렬화한다.
+        with send_lock:
+            conn.send(message)
+
+    try:
+        kwargs = {"on_event": lambda event: send(("event", event))} if forward_events else {}
+        result = target(*args, **kwargs)
+        send(("ok", result))
+    except BaseException as e:
+        try:
+            send(("error", f"{type(e).__name__}: {e}"))
+        except Exception:
+            pass
+    finally:
+        conn.close()
+
+
+def run_isolated(
+    target: Callable[..., Any],
+    args: tuple = (),
+    *,
+    timeout_seconds: float,
+    on_event: Callable[[Any], None] | None = None,
+    name: str | None = None,
+) -> Any:
+    """target(*args)를 자식 프로세스에서 실행하고 반환값을 돌려준다.
+
+    target과 인자, 반환값은 pickle 가능해야 한다 (모듈 최상위 함수).
+    on_event를 주면 target은 on_event= 키워드로 이벤트 송신 함수를 받고, 보낸 값은 부모의 on_event로 전달된다.
+    timeout_seconds 안에 결과가 오지 않으면 자식을 SIGKILL하고 IsolatedTimeoutError를 던진다.
+    """
+    label = name or getattr(target, "__name__", "isolated task")
+    ctx = mp.get_context(_start_method())
+    parent_conn, child_conn = ctx.Pipe(duplex=False)
+    proc = ctx.Process(target=_child_entry, args=(child_conn, target, tuple(args), on_event is not None), name=label)
+    proc.start()
+    child_conn.close()
+    deadline = time.monotonic() + max(0.0, timeout_seconds)
+    finished = False
+    try:
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not parent_conn.poll(remaining):
+                raise IsolatedTimeoutError(f"{label} timed out after {timeout_seconds:g}s")
+            try:
+                kind, value = parent_conn.recv()
+            except EOFError:
+                proc.join()
+                raise IsolatedExecutionError(f"{label} exited without result (exitcode={proc.exitcode})") from None
+            if kind == "event":
+                if on_event is not None:
+                    on_event(value)
+                continue
+            finished = True
+            if kind == "ok":
+                return value
+            raise IsolatedExecutionError(value)
+    finally:
+        # 결과를 보낸 자식은 스스로 끝나도록 잠시 기다리고, 기한 초과/오류면 바로 죽인다.
+        proc.join(5 if finished else 0)
+        if proc.is_alive():
+            proc.kill()
+            proc.join()
+        parent_conn.close()
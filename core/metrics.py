@@ -0,0 +1,121 @@
+"""큐/워커 지표: 누적 버킷 히스토그램과 Prometheus text exposition 렌더링."""
+
+from __future__ import annotations
+
+import bisect
+import threading
+from typing import Any
+
+# LLM/GitHub 호출 위주라 수십 ms부터 수십 분까지 넓게 잡는다 (단위: 초).
+DEFAULT_LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1800.0)
+
+
+class Histogram:
+    """스레드 안전한 고정 버킷 히스토그램."""
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(float(b) for b in buckets))
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        value = max(0.0, float(value))
+        idx = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[idx] += 1
+            self._sum += value
+
+    def snapshot(self) -> dict[str, Any]:
+        """Prometheus와 같은 누적(le) 버킷 카운트."""
+        with self._lock:
+            counts = list(self._counts)
+            total = self._sum
+        cumulative: dict[str, int] = {}
+        running = 0
+        for bound, count in zip(self.buckets, counts):
+            running += count
+            cumulative[repr(bound)] = running
+        running += counts[-1]
+        cumulative["+Inf"] = running
+        return {"count": running, "sum": total, "buckets": cumulative}
+
+
+def _escape_label(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape_label(v)}"' for k, v in labels.items()) + "}"
+
+
+def render_prometheus(
+    values: dict[str, float | int | bool | None],
+    histograms: dict[str, dict[str, Any]] | None = None,
+    labels: dict[str, str] | None = None,
+) -> str:
+    """gauge/counter 값과 히스토그램 스냅샷을 Prometheus text format(0.0.4)으로 만든다.
+
+    이름이 `_total`로 끝나면 counter, 나머지는 gauge. 값이 None이면(백엔드가 모르는 지표) 생략한다.
+    """
+    labels = labels or {}
+    lines: list[str] = []
+    for name, value in values.items():
+        if value is None:
+            continue
+        kind = "counter" if name.endswith("_total") else "gauge"
+        lines.append(f"# TYPE {name} {kind}")
+        lines.append(f"{name}{_format_labels(labels)} {float(value)}")
+    for name, snap in (histograms or {}).items():
+        lines.append(f"# TYPE {name} histogram")
+        for bound, count in snap["buckets"].items():
+            lines.append(f"{name}_bucket{_format_labels({**labels, 'le': bound})} {count}")
+        lines.append(f"{name}_sum{_format_labels(labels)} {float(snap['sum'])}")
+        lines.append(f"{name}_count{_format_labels(labels)} {snap['count']}")
+    return "\n".join(lines) + "\n"
+
+
+def collect_queue_stats(task_queue: Any) -> dict[str, Any]:
+    """큐 stats()를 읽는다. 백엔드 장애 시에도 지표 엔드포인트가 죽지 않도록 error 필드로 돌려준다."""
+    try:
+        return task_queue.stats()
+    except Exception as e:
+        return {"queue_name": getattr(task_queue, "queue_name", "local"), "error": str(e)}
+
+
+def render_queue_metrics(
+    queue_stats: dict[str, Any],
+    worker_metrics: dict[str, Any] | None = None,
+    extra: dict[str, float | int | bool | None] | None = None,
+) -> str:
+    """큐 깊이/최고령 job/실행 중 수와 워커 히스토그램을 queue 라벨과 함께 렌더링한다 (HPA external metric용)."""
+    values: dict[str, float | int | bool | None] = {
+        "agent_queue_up": "error" not in queue_stats,
+        "agent_queue_depth": queue_stats.get("depth"),
+        "agent_queue_delayed_jobs": queue_stats.get("delayed"),
+        "agent_queue_inflight_jobs": queue_stats.get("inflight"),
+        "agent_queue_oldest_job_age_seconds": queue_stats.get("oldest_age_seconds"),
+    }
+    values.update(extra or {})
+    histograms = {}
+    if worker_metrics:
+        histograms["agent_queue_wait_seconds"] = worker_metrics["queue_wait_seconds"]
+        histograms["agent_task_execution_seconds"] = worker_metrics["execution_seconds"]
+    return render_prometheus(values, histograms, {"queue": str(queue_stats.get("queue_name", ""))})
+
+
+def merge_histogram_snapshots(snapshots: list[dict[str, Any]]) -> dict[str, Any] | None:
+    """같은 버킷 구성의 히스토그램 스냅샷을 합친다 (prefork 자식 프로세스 집계용)."""
+    if not snapshots:
+        return None
+    buckets = {bound: 0 for bound in snapshots[0]["buckets"]}
+    for snap in snapshots:
+        for bound, count in snap["buckets"].items():
+            buckets[bound] = buckets.get(bound, 0) + count
+    return {
+        "count": sum(s["count"] for s in snapshots),
+        "sum": sum(s["sum"] for s in snapshots),
+        "buckets": buckets,
+    }
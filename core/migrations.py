@@ -0,0 +1,457 @@
+"""스키마 마이그레이션: schema_version 테이블 + 버전 순서대로 적용.
+
+저장소 초기화 시 자동 적용되며(ARCHITECTURE_DB_AUTO_MIGRATE=0으로 비활성화),
+CLI로 수동 적용/상태 확인도 가능하다.
+작업 큐 테이블(SQLite/Postgres 큐 백엔드)은 별도 DB일 수 있어 queue_schema_version으로 따로 번호를 매기고,
+큐 초기화 시 적용한다.
+
+사용법:
+    python -m core.migrations            # 미적용 마이그레이션 적용
+    python -m core.migrations --status   # 현재 버전/미적용 목록 출력
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sqlite3
+from dataclasses import dataclass
+
+from core.models import utc_now_iso
+
+# 여러 프로세스가 동시에 기동해도 마이그레이션은 한 번만 돌도록 잡는 advisory lock 키
+_POSTGRES_MIGRATION_LOCK_KEY = 7_345_001
+_POSTGRES_QUEUE_MIGRATION_LOCK_KEY = 7_345_002
+
+
+@dataclass(frozen=True, slots=True)
+class Migration:
+    version: int
+    name: str
+    sqlite: tuple[str, ...]
+    postgres: tuple[str, ...]
+
+
+MIGRATIONS: tuple[Migration, ...] = (
+    Migration(
+        version=1,
+        name="initial_schema",
+        sqlite=(
+            """
+            CREATE TABLE IF NOT EXISTS projects (
+                project_id TEXT PRIMARY KEY,
+                name TEXT NOT NULL,
+                repo_url TEXT NOT NULL,
+                default_branch TEXT NOT NULL,
+                tech_stack TEXT NOT NULL
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS tasks (
+                task_id TEXT PRIMARY KEY,
+                project_id TEXT NOT NULL,
+                title TEXT NOT NULL,
+                description TEXT NOT NULL,
+                source TEXT NOT NULL,
+                status TEXT NOT NULL,
+                created_at TEXT NOT NULL,
+                FOREIGN KEY(project_id) REFERENCES projects(project_id)
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS conversations (
+                message_id TEXT PRIMARY KEY,
+                task_id TEXT NOT NULL,
+                agent_role TEXT NOT NULL,
+                content TEXT NOT NULL,
+                timestamp TEXT NOT NULL,
+                token_usage INTEGER NOT NULL DEFAULT 0,
+                FOREIGN KEY(task_id) REFERENCES tasks(task_id)
+            )
+            """,
+        ),
+        postgres=(
+            """
+            CREATE TABLE IF NOT EXISTS projects (
+                project_id TEXT PRIMARY KEY,
+                name TEXT NOT NULL,
+                repo_url TEXT NOT NULL,
+                default_branch TEXT NOT NULL,
+                tech_stack TEXT NOT NULL
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS tasks (
+                task_id TEXT PRIMARY KEY,
+                project_id TEXT NOT NULL REFERENCES projects(project_id),
+                title TEXT NOT NULL,
+                description TEXT NOT NULL,
+                source TEXT NOT NULL,
+                status TEXT NOT NULL,
+                created_at TEXT NOT NULL
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS conversations (
+                message_id TEXT PRIMARY KEY,
+                task_id TEXT NOT NULL REFERENCES tasks(task_id),
+                agent_role TEXT NOT NULL,
+                content TEXT NOT NULL,
+                timestamp TEXT NOT NULL,
+                token_usage INTEGER NOT NULL DEFAULT 0
+            )
+            """,
+        ),
+    ),
+    Migration(
+        version=2,
+        name="task_and_conversation_indexes",
+        sqlite=(
+            "CREATE INDEX IF NOT EXISTS idx_tasks_project_created ON tasks(project_id, created_at)",
+            "CREATE INDEX IF NOT EXISTS idx_tasks_status_created ON tasks(status, created_at)",
+            "CREATE INDEX IF NOT EXISTS idx_conversations_task_timestamp ON conversations(task_id, timestamp)",
+        ),
+        postgres=(
+            "CREATE INDEX IF NOT EXISTS idx_tasks_project_created ON tasks(project_id, created_at)",
+            "CREATE INDEX IF NOT EXISTS idx_tasks_status_created ON tasks(status, created_at)",
+            "CREATE INDEX IF NOT EXISTS idx_conversations_task_timestamp ON conversations(task_id, timestamp)",
+        ),
+    ),
+    Migration(
+        version=3,
+        name="conversation_sequence",
+        sqlite=(
+            "ALTER TABLE tasks ADD COLUMN last_message_seq INTEGER NOT NULL DEFAULT 0",
+            "ALTER TABLE conversations ADD COLUMN seq INTEGER NOT NULL DEFAULT 0",
+            """
+            UPDATE conversations SET seq = (
+                SELECT COUNT(*) FROM conversations AS c2
+                WHERE c2.task_id = conversations.task_id
+                  AND (c2.timestamp < conversations.timestamp
+                       OR (c2.timestamp = conversations.timestamp AND c2.message_id <= conversations.message_id))
+            )
+            """,
+            """
+            UPDATE tasks SET last_message_seq = (
+                SELECT COALESCE(MAX(seq), 0) FROM conversations WHERE conversations.task_id = tasks.task_id
+            )
+            """,
+            "CREATE UNIQUE INDEX IF NOT EXISTS idx_conversations_task_seq ON conversations(task_id, seq)",
+        ),
+        postgres=(
+            "ALTER TABLE tasks ADD COLUMN IF NOT EXISTS last_message_seq INTEGER NOT NULL DEFAULT 0",
+            "ALTER TABLE conversations ADD COLUMN IF NOT EXISTS seq INTEGER NOT NULL DEFAULT 0",
+            """
+            UPDATE conversations AS c SET seq = ranked.rn
+            FROM (
+                SELECT message_id,
+                       ROW_NUMBER() OVER (PARTITION BY task_id ORDER BY timestamp, message_id) AS rn
+                FROM conversations
+            ) AS ranked
+            WHERE c.message_id = ranked.message_id
+            """,
+            """
+            UPDATE tasks SET last_message_seq = (
+                SELECT COALESCE(MAX(seq), 0) FROM conversations WHERE conversations.task_id = tasks.task_id
+            )
+            """,
+            "CREATE UNIQUE INDEX IF NOT EXISTS idx_conversations_task_seq ON conversations(task_id, seq)",
+        ),
+    ),
+    Migration(
+        version=4,
+        name="project_max_concurrency",
+        sqlite=("ALTER TABLE projects ADD COLUMN max_concurrency INTEGER NOT NULL DEFAULT 0",),
+        postgres=("ALTER TABLE projects ADD COLUMN IF NOT EXISTS max_concurrency INTEGER NOT NULL DEFAULT 0",),
+    ),
+    Migration(
+        version=5,
+        name="task_claim_owner",
+        sqlite=("ALTER TABLE tasks ADD COLUMN claimed_by TEXT",),
+        postgres=("ALTER TABLE tasks ADD COLUMN IF NOT EXISTS claimed_by TEXT",),
+    ),
+)
+
+LATEST_VERSION = MIGRATIONS[-1].version
+
+# 작업 큐(task_jobs 등) 스키마. 버전 관리 이전 _init_db가 만든 테이블/컬럼이 이미 있어도 적용된다.
+QUEUE_MIGRATIONS: tuple[Migration, ...] = (
+    Migration(
+        version=1,
+        name="queue_jobs",
+        sqlite=(
+            """
+            CREATE TABLE IF NOT EXISTS task_jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                job_id TEXT NOT NULL UNIQUE,
+                queue_name TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                enqueued_at REAL NOT NULL,
+                claimed_at REAL,
+                claimed_by TEXT
+            )
+            """,
+            "CREATE INDEX IF NOT EXISTS idx_task_jobs_queue_claim ON task_jobs(queue_name, claimed_at, id)",
+        ),
+        postgres=(
+            """
+            CREATE TABLE IF NOT EXISTS task_jobs (
+                id BIGSERIAL PRIMARY KEY,
+                job_id TEXT NOT NULL UNIQUE,
+                queue_name TEXT NOT NULL,
+                payload JSONB NOT NULL,
+                enqueued_at TIMESTAMPTZ NOT NULL DEFAULT now()
+            )
+            """,
+            "CREATE INDEX IF NOT EXISTS idx_task_jobs_queue_id ON task_jobs(queue_name, id)",
+        ),
+    ),
+    Migration(
+        version=2,
+        name="queue_job_leases",
+        sqlite=("ALTER TABLE task_jobs ADD COLUMN deliveries INTEGER NOT NULL DEFAULT 0",),
+        postgres=(
+            "ALTER TABLE task_jobs ADD COLUMN IF NOT EXISTS leased_until DOUBLE PRECISION",
+            "ALTER TABLE task_jobs ADD COLUMN IF NOT EXISTS claimed_by TEXT",
+            "ALTER TABLE task_jobs ADD COLUMN IF NOT EXISTS deliveries INTEGER NOT NULL DEFAULT 0",
+        ),
+    ),
+    Migration(
+        version=3,
+        name="queue_priority_sort_key",
+        sqlite=(
+            "ALTER TABLE task_jobs ADD COLUMN sort_key REAL NOT NULL DEFAULT 0",
+            "CREATE INDEX IF NOT EXISTS idx_task_jobs_queue_sort ON task_jobs(queue_name, claimed_at, sort_key, id)",
+        ),
+        postgres=(
+            "ALTER TABLE task_jobs ADD COLUMN IF NOT EXISTS sort_key DOUBLE PRECISION NOT NULL DEFAULT 0",
+            "CREATE INDEX IF NOT EXISTS idx_task_jobs_queue_sort ON task_jobs(queue_name, sort_key, id)",
+        ),
+    ),
+    Migration(
+        version=4,
+        name="queue_fair_share",
+        sqlite=(
+            "ALTER TABLE task_jobs ADD COLUMN project_id TEXT NOT NULL DEFAULT ''",
+            """
+            CREATE INDEX IF NOT EXISTS idx_task_jobs_queue_project
+            ON task_jobs(queue_name, project_id, claimed_at, sort_key, id)
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS task_queue_fairness (
+                queue_name TEXT NOT NULL,
+                project_id TEXT NOT NULL,
+                last_served REAL NOT NULL,
+                PRIMARY KEY (queue_name, project_id)
+            )
+            """,
+        ),
+        postgres=(
+            "ALTER TABLE task_jobs ADD COLUMN IF NOT EXISTS project_id TEXT NOT NULL DEFAULT ''",
+            """
+            CREATE INDEX IF NOT EXISTS idx_task_jobs_queue_project
+            ON task_jobs(queue_name, project_id, sort_key, id)
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS task_queue_fairness (
+                queue_name TEXT NOT NULL,
+                project_id TEXT NOT NULL,
+                last_served DOUBLE PRECISION NOT NULL,
+                PRIMARY KEY (queue_name, project_id)
+            )
+            """,
+        ),
+    ),
+    Migration(
+        version=5,
+        name="queue_delayed_and_dead_letters",
+        sqlite=(
+            "ALTER TABLE task_jobs ADD COLUMN available_at REAL NOT NULL DEFAULT 0",
+            """
+            CREATE TABLE IF NOT EXISTS task_dead_jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                job_id TEXT,
+                queue_name TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                reason TEXT NOT NULL,
+                dead_at REAL NOT NULL
+            )
+            """,
+        ),
+        postgres=(
+            "ALTER TABLE task_jobs ADD COLUMN IF NOT EXISTS available_at DOUBLE PRECISION NOT NULL DEFAULT 0",
+            """
+            CREATE TABLE IF NOT EXISTS task_dead_jobs (
+                id BIGSERIAL PRIMARY KEY,
+                job_id TEXT,
+                queue_name TEXT NOT NULL,
+                payload JSONB NOT NULL,
+                reason TEXT NOT NULL,
+                dead_at DOUBLE PRECISION NOT NULL
+            )
+            """,
+        ),
+    ),
+    Migration(
+        version=6,
+        name="queue_dedup",
+        sqlite=(
+            """
+            CREATE TABLE IF NOT EXISTS task_queue_dedup (
+                queue_name TEXT NOT NULL,
+                dedup_key TEXT NOT NULL,
+                job_id TEXT NOT NULL,
+                expires_at REAL NOT NULL,
+                PRIMARY KEY (queue_name, dedup_key)
+            )
+            """,
+        ),
+        postgres=(
+            """
+            CREATE TABLE IF NOT EXISTS task_queue_dedup (
+                queue_name TEXT NOT NULL,
+                dedup_key TEXT NOT NULL,
+                job_id TEXT NOT NULL,
+                expires_at DOUBLE PRECISION NOT NULL,
+                PRIMARY KEY (queue_name, dedup_key)
+            )
+            """,
+        ),
+    ),
+    Migration(
+        version=7,
+        name="queue_worker_registry",
+        sqlite=(
+            """
+            CREATE TABLE IF NOT EXISTS task_queue_workers (
+                queue_name TEXT NOT NULL,
+                worker_id TEXT NOT NULL,
+                state TEXT NOT NULL,
+                last_seen REAL NOT NULL,
+                PRIMARY KEY (queue_name, worker_id)
+            )
+            """,
+        ),
+        postgres=(
+            """
+            CREATE TABLE IF NOT EXISTS task_queue_workers (
+                queue_name TEXT NOT NULL,
+                worker_id TEXT NOT NULL,
+                state JSONB NOT NULL,
+                last_seen DOUBLE PRECISION NOT NULL,
+                PRIMARY KEY (queue_name, worker_id)
+            )
+            """,
+        ),
+    ),
+)
+
+
+@dataclass(frozen=True, slots=True)
+class MigrationTrack:
+    """버전 테이블 하나로 관리되는 마이그레이션 묶음."""
+
+    version_table: str
+    migrations: tuple[Migration, ...]
+    lock_key: int
+
+    @property
+    def latest_version(self) -> int:
+        return self.migrations[-1].version
+
+
+SCHEMA = MigrationTrack("schema_version", MIGRATIONS, _POSTGRES_MIGRATION_LOCK_KEY)
+QUEUE_SCHEMA = MigrationTrack("queue_schema_version", QUEUE_MIGRATIONS, _POSTGRES_QUEUE_MIGRATION_LOCK_KEY)
+
+_SCHEMA_VERSION_DDL = """
+CREATE TABLE IF NOT EXISTS {table} (
+    version INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    applied_at TEXT NOT NULL
+)
+"""
+
+
+def _execute_sqlite(conn, statement: str) -> None:
+    try:
+        conn.execute(statement)
+    except sqlite3.OperationalError as e:
+        # SQLite에는 ADD COLUMN IF NOT EXISTS가 없다. 버전 관리 이전에 이미 추가된 컬럼은 적용된 것으로 본다.
+        if "duplicate column name" not in str(e):
+            raise
+
+
+def apply_sqlite_migrations(conn, track: MigrationTrack = SCHEMA) -> list[int]:
+    """미적용 마이그레이션을 버전 순서대로 하나씩 트랜잭션으로 적용한다."""
+    conn.execute(_SCHEMA_VERSION_DDL.format(table=track.version_table))
+    conn.commit()
+    applied: list[int] = []
+    for migration in track.migrations:
+        # BEGIN IMMEDIATE로 write lock을 먼저 잡아 다른 프로세스와 중복 적용을 막는다.
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                f"SELECT 1 FROM {track.version_table} WHERE version = ?",
+                (migration.version,),
+            ).fetchone()
+            if row:
+                conn.rollback()
+                continue
+            for statement in migration.sqlite:
+                _execute_sqlite(conn, statement)
+            conn.execute(
+                f"INSERT INTO {track.version_table} (version, name, applied_at) VALUES (?, ?, ?)",
+                (migration.version, migration.name, utc_now_iso()),
+            )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        applied.append(migration.version)
+    return applied
+
+
+def apply_postgres_migrations(conn, track: MigrationTrack = SCHEMA) -> list[int]:
+    """advisory lock을 잡고 미적용 마이그레이션을 한 트랜잭션에서 적용한다."""
+    applied: list[int] = []
+    with conn.cursor() as cur:
+        cur.execute("SELECT pg_advisory_xact_lock(%s)", (track.lock_key,))
+        cur.execute(_SCHEMA_VERSION_DDL.format(table=track.version_table))
+        cur.execute(f"SELECT version FROM {track.version_table}")
+        done = {int(r["version"]) for r in cur.fetchall()}
+        for migration in track.migrations:
+            if migration.version in done:
+                continue
+            for statement in migration.postgres:
+                cur.execute(statement)
+            cur.execute(
+                f"INSERT INTO {track.version_table} (version, name, applied_at) VALUES (%s, %s, %s)",
+                (migration.version, migration.name, utc_now_iso()),
+            )
+            applied.append(migration.version)
+    return applied
+
+
+def pending_versions(current_versions: set[int], track: MigrationTrack = SCHEMA) -> list[int]:
+    return [m.version for m in track.migrations if m.version not in current_versions]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Architecture DB 스키마 마이그레이션")
+    parser.add_argument("--status", action="store_true", help="적용 상태만 출력")
+    args = parser.parse_args()
+
+    from core.repository import ArchitectureRepository
+
+    repo = ArchitectureRepository(auto_migrate=False)
+    try:
+        applied = [] if args.status else repo.migrate()
+        status = repo.get_schema_status()
+        status["applied_now"] = applied
+        print(json.dumps(status, ensure_ascii=False, indent=2))
+    finally:
+        repo.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import uuid
 from dataclasses import dataclass, asdict
 from datetime import datetime, timezone
 from enum import Enum
@@ -50,6 +51,8 @@ class Project:
     repo_url: str
     default_branch: str
     tech_stack: str
+    # 워커 전체에서 이 프로젝트 job을 동시에 실행할 최대 수 (0 = 제한 없음)
+    max_concurrency: int = 0
 
     def to_dict(self) -> dict:
         return asdict(self)
@@ -64,6 +67,8 @@ class WorkTask:
     source: TaskSource
     status: TaskStatus
     created_at: str
+    # IN_PROGRESS를 선점한 job(재시도 체인) 식별자. 재전달 job은 자기 선점만 이어받는다.
+    claimed_by: str | None = None
 
     def to_dict(self) -> dict:
         data = asdict(self)
@@ -80,6 +85,25 @@ class ConversationMessage:
     content: str
     timestamp: str
     token_usage: int = 0
+    seq: int = 0
+
+    @classmethod
+    def new(
+        cls,
+        task_id: str,
+        agent_role: AgentRole,
+        content: str,
+        token_usage: int = 0,
+    ) -> "ConversationMessage":
+        """id/timestamp를 채운 신규 메시지. seq는 저장 시 발급된다."""
+        return cls(
+            message_id=str(uuid.uuid4()),
+            task_id=task_id,
+            agent_role=agent_role,
+            content=content,
+            timestamp=utc_now_iso(),
+            token_usage=token_usage,
+        )
 
     def to_dict(self) -> dict:
         data = asdict(self)
@@ -99,3 +123,11 @@ class WorkflowStep:
         data["role"] = self.role.value
         data["task_type"] = self.task_type.value
         return data
+
+
+@dataclass(slots=True)
+class Page:
+    """keyset 페이지네이션 결과. next_cursor가 None이면 마지막 페이지."""
+
+    items: list
+    next_cursor: str | None = None
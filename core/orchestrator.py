@@ -3,11 +3,23 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from typing import Callable
 
-from core.models import AgentRole, TaskSource, TaskStatus, TaskType, WorkTask, WorkflowStep
+from core.models import (
+    AgentRole,
+    ConversationMessage,
+    TaskSource,
+    TaskStatus,
+    TaskType,
+    WorkTask,
+    WorkflowStep,
+)
 from core.repository import ArchitectureRepository
 from core.workflow import TaskWorkflowEngine
 
+# 실행 중(IN_PROGRESS)인 태스크는 다른 워커가 다시 선점할 수 없다.
+CLAIMABLE_STATUSES = (TaskStatus.PENDING, TaskStatus.FAILED, TaskStatus.DONE)
+
 
 @dataclass(slots=True)
 class TaskPlanResult:
@@ -42,16 +54,17 @@ class ManagerOrchestrator:
             source=source,
         )
         steps = self._build_default_plan()
-        self.repo.add_conversation(
-            task_id=task.task_id,
-            agent_role=AgentRole.ORCHESTRATOR,
-            content=f"Task created: {title}",
-        )
-        self.repo.add_conversation(
-            task_id=task.task_id,
-            agent_role=AgentRole.PM,
-            content="요구사항 분석 및 스펙 초안 작성 시작",
-        )
+        with self.repo.unit_of_work():
+            self.repo.add_conversation(
+                task_id=task.task_id,
+                agent_role=AgentRole.ORCHESTRATOR,
+                content=f"Task created: {title}",
+            )
+            self.repo.add_conversation(
+                task_id=task.task_id,
+                agent_role=AgentRole.PM,
+                content="요구사항 분석 및 스펙 초안 작성 시작",
+            )
         return TaskPlanResult(task=task, steps=steps)
 
     def add_message(self, task_id: str, role: AgentRole, content: str, token_usage: int = 0):
@@ -62,40 +75,87 @@ class ManagerOrchestrator:
             token_usage=token_usage,
         )
 
-    def update_status(self, task_id: str, status: TaskStatus) -> WorkTask | None:
-        task = self.repo.update_task_status(task_id, status)
-        if task:
-            self.repo.add_conversation(
-                task_id=task_id,
-                agent_role=AgentRole.ORCHESTRATOR,
-                content=f"Task status changed to {status.value}",
+    def update_status(
+        self,
+        task_id: str,
+        status: TaskStatus,
+        expected_status: TaskStatus | tuple[TaskStatus, ...] | None = None,
+        *,
+        claimed_by: str | None = None,
+        expected_claimed_by: str | None = None,
+    ) -> WorkTask | None:
+        """상태 변경 + 변경 로그를 한 번에 기록한다. expected_status/expected_claimed_by 불일치 시 None."""
+        return self.repo.update_task_status(
+            task_id,
+            status,
+            expected_status=expected_status,
+            message=ConversationMessage.new(
+                task_id,
+                AgentRole.ORCHESTRATOR,
+                f"Task status changed to {status.value}",
+            ),
+            claimed_by=claimed_by,
+            expected_claimed_by=expected_claimed_by,
+        )
+
+    def claim_task(self, task_id: str, reclaim: bool = False, owner: str | None = None) -> WorkTask | None:
+        """IN_PROGRESS가 아닌 태스크만 원자적으로 IN_PROGRESS로 선점하고 owner를 선점 소유자로 기록한다.
+
+        reclaim=True는 큐가 재전달한 job(이전 실행의 lease가 만료됨)에 쓰며, 같은 owner가 선점한 채 남긴
+        IN_PROGRESS만 이어받는다. 다른 job이 선점한 실행은 가로채지 않는다.
+        """
+        task = self.update_status(task_id, TaskStatus.IN_PROGRESS, expected_status=CLAIMABLE_STATUSES, claimed_by=owner)
+        if task is None and reclaim and owner is not None:
+            task = self.update_status(
+                task_id,
+                TaskStatus.IN_PROGRESS,
+                expected_status=TaskStatus.IN_PROGRESS,
+                claimed_by=owner,
+                expected_claimed_by=owner,
             )
         return task
 
-    def execute_task(self, task_id: str) -> WorkTask | None:
-        task = self.repo.get_task(task_id)
+    def release_task(self, task_id: str) -> WorkTask | None:
+        """선점(IN_PROGRESS)을 풀어 PENDING으로 되돌린다. 워커 drain 기한 안에 끝나지 못한 태스크용."""
+        return self.update_status(task_id, TaskStatus.PENDING, expected_status=TaskStatus.IN_PROGRESS)
+
+    def execute_task(
+        self,
+        task_id: str,
+        reclaim: bool = False,
+        on_error: Callable[[Exception], None] | None = None,
+        owner: str | None = None,
+    ) -> WorkTask | None:
+        """태스크를 선점해 실행한다.
+
+        태스크가 없으면 None, 다른 워커가 이미 선점했으면 실행 없이 현재(IN_PROGRESS) 태스크를 반환한다.
+        워크플로 예외는 FAILED로 기록하고, on_error가 있으면 원인 예외를 넘긴다 (워커의 재시도 판단용).
+        owner(큐 job 식별자)를 주면 선점 소유자로 기록하고, 종료 전이도 그 소유자일 때만 반영한다.
+        """
+        task = self.claim_task(task_id, reclaim=reclaim, owner=owner)
         if not task:
-            return None
-
-        self.update_status(task_id, TaskStatus.IN_PROGRESS)
-        try:
-            final_state = self.workflow_engine.execute(task)
-            logs = final_state.get("logs", [])
-            if logs:
-                self.repo.add_conversation(
-                    task_id=task_id,
-                    agent_role=AgentRole.ORCHESTRATOR,
-                    content=f"Workflow logs: {' | '.join(logs)}",
-                )
-            self.update_status(task_id, TaskStatus.DONE)
-        except Exception as e:
-            self.repo.add_conversation(
-                task_id=task_id,
-                agent_role=AgentRole.ORCHESTRATOR,
-                content=f"Workflow execution failed: {e}",
+            return self.repo.get_task(task_id)
+
+        # 선점(IN_PROGRESS)은 즉시 반영하고, 워크플로 기록은 진행 노드의 flush를 빼면
+        # 최종 요약과 함께 종료 상태 전이 트랜잭션에 실린다.
+        # 실행 중 선점을 잃었으면(release/다른 워커의 reclaim) 종료 상태로 덮지 않고 현재 상태를 돌려준다.
+        with self.repo.unit_of_work():
+            try:
+                final_state = self.workflow_engine.execute(task)
+            except Exception as e:
+                summary, terminal = f"Workflow execution failed: {e}", TaskStatus.FAILED
+                if on_error is not None:
+                    on_error(e)
+            else:
+                logs = final_state.get("logs", [])
+                summary = f"Workflow logs: {' | '.join(logs)}" if logs else None
+                terminal = TaskStatus.DONE
+            if summary:
+                self.repo.add_conversation(task_id=task_id, agent_role=AgentRole.ORCHESTRATOR, content=summary)
+            final = self.update_status(
+                task_id, terminal, expected_status=TaskStatus.IN_PROGRESS, expected_claimed_by=owner
             )
-            self.update_status(task_id, TaskStatus.FAILED)
-        return self.repo.get_task(task_id)
+        return final or self.repo.get_task(task_id)
 
     @staticmethod
     def _build_default_plan() -> list[WorkflowStep]:
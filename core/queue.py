@@ -1,46 +1,939 @@
-"""Task Queue 계층: Redis 기본, Local fallback."""
+"""Task Queue 계층: Redis 기본, Postgres(SKIP LOCKED)/SQLite(파일) 선택, Local fallback."""
 
 from __future__ import annotations
 
+import heapq
+import itertools
 import json
 import os
-import queue
+import re
+import socket
+import sqlite3
+import threading
+import time
 import uuid
-from typing import Protocol, Any
+from pathlib import Path
+from collections import OrderedDict, deque
+from typing import Any, Callable, Protocol
+
+from core.migrations import QUEUE_SCHEMA, apply_postgres_migrations, apply_sqlite_migrations
+
+
+QUEUE_PRIORITIES = ("high", "normal", "low")
+DEFAULT_PRIORITY = "normal"
+# lane별 가중치. 가중 라운드로빈으로 먼저 확인할 lane을 고르고, 비어 있으면 다음 우선순위로 넘어간다.
+PRIORITY_WEIGHTS = {"high": 6, "normal": 3, "low": 1}
+# SQL 큐용 aging: 우선순위 한 단계 = 이만큼 먼저 들어온 job과 같은 순번 (기아 방지)
+DEFAULT_PRIORITY_AGING_SECONDS = 60.0
+# enqueue_unique 중복 억제 기본 창(초)
+DEFAULT_DEDUP_WINDOW_SECONDS = 300.0
+# 이 시간 넘게 heartbeat가 없는 워커 기록은 list_workers에서 지운다 (그 전까지는 stale로 보인다).
+DEFAULT_WORKER_RETENTION_SECONDS = 3600.0
+
+
+def _priority_rank(priority: str) -> int:
+    if priority not in QUEUE_PRIORITIES:
+        raise ValueError(f"Unknown queue priority: {priority}")
+    return len(QUEUE_PRIORITIES) - 1 - QUEUE_PRIORITIES.index(priority)
+
+
+def _weighted_schedule(weights: dict[str, int]) -> list[str]:
+    """smooth weighted round-robin 순서 (예: high 6, normal 3, low 1 -> 길이 10)."""
+    current = {name: 0 for name in weights}
+    total = sum(weights.values())
+    schedule: list[str] = []
+    for _ in range(total):
+        for name, weight in weights.items():
+            current[name] += weight
+        pick = max(current, key=lambda n: current[n])
+        current[pick] -= total
+        schedule.append(pick)
+    return schedule
+
+
+_PRIORITY_SCHEDULE = _weighted_schedule(PRIORITY_WEIGHTS)
+
+
+def _lane_order(tick: int) -> list[str]:
+    first = _PRIORITY_SCHEDULE[tick % len(_PRIORITY_SCHEDULE)]
+    return [first] + [p for p in QUEUE_PRIORITIES if p != first]
+
+
+def _with_job_id(payload: dict[str, Any], priority: str | None = None) -> dict[str, Any]:
+    item = dict(payload)
+    item.setdefault("job_id", str(uuid.uuid4()))
+    item["priority"] = priority or item.get("priority") or DEFAULT_PRIORITY
+    _priority_rank(item["priority"])
+    item.setdefault("enqueued_at", time.time())
+    return item
+
+
+def _stamp_ready_at(items: list[dict[str, Any]], delay_seconds: float) -> None:
+    """지연 job에 ready_at을 기록한다. 대기 시간 지표는 의도된 지연을 빼고 이 시각부터 잰다."""
+    if delay_seconds > 0:
+        ready_at = time.time() + delay_seconds
+        for item in items:
+            item["ready_at"] = ready_at
+
+
+def job_wait_seconds(payload: dict[str, Any], now: float | None = None) -> float | None:
+    """job이 꺼낼 수 있는 상태가 된 뒤(enqueued_at 또는 ready_at) 지금까지 기다린 시간(초)."""
+    started = payload.get("ready_at") or payload.get("enqueued_at")
+    if started is None:
+        return None
+    return max(0.0, (time.time() if now is None else now) - float(started))
+
+
+def _requeue_payload(payload: dict[str, Any]) -> dict[str, Any]:
+    return {k: v for k, v in payload.items() if k != "delivery_count"}
+
+
+def _dead_letter_entry(payload: dict[str, Any], reason: str) -> dict[str, Any]:
+    return {"job_id": payload.get("job_id"), "payload": _requeue_payload(payload), "reason": reason, "dead_at": time.time()}
+
+
+def _worker_record(worker_id: str, state: dict[str, Any]) -> dict[str, Any]:
+    return {**state, "worker_id": worker_id, "last_seen": time.time()}
+
+
+def _project_of(payload: dict[str, Any]) -> str:
+    return str(payload.get("project_id") or "")
+
+
+class _ProjectLimits:
+    """fair 모드용 프로젝트별 동시 실행 상한. 조회 결과를 ttl 동안 재사용한다."""
+
+    def __init__(self, source: Callable[[], dict[str, int]] | None, ttl_seconds: float = 5.0):
+        self._source = source
+        self._ttl_seconds = ttl_seconds
+        self._value: dict[str, int] = {}
+        self._expires_at = 0.0
+        self._lock = threading.Lock()
+
+    def get(self) -> dict[str, int]:
+        if self._source is None:
+            return {}
+        with self._lock:
+            now = time.monotonic()
+            if now >= self._expires_at:
+                try:
+                    self._value = {k: int(v) for k, v in self._source().items() if int(v) > 0}
+                except Exception:
+                    # 조회 실패 시 직전 값을 유지한다 (상한 때문에 큐 전체가 멈추지 않도록).
+                    pass
+                self._expires_at = now + self._ttl_seconds
+            return self._value
 
 
 class TaskQueue(Protocol):
-    def enqueue(self, payload: dict[str, Any]) -> str: ...
+    def enqueue(self, payload: dict[str, Any], priority: str | None = None, delay_seconds: float = 0.0) -> str: ...
+    def enqueue_many(self, payloads: list[dict[str, Any]], delay_seconds: float = 0.0) -> list[str]: ...
+    def enqueue_unique(
+        self,
+        payload: dict[str, Any],
+        dedup_key: str,
+        priority: str | None = None,
+        delay_seconds: float = 0.0,
+        window_seconds: float | None = None,
+    ) -> tuple[str, bool]: ...
     def dequeue(self, timeout_seconds: int = 1) -> dict[str, Any] | None: ...
+    def dequeue_many(self, max_items: int = 10, timeout_seconds: int = 1) -> list[dict[str, Any]]: ...
+    def ack(self, payload: dict[str, Any]) -> None: ...
+    def nack(self, payload: dict[str, Any], requeue: bool = True) -> None: ...
+    def extend_lease(self, payloads: list[dict[str, Any]]) -> None: ...
+    def dead_letter(self, payload: dict[str, Any], reason: str) -> None: ...
+    def list_dead_letters(self, limit: int = 50) -> list[dict[str, Any]]: ...
+    def stats(self) -> dict[str, Any]: ...
+    def heartbeat(self, worker_id: str, state: dict[str, Any]) -> None: ...
+    def remove_worker(self, worker_id: str) -> None: ...
+    def list_workers(self) -> list[dict[str, Any]]: ...
 
 
 class LocalTaskQueue:
-    """Redis가 없을 때 사용하는 인메모리 큐."""
+    """Redis가 없을 때 사용하는 인메모리 큐 (우선순위 lane별 deque).
+
+    fair=True이면 프로젝트별 하위 큐를 round-robin으로 돌며, 상한에 걸린 프로젝트는 건너뛴다.
+    """
 
-    def __init__(self):
-        self._q: queue.Queue[str] = queue.Queue()
+    def __init__(
+        self,
+        fair: bool = False,
+        project_limits: Callable[[], dict[str, int]] | None = None,
+        dedup_window_seconds: float = DEFAULT_DEDUP_WINDOW_SECONDS,
+    ):
+        self.fair = fair
+        self.dedup_window_seconds = float(dedup_window_seconds)
+        # dedup_key -> (job_id, 만료 시각(monotonic))
+        self._dedup: dict[str, tuple[str, float]] = {}
+        self._limits = _ProjectLimits(project_limits)
+        self._lanes: dict[str, deque[str]] = {p: deque() for p in QUEUE_PRIORITIES}
+        # fair 모드: project_id -> 우선순위 lane. 앞쪽일수록 가장 오래 전에 서비스받은 프로젝트
+        self._projects: OrderedDict[str, dict[str, deque[str]]] = OrderedDict()
+        self._running: dict[str, int] = {}
+        # 지연 job: (ready_at(monotonic), seq, raw) 최소 힙
+        self._delayed: list[tuple[float, int, str]] = []
+        self._delay_seq = itertools.count()
+        self._dead: deque[dict[str, Any]] = deque(maxlen=1000)
+        self._cond = threading.Condition()
+        self._tick = 0
+        self._inflight = 0
+        self._workers: dict[str, dict[str, Any]] = {}
 
-    def enqueue(self, payload: dict[str, Any]) -> str:
-        item = dict(payload)
-        item.setdefault("job_id", str(uuid.uuid4()))
-        self._q.put(json.dumps(item))
+    def enqueue(self, payload: dict[str, Any], priority: str | None = None, delay_seconds: float = 0.0) -> str:
+        item = _with_job_id(payload, priority)
+        with self._cond:
+            if delay_seconds > 0:
+                _stamp_ready_at([item], delay_seconds)
+                ready_at = time.monotonic() + delay_seconds
+                heapq.heappush(self._delayed, (ready_at, next(self._delay_seq), json.dumps(item)))
+                # 대기 중인 워커가 다음 기상 시각을 다시 계산하도록 깨운다.
+                self._cond.notify_all()
+            else:
+                self._push(item)
+                self._cond.notify()
         return item["job_id"]
 
+    def enqueue_many(self, payloads: list[dict[str, Any]], delay_seconds: float = 0.0) -> list[str]:
+        return [self.enqueue(p, delay_seconds=delay_seconds) for p in payloads]
+
+    def enqueue_unique(
+        self,
+        payload: dict[str, Any],
+        dedup_key: str,
+        priority: str | None = None,
+        delay_seconds: float = 0.0,
+        window_seconds: float | None = None,
+    ) -> tuple[str, bool]:
+        """창 안에 같은 dedup_key로 적재된 job이 있으면 적재하지 않고 (기존 job_id, True)를 반환한다."""
+        window = self.dedup_window_seconds if window_seconds is None else float(window_seconds)
+        with self._cond:
+            now = time.monotonic()
+            existing = self._dedup.get(dedup_key)
+            if existing is not None and existing[1] > now:
+                return existing[0], True
+            if len(self._dedup) > 10_000:
+                self._dedup = {k: v for k, v in self._dedup.items() if v[1] > now}
+            # Condition 기본 락은 RLock이라 같은 임계 구역 안에서 enqueue 해도 된다.
+            job_id = self.enqueue(payload, priority=priority, delay_seconds=delay_seconds)
+            self._dedup[dedup_key] = (job_id, now + window)
+            return job_id, False
+
+    def _push(self, item: dict[str, Any]) -> None:
+        if self.fair:
+            project = _project_of(item)
+            if project not in self._projects:
+                # 새로 활성화된 프로젝트는 맨 앞에 둬 작은 프로젝트의 대기 시간을 줄인다.
+                self._projects[project] = {p: deque() for p in QUEUE_PRIORITIES}
+                self._projects.move_to_end(project, last=False)
+            self._projects[project][item["priority"]].append(json.dumps(item))
+        else:
+            self._lanes[item["priority"]].append(json.dumps(item))
+
+    def _promote_due(self) -> float | None:
+        """만기된 지연 job을 대기열로 옮기고, 남은 지연 job의 다음 만기까지 초를 반환한다."""
+        now = time.monotonic()
+        while self._delayed and self._delayed[0][0] <= now:
+            _, _, raw = heapq.heappop(self._delayed)
+            self._push(json.loads(raw))
+        return self._delayed[0][0] - now if self._delayed else None
+
+    def _pop(self, limits: dict[str, int]) -> str | None:
+        order = _lane_order(self._tick)
+        self._tick += 1
+        if not self.fair:
+            for priority in order:
+                lane = self._lanes[priority]
+                if lane:
+                    return lane.popleft()
+            return None
+
+        for project in list(self._projects):
+            cap = limits.get(project, 0)
+            if cap and self._running.get(project, 0) >= cap:
+                continue
+            lanes = self._projects[project]
+            raw = next((lanes[p].popleft() for p in order if lanes[p]), None)
+            if any(lanes.values()):
+                self._projects.move_to_end(project)
+            else:
+                del self._projects[project]
+            if raw is not None:
+                self._running[project] = self._running.get(project, 0) + 1
+                return raw
+        return None
+
+    def _release(self, payload: dict[str, Any]) -> None:
+        with self._cond:
+            self._inflight = max(0, self._inflight - 1)
+            if not self.fair:
+                return
+            project = _project_of(payload)
+            if self._running.get(project, 0) > 0:
+                self._running[project] -= 1
+            # 상한에 걸려 대기 중이던 워커를 깨운다.
+            self._cond.notify_all()
+
     def dequeue(self, timeout_seconds: int = 1) -> dict[str, Any] | None:
+        jobs = self.dequeue_many(1, timeout_seconds=timeout_seconds)
+        return jobs[0] if jobs else None
+
+    def dequeue_many(self, max_items: int = 10, timeout_seconds: int = 1) -> list[dict[str, Any]]:
+        # 첫 job만 timeout까지 기다리고 나머지는 이미 쌓인 만큼만 가져온다.
+        deadline = time.monotonic() + timeout_seconds
+        limits = self._limits.get() if self.fair else {}
+        raws: list[str] = []
+        with self._cond:
+            while True:
+                next_due = self._promote_due()
+                raw = self._pop(limits)
+                if raw is not None:
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return []
+                self._cond.wait(remaining if next_due is None else min(remaining, next_due))
+            raws.append(raw)
+            while len(raws) < max_items:
+                raw = self._pop(limits)
+                if raw is None:
+                    break
+                raws.append(raw)
+            self._inflight += len(raws)
+        return [json.loads(r) for r in raws]
+
+    def ack(self, payload: dict[str, Any]) -> None:
+        self._release(payload)
+
+    def extend_lease(self, payloads: list[dict[str, Any]]) -> None:
+        # 인메모리 큐는 재전달이 없어 늘릴 lease도 없다.
+        return None
+
+    def nack(self, payload: dict[str, Any], requeue: bool = True) -> None:
+        self._release(payload)
+        if requeue:
+            self.enqueue(_requeue_payload(payload))
+
+    def dead_letter(self, payload: dict[str, Any], reason: str) -> None:
+        with self._cond:
+            self._dead.appendleft(_dead_letter_entry(payload, reason))
+
+    def list_dead_letters(self, limit: int = 50) -> list[dict[str, Any]]:
+        with self._cond:
+            return list(itertools.islice(self._dead, max(0, int(limit))))
+
+    def stats(self) -> dict[str, Any]:
+        """대기 job 수, 지연 job 수, 실행 중(ack 전) job 수, 가장 오래 기다린 job의 대기 시간."""
+        with self._cond:
+            self._promote_due()
+            if self.fair:
+                lanes = [lane for project in self._projects.values() for lane in project.values()]
+            else:
+                lanes = list(self._lanes.values())
+            # lane마다 맨 앞이 가장 오래된 job이다.
+            heads = [json.loads(lane[0]) for lane in lanes if lane]
+            return {
+                "queue_name": "local",
+                "depth": sum(len(lane) for lane in lanes),
+                "delayed": len(self._delayed),
+                "inflight": self._inflight,
+                "oldest_age_seconds": max((job_wait_seconds(h) or 0.0 for h in heads), default=0.0),
+            }
+
+    def heartbeat(self, worker_id: str, state: dict[str, Any]) -> None:
+        with self._cond:
+            self._workers[worker_id] = _worker_record(worker_id, state)
+
+    def remove_worker(self, worker_id: str) -> None:
+        with self._cond:
+            self._workers.pop(worker_id, None)
+
+    def list_workers(self) -> list[dict[str, Any]]:
+        cutoff = time.time() - DEFAULT_WORKER_RETENTION_SECONDS
+        with self._cond:
+            for worker_id in [w for w, r in self._workers.items() if r["last_seen"] < cutoff]:
+                del self._workers[worker_id]
+            return [dict(self._workers[w]) for w in sorted(self._workers)]
+
+
+class SqliteTaskQueue:
+    """SQLite 파일 기반 내구성 큐 (단일 노드 멀티 프로세스용).
+
+    claim 시 job을 지우지 않고 lease(claimed_at)만 잡는다. ack 전에 워커가 죽으면
+    visibility timeout이 지난 뒤 다른 워커의 claim 때 자동으로 다시 대기열로 돌아온다.
+    fair=True이면 가장 오래 전에 서비스받은 프로젝트부터 한 건씩 claim한다.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        queue_name: str = "agent:task_queue",
+        visibility_timeout_seconds: float = 1800.0,
+        poll_interval_seconds: float = 0.2,
+        priority_aging_seconds: float = DEFAULT_PRIORITY_AGING_SECONDS,
+        fair: bool = False,
+        project_limits: Callable[[], dict[str, int]] | None = None,
+        dedup_window_seconds: float = DEFAULT_DEDUP_WINDOW_SECONDS,
+    ):
+        self.db_path = str(Path(db_path))
+        self.dedup_window_seconds = float(dedup_window_seconds)
+        self.queue_name = queue_name
+        self.visibility_timeout_seconds = float(visibility_timeout_seconds)
+        self.poll_interval_seconds = float(poll_interval_seconds)
+        self.priority_aging_seconds = float(priority_aging_seconds)
+        self.fair = fair
+        self._limits = _ProjectLimits(project_limits)
+        self.consumer_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._local = threading.local()
+        self._init_db()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # isolation_level=None: 트랜잭션은 BEGIN IMMEDIATE로 직접 관리한다.
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _init_db(self) -> None:
+        self.migrate()
+
+    def migrate(self) -> list[int]:
+        """큐 테이블 마이그레이션(core.migrations.QUEUE_MIGRATIONS)을 적용하고 새로 적용된 버전을 반환한다."""
+        return apply_sqlite_migrations(self._conn(), QUEUE_SCHEMA)
+
+    def ping(self) -> None:
+        self._conn().execute("SELECT 1")
+
+    def enqueue(self, payload: dict[str, Any], priority: str | None = None, delay_seconds: float = 0.0) -> str:
+        return self.enqueue_many([_with_job_id(payload, priority)], delay_seconds=delay_seconds)[0]
+
+    def _sort_key(self, enqueued_at: float, priority: str) -> float:
+        # 우선순위가 높을수록 더 일찍 들어온 것처럼 취급한다. 오래 기다린 low job도 결국 앞선다.
+        return float(enqueued_at) - _priority_rank(priority) * self.priority_aging_seconds
+
+    def enqueue_many(self, payloads: list[dict[str, Any]], delay_seconds: float = 0.0) -> list[str]:
+        items = [_with_job_id(p) for p in payloads]
+        if not items:
+            return []
+        conn = self._conn()
+        # 한 트랜잭션으로 묶어 job 수만큼의 fsync를 한 번으로 줄인다.
+        conn.execute("BEGIN IMMEDIATE")
         try:
-            raw = self._q.get(timeout=timeout_seconds)
-        except queue.Empty:
-            return None
-        return json.loads(raw)
+            self._insert(conn, items, delay_seconds)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return [i["job_id"] for i in items]
+
+    def enqueue_unique(
+        self,
+        payload: dict[str, Any],
+        dedup_key: str,
+        priority: str | None = None,
+        delay_seconds: float = 0.0,
+        window_seconds: float | None = None,
+    ) -> tuple[str, bool]:
+        """창 안에 같은 dedup_key로 적재된 job이 있으면 적재하지 않고 (기존 job_id, True)를 반환한다."""
+        window = self.dedup_window_seconds if window_seconds is None else float(window_seconds)
+        item = _with_job_id(payload, priority)
+        now = time.time()
+        conn = self._conn()
+        # 확인과 적재를 같은 write 트랜잭션에서 해 동시 요청끼리도 한 건만 적재된다.
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                """
+                SELECT job_id FROM task_queue_dedup
+                WHERE queue_name = ? AND dedup_key = ? AND expires_at > ?
+                """,
+                (self.queue_name, dedup_key, now),
+            ).fetchone()
+            if row is not None:
+                conn.execute("COMMIT")
+                return row["job_id"], True
+            conn.execute(
+                """
+                INSERT INTO task_queue_dedup (queue_name, dedup_key, job_id, expires_at) VALUES (?, ?, ?, ?)
+                ON CONFLICT(queue_name, dedup_key) DO UPDATE SET
+                    job_id = excluded.job_id,
+                    expires_at = excluded.expires_at
+                """,
+                (self.queue_name, dedup_key, item["job_id"], now + window),
+            )
+            self._insert(conn, [item], delay_seconds)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return item["job_id"], False
+
+    def _insert(self, conn: sqlite3.Connection, items: list[dict[str, Any]], delay_seconds: float) -> None:
+        _stamp_ready_at(items, delay_seconds)
+        now = time.time()
+        conn.executemany(
+            """
+            INSERT INTO task_jobs (job_id, queue_name, payload, enqueued_at, sort_key, project_id, available_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            [
+                (
+                    i["job_id"],
+                    self.queue_name,
+                    json.dumps(i),
+                    now,
+                    self._sort_key(i["enqueued_at"], i["priority"]),
+                    _project_of(i),
+                    now + max(0.0, delay_seconds),
+                )
+                for i in items
+            ],
+        )
+
+    def _claim(self, max_items: int) -> list[dict[str, Any]]:
+        conn = self._conn()
+        limits = self._limits.get() if self.fair else {}
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # lease가 만료된 job(워커 크래시)은 다시 대기열로 돌린다.
+            conn.execute(
+                """
+                UPDATE task_jobs SET claimed_at = NULL, claimed_by = NULL
+                WHERE queue_name = ? AND claimed_at IS NOT NULL AND claimed_at < ?
+                """,
+                (self.queue_name, now - self.visibility_timeout_seconds),
+            )
+            if self.fair:
+                rows = self._claim_fair(conn, now, max(1, int(max_items)), limits)
+            else:
+                rows = conn.execute(
+                    """
+                    UPDATE task_jobs SET claimed_at = ?, claimed_by = ?, deliveries = deliveries + 1
+                    WHERE id IN (
+                        SELECT id FROM task_jobs
+                        WHERE queue_name = ? AND claimed_at IS NULL AND available_at <= ?
+                        ORDER BY sort_key, id
+                        LIMIT ?
+                    )
+                    RETURNING id, payload, deliveries, sort_key
+                    """,
+                    (now, self.consumer_id, self.queue_name, now, max(1, int(max_items))),
+                ).fetchall()
+                rows.sort(key=lambda r: (r["sort_key"], r["id"]))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return [{**json.loads(r["payload"]), "delivery_count": int(r["deliveries"])} for r in rows]
+
+    def _claim_fair(self, conn: sqlite3.Connection, now: float, max_items: int, limits: dict[str, int]) -> list:
+        running = {
+            r["project_id"]: int(r["n"])
+            for r in conn.execute(
+                """
+                SELECT project_id, COUNT(*) AS n FROM task_jobs
+                WHERE queue_name = ? AND claimed_at IS NOT NULL
+                GROUP BY project_id
+                """,
+                (self.queue_name,),
+            ).fetchall()
+        }
+        # 대기 job이 있는 프로젝트를 마지막 서비스 시각이 오래된 순서로 (처음 보는 프로젝트가 맨 앞)
+        candidates = [
+            r["project_id"]
+            for r in conn.execute(
+                """
+                SELECT j.project_id, COALESCE(f.last_served, 0) AS last_served
+                FROM (
+                    SELECT DISTINCT project_id FROM task_jobs
+                    WHERE queue_name = ? AND claimed_at IS NULL AND available_at <= ?
+                ) AS j
+                LEFT JOIN task_queue_fairness AS f
+                    ON f.queue_name = ? AND f.project_id = j.project_id
+                ORDER BY last_served, j.project_id
+                """,
+                (self.queue_name, now, self.queue_name),
+            ).fetchall()
+        ]
+        rows = []
+        while candidates and len(rows) < max_items:
+            project = next(
+                (p for p in candidates if not limits.get(p) or running.get(p, 0) < limits[p]),
+                None,
+            )
+            if project is None:
+                break
+            row = conn.execute(
+                """
+                UPDATE task_jobs SET claimed_at = ?, claimed_by = ?, deliveries = deliveries + 1
+                WHERE id = (
+                    SELECT id FROM task_jobs
+                    WHERE queue_name = ? AND project_id = ? AND claimed_at IS NULL AND available_at <= ?
+                    ORDER BY sort_key, id
+                    LIMIT 1
+                )
+                RETURNING id, payload, deliveries, sort_key
+                """,
+                (now, self.consumer_id, self.queue_name, project, now),
+            ).fetchone()
+            candidates.remove(project)
+            if row is None:
+                continue
+            rows.append(row)
+            running[project] = running.get(project, 0) + 1
+            # 같은 배치 안에서도 round-robin이 되도록 방금 서비스한 프로젝트를 맨 뒤로 보낸다.
+            candidates.append(project)
+            conn.execute(
+                """
+                INSERT INTO task_queue_fairness (queue_name, project_id, last_served) VALUES (?, ?, ?)
+                ON CONFLICT(queue_name, project_id) DO UPDATE SET last_served = excluded.last_served
+                """,
+                (self.queue_name, project, now + len(rows) * 1e-6),
+            )
+        return rows
+
+    def dequeue_many(self, max_items: int = 10, timeout_seconds: int = 1) -> list[dict[str, Any]]:
+        deadline = time.monotonic() + timeout_seconds
+        while True:
+            jobs = self._claim(max_items)
+            if jobs:
+                return jobs
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return []
+            time.sleep(min(self.poll_interval_seconds, remaining))
+
+    def dequeue(self, timeout_seconds: int = 1) -> dict[str, Any] | None:
+        jobs = self.dequeue_many(1, timeout_seconds=timeout_seconds)
+        return jobs[0] if jobs else None
+
+    def ack(self, payload: dict[str, Any]) -> None:
+        job_id = payload.get("job_id")
+        if job_id:
+            self._conn().execute("DELETE FROM task_jobs WHERE job_id = ?", (job_id,))
+
+    def nack(self, payload: dict[str, Any], requeue: bool = True) -> None:
+        if not requeue:
+            self.ack(payload)
+            return
+        job_id = payload.get("job_id")
+        if job_id:
+            self._conn().execute(
+                "UPDATE task_jobs SET claimed_at = NULL, claimed_by = NULL WHERE job_id = ?",
+                (job_id,),
+            )
+
+    def extend_lease(self, payloads: list[dict[str, Any]]) -> None:
+        """실행 중 job의 lease 시작 시각을 지금으로 당긴다. 이미 회수됐거나 다른 워커가 가져간 job은 건드리지 않는다."""
+        job_ids = [str(p["job_id"]) for p in payloads if p.get("job_id")]
+        if not job_ids:
+            return
+        self._conn().execute(
+            f"""
+            UPDATE task_jobs SET claimed_at = ?
+            WHERE claimed_by = ? AND claimed_at IS NOT NULL AND job_id IN ({', '.join('?' for _ in job_ids)})
+            """,
+            (time.time(), self.consumer_id, *job_ids),
+        )
+
+    def dead_letter(self, payload: dict[str, Any], reason: str) -> None:
+        self._conn().execute(
+            "INSERT INTO task_dead_jobs (job_id, queue_name, payload, reason, dead_at) VALUES (?, ?, ?, ?, ?)",
+            (payload.get("job_id"), self.queue_name, json.dumps(_requeue_payload(payload)), reason, time.time()),
+        )
+
+    def list_dead_letters(self, limit: int = 50) -> list[dict[str, Any]]:
+        rows = self._conn().execute(
+            """
+            SELECT job_id, payload, reason, dead_at FROM task_dead_jobs
+            WHERE queue_name = ?
+            ORDER BY id DESC
+            LIMIT ?
+            """,
+            (self.queue_name, max(0, int(limit))),
+        ).fetchall()
+        return [
+            {"job_id": r["job_id"], "payload": json.loads(r["payload"]), "reason": r["reason"], "dead_at": r["dead_at"]}
+            for r in rows
+        ]
+
+    def stats(self) -> dict[str, Any]:
+        """대기 job 수, 지연 job 수, 실행 중(ack 전) job 수, 가장 오래 기다린 job의 대기 시간."""
+        now = time.time()
+        row = self._conn().execute(
+            """
+            SELECT
+                COALESCE(SUM(claimed_at IS NULL AND available_at <= ?), 0) AS depth,
+                COALESCE(SUM(claimed_at IS NULL AND available_at > ?), 0) AS delayed,
+                COALESCE(SUM(claimed_at IS NOT NULL), 0) AS inflight,
+                MIN(CASE WHEN claimed_at IS NULL AND available_at <= ? THEN available_at END) AS oldest
+            FROM task_jobs
+            WHERE queue_name = ?
+            """,
+            (now, now, now, self.queue_name),
+        ).fetchone()
+        return {
+            "queue_name": self.queue_name,
+            "depth": int(row["depth"]),
+            "delayed": int(row["delayed"]),
+            "inflight": int(row["inflight"]),
+            "oldest_age_seconds": max(0.0, now - row["oldest"]) if row["oldest"] is not None else 0.0,
+        }
+
+    def heartbeat(self, worker_id: str, state: dict[str, Any]) -> None:
+        record = _worker_record(worker_id, state)
+        self._conn().execute(
+            """
+            INSERT INTO task_queue_workers (queue_name, worker_id, state, last_seen) VALUES (?, ?, ?, ?)
+            ON CONFLICT (queue_name, worker_id) DO UPDATE SET state = excluded.state, last_seen = excluded.last_seen
+            """,
+            (self.queue_name, worker_id, json.dumps(record), record["last_seen"]),
+        )
+
+    def remove_worker(self, worker_id: str) -> None:
+        self._conn().execute(
+            "DELETE FROM task_queue_workers WHERE queue_name = ? AND worker_id = ?",
+            (self.queue_name, worker_id),
+        )
+
+    def list_workers(self) -> list[dict[str, Any]]:
+        conn = self._conn()
+        conn.execute(
+            "DELETE FROM task_queue_workers WHERE queue_name = ? AND last_seen < ?",
+            (self.queue_name, time.time() - DEFAULT_WORKER_RETENTION_SECONDS),
+        )
+        rows = conn.execute(
+            "SELECT state FROM task_queue_workers WHERE queue_name = ? ORDER BY worker_id",
+            (self.queue_name,),
+        ).fetchall()
+        return [json.loads(r["state"]) for r in rows]
+
+    def close(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+# 만료된 lease를 원자적으로 job의 우선순위 lane(fair 모드면 프로젝트 큐 맨 앞)에 되돌린다.
+# member = "<processing list>|<raw job>", ARGV[3] = fair key prefix ('' 이면 lane 모드)
+_REDIS_REAP_SCRIPT = """
+local expired = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, tonumber(ARGV[2]))
+local requeued = 0
+for _, member in ipairs(expired) do
+    local sep = string.find(member, '|', 1, true)
+    if sep then
+        local processing = string.sub(member, 1, sep - 1)
+        local raw = string.sub(member, sep + 1)
+        if redis.call('LREM', processing, 1, raw) > 0 then
+            local ok, job = pcall(cjson.decode, raw)
+            if ARGV[3] ~= '' then
+                local project = ''
+                if ok and type(job) == 'table' and type(job.project_id) == 'string' then
+                    project = job.project_id
+                end
+                redis.call('ZADD', ARGV[3] .. 'jobs:' .. project, 0, raw)
+                redis.call('ZADD', ARGV[3] .. 'projects', 'NX', 0, project)
+            else
+                local lane = KEYS[2]
+                if ok and type(job) == 'table' and job.priority and job.priority ~= 'normal' then
+                    lane = KEYS[2] .. ':' .. job.priority
+                end
+                redis.call('RPUSH', lane, raw)
+            end
+            requeued = requeued + 1
+        end
+    end
+    redis.call('ZREM', KEYS[1], member)
+end
+return requeued
+"""
+
+# 지연 job 이동: 만기된 job을 delayed zset에서 원래 lane(fair 모드면 프로젝트 큐)으로 옮긴다.
+# KEYS[1] = delayed zset, KEYS[2] = queue_name, ARGV: now, limit, fair prefix, aging seconds
+_REDIS_PROMOTE_SCRIPT = """
+local due = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, tonumber(ARGV[2]))
+local ranks = {high = 2, normal = 1, low = 0}
+for _, raw in ipairs(due) do
+    redis.call('ZREM', KEYS[1], raw)
+    local ok, job = pcall(cjson.decode, raw)
+    if not ok or type(job) ~= 'table' then job = {} end
+    local priority = job.priority
+    if type(priority) ~= 'string' or ranks[priority] == nil then priority = 'normal' end
+    if ARGV[3] ~= '' then
+        local project = ''
+        if type(job.project_id) == 'string' then project = job.project_id end
+        local sort_key = (tonumber(job.enqueued_at) or tonumber(ARGV[1])) - ranks[priority] * tonumber(ARGV[4])
+        redis.call('ZADD', ARGV[3] .. 'jobs:' .. project, sort_key, raw)
+        redis.call('ZADD', ARGV[3] .. 'projects', 'NX', 0, project)
+    elseif priority == 'normal' then
+        redis.call('LPUSH', KEYS[2], raw)
+    else
+        redis.call('LPUSH', KEYS[2] .. ':' .. priority, raw)
+    end
+end
+return #due
+"""
+
+# reliable 모드 lease: processing list 이동, inflight(lease 만료 시각) 등록, 전달 횟수 증가를 같은 스크립트에서 한다.
+# 이동과 lease 사이에 워커가 죽어 reaper가 모르는 processing list에 job이 갇히는 일이 없다.
+# lease_ctx = {processing list, inflight zset, deliveries hash, lease 만료 시각}
+_REDIS_LEASE_LUA = """
+local function lease(ctx, raw)
+    redis.call('LPUSH', ctx[1], raw)
+    redis.call('ZADD', ctx[2], ctx[4], ctx[1] .. '|' .. raw)
+    local ok, job = pcall(cjson.decode, raw)
+    local job_id = ''
+    if ok and type(job) == 'table' and job.job_id then
+        job_id = tostring(job.job_id)
+    end
+    return redis.call('HINCRBY', ctx[3], job_id, 1)
+end
+"""
+
+# lane 모드 reliable claim: KEYS = 확인할 lane 순서, ARGV = processing, inflight, deliveries, 만료 시각, max_items
+# 반환: {raw 목록, 전달 횟수 목록}
+_REDIS_RELIABLE_CLAIM_SCRIPT = _REDIS_LEASE_LUA + """
+local ctx = {ARGV[1], ARGV[2], ARGV[3], tonumber(ARGV[4])}
+local max_items = tonumber(ARGV[5])
+local out, counts = {}, {}
+for _, lane in ipairs(KEYS) do
+    while #out < max_items do
+        local raw = redis.call('RPOP', lane)
+        if not raw then break end
+        table.insert(out, raw)
+        table.insert(counts, lease(ctx, raw))
+    end
+end
+return {out, counts}
+"""
+
+# fair 모드 claim: 가장 오래 전에 서비스받은 프로젝트부터 한 건씩, 상한(ARGV[4] JSON)에 걸린 프로젝트는 건너뛴다.
+# KEYS[1] = projects zset(score = 마지막 서비스 clock), ARGV: prefix, now, lease deadline, limits, max, processing list,
+# inflight key, deliveries key. processing list가 ''이면 at-most-once (lease 없음).
+# 반환: {raw 목록, 전달 횟수 목록(reliable이 아니면 0)}
+_REDIS_FAIR_CLAIM_SCRIPT = _REDIS_LEASE_LUA + """
+local prefix, now, deadline = ARGV[1], tonumber(ARGV[2]), tonumber(ARGV[3])
+local limits = cjson.decode(ARGV[4])
+local max_items, processing = tonumber(ARGV[5]), ARGV[6]
+local ctx = {processing, ARGV[7], ARGV[8], deadline}
+local out, counts = {}, {}
+local progressed = true
+while #out < max_items and progressed do
+    progressed = false
+    for _, project in ipairs(redis.call('ZRANGE', KEYS[1], 0, -1)) do
+        if #out >= max_items then break end
+        local jobs_key = prefix .. 'jobs:' .. project
+        local running_key = prefix .. 'running:' .. project
+        redis.call('ZREMRANGEBYSCORE', running_key, '-inf', now)
+        local cap = tonumber(limits[project] or 0)
+        if cap == 0 or redis.call('ZCARD', running_key) < cap then
+            local popped = redis.call('ZPOPMIN', jobs_key)
+            if popped[1] then
+                local raw = popped[1]
+                local ok, job = pcall(cjson.decode, raw)
+                if ok and type(job) == 'table' and job.job_id then
+                    redis.call('ZADD', running_key, deadline, job.job_id)
+                end
+                if processing ~= '' then
+                    table.insert(counts, lease(ctx, raw))
+                else
+                    table.insert(counts, 0)
+                end
+                table.insert(out, raw)
+                progressed = true
+                redis.call('ZADD', KEYS[1], redis.call('INCR', prefix .. 'clock'), project)
+            end
+            if redis.call('EXISTS', jobs_key) == 0 then
+                redis.call('ZREM', KEYS[1], project)
+            end
+        end
+    end
+end
+return {out, counts}
+"""
+
+# 중복 억제 적재: dedup key가 살아 있으면 기존 job_id를, 아니면 SET PX 후 같은 스크립트에서 적재한다.
+# KEYS[1] = dedup key, KEYS[2] = 대상(lane list / delayed zset / 프로젝트 zset), KEYS[3] = fair projects zset
+# ARGV: job_id, window ms, raw job, mode('lane' | 'zset' | 'fair'), score, project
+_REDIS_ENQUEUE_UNIQUE_SCRIPT = """
+local existing = redis.call('GET', KEYS[1])
+if existing then
+    return {existing, 1}
+end
+redis.call('SET', KEYS[1], ARGV[1], 'PX', tonumber(ARGV[2]))
+if ARGV[4] == 'lane' then
+    redis.call('LPUSH', KEYS[2], ARGV[3])
+else
+    redis.call('ZADD', KEYS[2], tonumber(ARGV[5]), ARGV[3])
+    if ARGV[4] == 'fair' then
+        redis.call('ZADD', KEYS[3], 'NX', 0, ARGV[6])
+    end
+end
+return {ARGV[1], 0}
+"""
 
 
 class RedisTaskQueue:
-    """Redis list(BRPOP/LPUSH) 기반 간단 큐."""
+    """Redis list 기반 큐.
 
-    def __init__(self, redis_url: str, queue_name: str = "agent:task_queue"):
+    기본 모드는 BRPOP/LPUSH(at-most-once). reliable=True이면 Lua 스크립트로 job을 워커별
+    processing list로 옮기면서 lease(visibility timeout)를 잡고, 실행 중에는 extend_lease로 늘린다.
+    lease가 만료된 job은 reaper가 대기열 맨 앞으로 되돌린다.
+
+    우선순위별 list(lane)를 따로 두고(normal은 기존 queue_name 그대로), 가중 라운드로빈 순서로 확인한다.
+    fair=True이면 lane 대신 프로젝트별 sorted set(score = aging sort key)을 두고 Lua로
+    프로젝트 round-robin + 동시 실행 상한을 원자적으로 적용한다.
+    """
+
+    def __init__(
+        self,
+        redis_url: str,
+        queue_name: str = "agent:task_queue",
+        *,
+        reliable: bool = False,
+        visibility_timeout_seconds: float = 1800.0,
+        reap_interval_seconds: float = 30.0,
+        consumer_id: str | None = None,
+        poll_interval_seconds: float = 0.1,
+        fair: bool = False,
+        project_limits: Callable[[], dict[str, int]] | None = None,
+        priority_aging_seconds: float = DEFAULT_PRIORITY_AGING_SECONDS,
+        dedup_window_seconds: float = DEFAULT_DEDUP_WINDOW_SECONDS,
+    ):
         self.redis_url = redis_url
         self.queue_name = queue_name
+        self.reliable = reliable
+        self.visibility_timeout_seconds = float(visibility_timeout_seconds)
+        self.reap_interval_seconds = float(reap_interval_seconds)
+        self.poll_interval_seconds = float(poll_interval_seconds)
+        self.lanes = {p: queue_name if p == DEFAULT_PRIORITY else f"{queue_name}:{p}" for p in QUEUE_PRIORITIES}
+        self._tick = 0
+        self.consumer_id = consumer_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.processing_list = f"{queue_name}:processing:{self.consumer_id}"
+        self.inflight_key = f"{queue_name}:inflight"
+        self.deliveries_key = f"{queue_name}:deliveries"
         self.client = self._create_client(redis_url)
+        self._inflight: dict[str, tuple[str, str]] = {}
+        self._inflight_lock = threading.Lock()
+        self._last_reap = 0.0
+        self._reap_script = self.client.register_script(_REDIS_REAP_SCRIPT) if reliable else None
+        self._reliable_claim_script = self.client.register_script(_REDIS_RELIABLE_CLAIM_SCRIPT) if reliable else None
+        self.delayed_key = f"{queue_name}:delayed"
+        self.dead_key = f"{queue_name}:dead"
+        self.workers_key = f"{queue_name}:workers"
+        self._promote_script = self.client.register_script(_REDIS_PROMOTE_SCRIPT)
+        self.fair = fair
+        self.fair_prefix = f"{queue_name}:fair:"
+        self.priority_aging_seconds = float(priority_aging_seconds)
+        self._limits = _ProjectLimits(project_limits)
+        self._fair_claim_script = self.client.register_script(_REDIS_FAIR_CLAIM_SCRIPT) if fair else None
+        self.dedup_window_seconds = float(dedup_window_seconds)
+        self._enqueue_unique_script = self.client.register_script(_REDIS_ENQUEUE_UNIQUE_SCRIPT)
 
     @staticmethod
     def _create_client(redis_url: str):
@@ -52,25 +945,774 @@ class RedisTaskQueue:
             ) from e
         return redis.Redis.from_url(redis_url, decode_responses=True)
 
-    def enqueue(self, payload: dict[str, Any]) -> str:
-        item = dict(payload)
-        item.setdefault("job_id", str(uuid.uuid4()))
-        self.client.lpush(self.queue_name, json.dumps(item))
-        return item["job_id"]
+    def enqueue(self, payload: dict[str, Any], priority: str | None = None, delay_seconds: float = 0.0) -> str:
+        return self.enqueue_many([_with_job_id(payload, priority)], delay_seconds=delay_seconds)[0]
+
+    def enqueue_many(self, payloads: list[dict[str, Any]], delay_seconds: float = 0.0) -> list[str]:
+        items = [_with_job_id(p) for p in payloads]
+        if delay_seconds > 0 and items:
+            # 지연 job은 ready 시각을 score로 한 zset에 두고, dequeue 때 mover가 만기분을 lane으로 옮긴다.
+            _stamp_ready_at(items, delay_seconds)
+            ready_at = items[0]["ready_at"]
+            self.client.zadd(self.delayed_key, {json.dumps(i): ready_at for i in items})
+            return [i["job_id"] for i in items]
+        if self.fair:
+            pipe = self.client.pipeline(transaction=False)
+            self._enqueue_fair(pipe, items)
+            pipe.execute()
+            return [i["job_id"] for i in items]
+        by_lane: dict[str, list[str]] = {}
+        for item in items:
+            by_lane.setdefault(self.lanes[item["priority"]], []).append(json.dumps(item))
+        if by_lane:
+            # lane별 다중 값 LPUSH를 한 pipeline(한 round-trip)으로. 앞 job이 먼저 RPOP되도록 순서를 유지한다.
+            pipe = self.client.pipeline(transaction=False)
+            for lane, raws in by_lane.items():
+                pipe.lpush(lane, *raws)
+            pipe.execute()
+        return [i["job_id"] for i in items]
+
+    def enqueue_unique(
+        self,
+        payload: dict[str, Any],
+        dedup_key: str,
+        priority: str | None = None,
+        delay_seconds: float = 0.0,
+        window_seconds: float | None = None,
+    ) -> tuple[str, bool]:
+        """창 안에 같은 dedup_key로 적재된 job이 있으면 적재하지 않고 (기존 job_id, True)를 반환한다."""
+        window = self.dedup_window_seconds if window_seconds is None else float(window_seconds)
+        item = _with_job_id(payload, priority)
+        project = _project_of(item)
+        _stamp_ready_at([item], delay_seconds)
+        if delay_seconds > 0:
+            mode, target, score = "zset", self.delayed_key, item["ready_at"]
+        elif self.fair:
+            mode, target, score = "fair", f"{self.fair_prefix}jobs:{project}", self._fair_sort_key(item)
+        else:
+            mode, target, score = "lane", self.lanes[item["priority"]], 0.0
+        job_id, deduplicated = self._enqueue_unique_script(
+            keys=[f"{self.queue_name}:dedup:{dedup_key}", target, f"{self.fair_prefix}projects"],
+            args=[item["job_id"], max(1, int(window * 1000)), json.dumps(item), mode, score, project],
+        )
+        return job_id, bool(int(deduplicated))
+
+    def _fair_sort_key(self, item: dict[str, Any]) -> float:
+        return float(item["enqueued_at"]) - _priority_rank(item["priority"]) * self.priority_aging_seconds
+
+    def _enqueue_fair(self, pipe, items: list[dict[str, Any]]) -> None:
+        for item in items:
+            project = _project_of(item)
+            pipe.zadd(f"{self.fair_prefix}jobs:{project}", {json.dumps(item): self._fair_sort_key(item)})
+            # 새로 활성화된 프로젝트는 score 0으로 맨 앞에 (이미 대기 중이면 순번 유지)
+            pipe.zadd(f"{self.fair_prefix}projects", {project: 0}, nx=True)
+
+    def _next_lanes(self) -> list[str]:
+        order = _lane_order(self._tick)
+        self._tick += 1
+        return [self.lanes[p] for p in order]
 
     def dequeue(self, timeout_seconds: int = 1) -> dict[str, Any] | None:
-        # BRPOP: (queue_name, value)
-        result = self.client.brpop(self.queue_name, timeout=timeout_seconds)
-        if not result:
-            return None
-        _, raw = result
-        return json.loads(raw)
+        jobs = self.dequeue_many(1, timeout_seconds=timeout_seconds)
+        return jobs[0] if jobs else None
+
+    def promote_delayed(self, limit: int = 100) -> int:
+        """만기된 지연 job을 대기열로 옮기고 개수를 반환한다."""
+        return int(
+            self._promote_script(
+                keys=[self.delayed_key, self.queue_name],
+                args=[time.time(), limit, self.fair_prefix if self.fair else "", self.priority_aging_seconds],
+            )
+        )
+
+    def dequeue_many(self, max_items: int = 10, timeout_seconds: int = 1) -> list[dict[str, Any]]:
+        max_items = max(1, int(max_items))
+        self.promote_delayed()
+        if self.fair:
+            return self._dequeue_fair(max_items, timeout_seconds)
+        lanes = self._next_lanes()
+        if not self.reliable:
+            # BRPOP은 나열한 key 순서대로 확인한다. 첫 job 이후는 같은 순서로 RPOP count.
+            result = self.client.brpop(lanes, timeout=timeout_seconds)
+            if not result:
+                return []
+            raws = [result[1]]
+            for lane in lanes:
+                if len(raws) >= max_items:
+                    break
+                raws.extend(self.client.rpop(lane, max_items - len(raws)) or [])
+            return [json.loads(raw) for raw in raws]
+
+        self._maybe_reap()
+        # BLMOVE 후 lease를 따로 적으면 그 사이 죽은 워커의 job이 사라지므로, 이동+lease를 한 스크립트로
+        # 하고 비어 있으면 poll_interval 간격으로 다시 확인한다 (fair 모드와 같은 방식).
+        deadline = time.monotonic() + timeout_seconds
+        while True:
+            raws, counts = self._reliable_claim_script(
+                keys=lanes,
+                args=[
+                    self.processing_list,
+                    self.inflight_key,
+                    self.deliveries_key,
+                    time.time() + self.visibility_timeout_seconds,
+                    max_items,
+                ],
+            )
+            if raws:
+                return self._register_inflight(raws, counts)
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return []
+            time.sleep(min(self.poll_interval_seconds, remaining))
+
+    def _dequeue_fair(self, max_items: int, timeout_seconds: float) -> list[dict[str, Any]]:
+        if self.reliable:
+            self._maybe_reap()
+        deadline = time.monotonic() + timeout_seconds
+        while True:
+            now = time.time()
+            raws, counts = self._fair_claim_script(
+                keys=[f"{self.fair_prefix}projects"],
+                args=[
+                    self.fair_prefix,
+                    now,
+                    now + self.visibility_timeout_seconds,
+                    json.dumps(self._limits.get()),
+                    max_items,
+                    self.processing_list if self.reliable else "",
+                    self.inflight_key,
+                    self.deliveries_key,
+                ],
+            )
+            if raws:
+                return self._register_inflight(raws, counts) if self.reliable else [json.loads(r) for r in raws]
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return []
+            time.sleep(min(self.poll_interval_seconds, remaining))
+
+    def _release_fair(self, pipe, payload: dict[str, Any]) -> None:
+        if self.fair:
+            pipe.zrem(f"{self.fair_prefix}running:{_project_of(payload)}", str(payload.get("job_id", "")))
+
+    def _register_inflight(self, raws: list[str], deliveries: list[int]) -> list[dict[str, Any]]:
+        """claim 스크립트가 lease까지 마친 job을 ack/nack용으로 기억한다."""
+        payloads = [json.loads(raw) for raw in raws]
+        with self._inflight_lock:
+            for raw, payload, count in zip(raws, payloads, deliveries):
+                self._inflight[str(payload.get("job_id", ""))] = (raw, f"{self.processing_list}|{raw}")
+                payload["delivery_count"] = int(count)
+        return payloads
+
+    def ack(self, payload: dict[str, Any]) -> None:
+        if not self.reliable:
+            if self.fair:
+                pipe = self.client.pipeline()
+                self._release_fair(pipe, payload)
+                pipe.execute()
+            return
+        entry = self._pop_inflight(payload)
+        if entry is None:
+            return
+        raw, member = entry
+        pipe = self.client.pipeline()
+        self._release_fair(pipe, payload)
+        pipe.lrem(self.processing_list, 1, raw)
+        pipe.zrem(self.inflight_key, member)
+        pipe.hdel(self.deliveries_key, str(payload.get("job_id", "")))
+        pipe.execute()
+
+    def nack(self, payload: dict[str, Any], requeue: bool = True) -> None:
+        if not self.reliable:
+            if self.fair:
+                pipe = self.client.pipeline()
+                self._release_fair(pipe, payload)
+                pipe.execute()
+            if requeue:
+                self.enqueue(_requeue_payload(payload))
+            return
+        entry = self._pop_inflight(payload)
+        if entry is None:
+            return
+        raw, member = entry
+        pipe = self.client.pipeline()
+        self._release_fair(pipe, payload)
+        pipe.lrem(self.processing_list, 1, raw)
+        pipe.zrem(self.inflight_key, member)
+        if requeue and self.fair:
+            self._enqueue_fair(pipe, [json.loads(raw)])
+        elif requeue:
+            pipe.lpush(self.lanes.get(payload.get("priority"), self.queue_name), raw)
+        else:
+            pipe.hdel(self.deliveries_key, str(payload.get("job_id", "")))
+        pipe.execute()
+
+    def extend_lease(self, payloads: list[dict[str, Any]]) -> None:
+        """reliable 모드에서 실행 중 job의 inflight 만료 시각을 늘린다. reaper가 이미 회수한 job은 되살리지 않는다(XX)."""
+        if not self.reliable:
+            return
+        with self._inflight_lock:
+            members = [
+                entry[1] for entry in (self._inflight.get(str(p.get("job_id", ""))) for p in payloads) if entry
+            ]
+        if not members:
+            return
+        deadline = time.time() + self.visibility_timeout_seconds
+        self.client.zadd(self.inflight_key, {member: deadline for member in members}, xx=True)
+
+    def dead_letter(self, payload: dict[str, Any], reason: str) -> None:
+        pipe = self.client.pipeline()
+        pipe.lpush(self.dead_key, json.dumps(_dead_letter_entry(payload, reason)))
+        pipe.ltrim(self.dead_key, 0, 9999)
+        pipe.execute()
+
+    def list_dead_letters(self, limit: int = 50) -> list[dict[str, Any]]:
+        if limit <= 0:
+            return []
+        return [json.loads(raw) for raw in self.client.lrange(self.dead_key, 0, int(limit) - 1)]
+
+    def stats(self) -> dict[str, Any]:
+        """대기 job 수, 지연 job 수, 실행 중(ack 전) job 수, 가장 오래 기다린 job의 대기 시간.
+
+        실행 중 수는 reliable 모드(inflight zset)에서만 알 수 있고, 아니면 None.
+        """
+        pipe = self.client.pipeline(transaction=False)
+        if self.fair:
+            for project in self.client.zrange(f"{self.fair_prefix}projects", 0, -1):
+                key = f"{self.fair_prefix}jobs:{project}"
+                pipe.zcard(key)
+                pipe.zrange(key, 0, 0)
+        else:
+            for lane in self.lanes.values():
+                # LPUSH/RPOP이라 오른쪽 끝이 가장 오래된 job이다.
+                pipe.llen(lane)
+                pipe.lindex(lane, -1)
+        pipe.zcard(self.delayed_key)
+        pipe.zcard(self.inflight_key)
+        *per_key, delayed, inflight = pipe.execute()
+        heads = []
+        for head in per_key[1::2]:
+            if isinstance(head, list):
+                head = head[0] if head else None
+            if head:
+                heads.append(json.loads(head))
+        return {
+            "queue_name": self.queue_name,
+            "depth": sum(int(n) for n in per_key[0::2]),
+            "delayed": int(delayed),
+            "inflight": int(inflight) if self.reliable else None,
+            "oldest_age_seconds": max((job_wait_seconds(h) or 0.0 for h in heads), default=0.0),
+        }
+
+    def heartbeat(self, worker_id: str, state: dict[str, Any]) -> None:
+        self.client.hset(self.workers_key, worker_id, json.dumps(_worker_record(worker_id, state)))
+
+    def remove_worker(self, worker_id: str) -> None:
+        self.client.hdel(self.workers_key, worker_id)
+
+    def list_workers(self) -> list[dict[str, Any]]:
+        cutoff = time.time() - DEFAULT_WORKER_RETENTION_SECONDS
+        records = [json.loads(raw) for raw in self.client.hgetall(self.workers_key).values()]
+        expired = [r["worker_id"] for r in records if r["last_seen"] < cutoff]
+        if expired:
+            self.client.hdel(self.workers_key, *expired)
+        return sorted((r for r in records if r["last_seen"] >= cutoff), key=lambda r: r["worker_id"])
+
+    def _pop_inflight(self, payload: dict[str, Any]) -> tuple[str, str] | None:
+        with self._inflight_lock:
+            return self._inflight.pop(str(payload.get("job_id", "")), None)
+
+    def reap_expired(self, limit: int = 100) -> int:
+        """visibility timeout이 지난 in-flight job을 대기열로 되돌리고 개수를 반환한다."""
+        if self._reap_script is None:
+            return 0
+        return int(
+            self._reap_script(
+                keys=[self.inflight_key, self.queue_name],
+                args=[time.time(), limit, self.fair_prefix if self.fair else ""],
+            )
+        )
+
+    def _maybe_reap(self) -> None:
+        # 별도 프로세스 없이 모든 워커가 주기적으로 reaper 역할을 나눠 맡는다.
+        now = time.monotonic()
+        if now - self._last_reap < self.reap_interval_seconds:
+            return
+        self._last_reap = now
+        try:
+            self.reap_expired()
+        except Exception:
+            pass
+
+
+class PostgresTaskQueue:
+    """Postgres 테이블 기반 큐.
+
+    워커는 SELECT ... FOR UPDATE SKIP LOCKED로 서로 막지 않고 배치 단위로 job을 가져가며,
+    큐가 비어 있으면 폴링 대신 LISTEN/NOTIFY로 깨어난다.
+    SqliteTaskQueue처럼 claim 시 행을 지우지 않고 lease(leased_until)만 잡고 ack 때 지운다.
+    ack 전에 워커가 죽으면 visibility timeout 뒤 다음 claim이 다시 가져간다 (at-least-once).
+    fair=True이면 프로젝트 선택을 advisory lock으로 직렬화하고, lease 중인 job 수로 프로젝트별 상한을 계산한다.
+    """
+
+    def __init__(
+        self,
+        dsn: str,
+        queue_name: str = "agent:task_queue",
+        pool_max_size: int = 4,
+        priority_aging_seconds: float = DEFAULT_PRIORITY_AGING_SECONDS,
+        fair: bool = False,
+        project_limits: Callable[[], dict[str, int]] | None = None,
+        visibility_timeout_seconds: float = 1800.0,
+        dedup_window_seconds: float = DEFAULT_DEDUP_WINDOW_SECONDS,
+    ):
+        self.dsn = dsn
+        self.dedup_window_seconds = float(dedup_window_seconds)
+        self.queue_name = queue_name
+        self.priority_aging_seconds = float(priority_aging_seconds)
+        self.fair = fair
+        self.visibility_timeout_seconds = float(visibility_timeout_seconds)
+        self.consumer_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._limits = _ProjectLimits(project_limits)
+        self.channel = re.sub(r"[^a-z0-9_]", "_", queue_name.lower())
+        self._listeners = threading.local()
+        self._pool = self._create_pool(pool_max_size)
+        self._init_db()
+
+    def _create_pool(self, max_size: int):
+        try:
+            from psycopg.rows import dict_row
+            from psycopg_pool import ConnectionPool
+        except Exception as e:
+            raise RuntimeError(
+                "Postgres queue를 사용하려면 psycopg, psycopg_pool이 필요합니다."
+            ) from e
+        return ConnectionPool(
+            self.dsn,
+            min_size=1,
+            max_size=max(1, max_size),
+            kwargs={"row_factory": dict_row},
+            check=ConnectionPool.check_connection,
+            open=True,
+        )
+
+    def _init_db(self) -> None:
+        self.migrate()
+
+    def migrate(self) -> list[int]:
+        """큐 테이블 마이그레이션(core.migrations.QUEUE_MIGRATIONS)을 적용하고 새로 적용된 버전을 반환한다."""
+        with self._pool.connection() as conn:
+            return apply_postgres_migrations(conn, QUEUE_SCHEMA)
+
+    def ping(self) -> None:
+        with self._pool.connection() as conn:
+            conn.execute("SELECT 1")
+
+    def enqueue(self, payload: dict[str, Any], priority: str | None = None, delay_seconds: float = 0.0) -> str:
+        return self.enqueue_many([_with_job_id(payload, priority)], delay_seconds=delay_seconds)[0]
+
+    def enqueue_many(self, payloads: list[dict[str, Any]], delay_seconds: float = 0.0) -> list[str]:
+        items = [_with_job_id(p) for p in payloads]
+        if not items:
+            return []
+        with self._pool.connection() as conn:
+            with conn.cursor() as cur:
+                self._insert(cur, items, delay_seconds)
+        return [i["job_id"] for i in items]
+
+    def enqueue_unique(
+        self,
+        payload: dict[str, Any],
+        dedup_key: str,
+        priority: str | None = None,
+        delay_seconds: float = 0.0,
+        window_seconds: float | None = None,
+    ) -> tuple[str, bool]:
+        """창 안에 같은 dedup_key로 적재된 job이 있으면 적재하지 않고 (기존 job_id, True)를 반환한다."""
+        window = self.dedup_window_seconds if window_seconds is None else float(window_seconds)
+        item = _with_job_id(payload, priority)
+        now = time.time()
+        with self._pool.connection() as conn:
+            with conn.cursor() as cur:
+                # 만료된 key만 덮어쓴다. 행이 돌아오지 않으면 창 안의 기존 job이 있다는 뜻 (PK 행 잠금으로 동시 요청 직렬화).
+                cur.execute(
+                    """
+                    INSERT INTO task_queue_dedup (queue_name, dedup_key, job_id, expires_at)
+                    VALUES (%s, %s, %s, %s)
+                    ON CONFLICT (queue_name, dedup_key) DO UPDATE SET
+                        job_id = EXCLUDED.job_id,
+                        expires_at = EXCLUDED.expires_at
+                    WHERE task_queue_dedup.expires_at <= %s
+                    RETURNING job_id
+                    """,
+                    (self.queue_name, dedup_key, item["job_id"], now + window, now),
+                )
+                if cur.fetchone() is None:
+                    cur.execute(
+                        "SELECT job_id FROM task_queue_dedup WHERE queue_name = %s AND dedup_key = %s",
+                        (self.queue_name, dedup_key),
+                    )
+                    return cur.fetchone()["job_id"], True
+                self._insert(cur, [item], delay_seconds)
+        return item["job_id"], False
+
+    def _insert(self, cur, items: list[dict[str, Any]], delay_seconds: float) -> None:
+        _stamp_ready_at(items, delay_seconds)
+        available_at = time.time() + max(0.0, delay_seconds)
+        # sort_key: SqliteTaskQueue와 같은 aging 규칙. nack로 재적재된 job은 원래 enqueued_at 순번을 유지한다.
+        cur.executemany(
+            """
+            INSERT INTO task_jobs (job_id, queue_name, payload, sort_key, project_id, available_at)
+            VALUES (%s, %s, %s, %s, %s, %s)
+            """,
+            [
+                (
+                    i["job_id"],
+                    self.queue_name,
+                    json.dumps(i),
+                    float(i["enqueued_at"]) - _priority_rank(i["priority"]) * self.priority_aging_seconds,
+                    _project_of(i),
+                    available_at,
+                )
+                for i in items
+            ],
+        )
+        # NOTIFY는 commit 시점에 전달되므로 워커가 커밋 전 job을 보지 않는다.
+        # 지연 job은 만기 전 깨워도 claim할 수 없으므로 알리지 않는다 (워커의 dequeue timeout 폴링으로 수거).
+        if delay_seconds <= 0:
+            cur.execute("SELECT pg_notify(%s, %s)", (self.channel, str(len(items))))
+
+    def _claim(self, max_items: int) -> list[dict[str, Any]]:
+        if self.fair:
+            return self._claim_fair(max(1, int(max_items)))
+        now = time.time()
+        with self._pool.connection() as conn:
+            with conn.cursor() as cur:
+                # lease가 없거나 만료된(ack 전 워커 크래시) job을 lease와 함께 가져간다.
+                cur.execute(
+                    """
+                    UPDATE task_jobs SET leased_until = %s, claimed_by = %s, deliveries = deliveries + 1
+                    WHERE id IN (
+                        SELECT id FROM task_jobs
+                        WHERE queue_name = %s AND available_at <= %s
+                            AND (leased_until IS NULL OR leased_until < %s)
+                        ORDER BY sort_key, id
+                        FOR UPDATE SKIP LOCKED
+                        LIMIT %s
+                    )
+                    RETURNING id, payload, sort_key, deliveries
+                    """,
+                    (
+                        now + self.visibility_timeout_seconds,
+                        self.consumer_id,
+                        self.queue_name,
+                        now,
+                        now,
+                        max(1, int(max_items)),
+                    ),
+                )
+                rows = cur.fetchall()
+        rows.sort(key=lambda r: (r["sort_key"], r["id"]))
+        return [self._leased_payload(r) for r in rows]
+
+    def _claim_fair(self, max_items: int) -> list[dict[str, Any]]:
+        limits = self._limits.get()
+        now = time.time()
+        payloads: list[dict[str, Any]] = []
+        with self._pool.connection() as conn:
+            with conn.cursor() as cur:
+                # 프로젝트 선택과 상한 계산이 워커끼리 겹치지 않도록 큐 단위로 직렬화한다 (claim 자체는 짧다).
+                cur.execute("SELECT pg_advisory_xact_lock(hashtext(%s))", (self.queue_name,))
+                cur.execute(
+                    """
+                    SELECT project_id, COUNT(*) AS n FROM task_jobs
+                    WHERE queue_name = %s AND leased_until >= %s GROUP BY project_id
+                    """,
+                    (self.queue_name, now),
+                )
+                running = {r["project_id"]: int(r["n"]) for r in cur.fetchall()}
+                cur.execute(
+                    """
+                    SELECT j.project_id, COALESCE(f.last_served, 0) AS last_served
+                    FROM (
+                        SELECT DISTINCT project_id FROM task_jobs
+                        WHERE queue_name = %s AND available_at <= %s
+                            AND (leased_until IS NULL OR leased_until < %s)
+                    ) AS j
+                    LEFT JOIN task_queue_fairness AS f
+                        ON f.queue_name = %s AND f.project_id = j.project_id
+                    ORDER BY last_served, j.project_id
+                    """,
+                    (self.queue_name, now, now, self.queue_name),
+                )
+                candidates = [r["project_id"] for r in cur.fetchall()]
+                while candidates and len(payloads) < max_items:
+                    project = next(
+                        (p for p in candidates if not limits.get(p) or running.get(p, 0) < limits[p]),
+                        None,
+                    )
+                    if project is None:
+                        break
+                    cur.execute(
+                        """
+                        UPDATE task_jobs SET leased_until = %s, claimed_by = %s, deliveries = deliveries + 1
+                        WHERE id = (
+                            SELECT id FROM task_jobs
+                            WHERE queue_name = %s AND project_id = %s AND available_at <= %s
+                                AND (leased_until IS NULL OR leased_until < %s)
+                            ORDER BY sort_key, id
+                            FOR UPDATE SKIP LOCKED
+                            LIMIT 1
+                        )
+                        RETURNING payload, deliveries
+                        """,
+                        (
+                            now + self.visibility_timeout_seconds,
+                            self.consumer_id,
+                            self.queue_name,
+                            project,
+                            now,
+                            now,
+                        ),
+                    )
+                    row = cur.fetchone()
+                    candidates.remove(project)
+                    if row is None:
+                        continue
+                    payloads.append(self._leased_payload(row))
+                    running[project] = running.get(project, 0) + 1
+                    candidates.append(project)
+                    cur.execute(
+                        """
+                        INSERT INTO task_queue_fairness (queue_name, project_id, last_served)
+                        VALUES (%s, %s, %s)
+                        ON CONFLICT (queue_name, project_id) DO UPDATE SET last_served = EXCLUDED.last_served
+                        """,
+                        (self.queue_name, project, now + len(payloads) * 1e-6),
+                    )
+        return payloads
+
+    @staticmethod
+    def _load_payload(value) -> dict[str, Any]:
+        return json.loads(value) if isinstance(value, str) else dict(value)
+
+    @classmethod
+    def _leased_payload(cls, row) -> dict[str, Any]:
+        return {**cls._load_payload(row["payload"]), "delivery_count": int(row["deliveries"])}
+
+    def _listener(self):
+        conn = getattr(self._listeners, "conn", None)
+        if conn is None or conn.closed:
+            import psycopg
+            from psycopg import sql
+
+            conn = psycopg.connect(self.dsn, autocommit=True)
+            conn.execute(sql.SQL("LISTEN {}").format(sql.Identifier(self.channel)))
+            self._listeners.conn = conn
+        return conn
+
+    def _wait_for_notify(self, timeout_seconds: float) -> None:
+        if timeout_seconds <= 0:
+            return
+        conn = self._listener()
+        for _ in conn.notifies(timeout=timeout_seconds, stop_after=1):
+            break
+
+    def dequeue_many(self, max_items: int = 10, timeout_seconds: int = 1) -> list[dict[str, Any]]:
+        deadline = time.monotonic() + timeout_seconds
+        # LISTEN을 먼저 걸어 두어 claim 직후 들어온 NOTIFY를 놓치지 않는다.
+        self._listener()
+        while True:
+            jobs = self._claim(max_items)
+            if jobs:
+                return jobs
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return []
+            self._wait_for_notify(remaining)
+
+    def dequeue(self, timeout_seconds: int = 1) -> dict[str, Any] | None:
+        jobs = self.dequeue_many(1, timeout_seconds=timeout_seconds)
+        return jobs[0] if jobs else None
+
+    def ack(self, payload: dict[str, Any]) -> None:
+        job_id = payload.get("job_id")
+        if job_id:
+            with self._pool.connection() as conn:
+                conn.execute("DELETE FROM task_jobs WHERE job_id = %s", (job_id,))
+
+    def nack(self, payload: dict[str, Any], requeue: bool = True) -> None:
+        if not requeue:
+            self.ack(payload)
+            return
+        job_id = payload.get("job_id")
+        if job_id:
+            with self._pool.connection() as conn:
+                conn.execute(
+                    "UPDATE task_jobs SET leased_until = NULL, claimed_by = NULL WHERE job_id = %s",
+                    (job_id,),
+                )
+                conn.execute("SELECT pg_notify(%s, %s)", (self.channel, "1"))
+
+    def extend_lease(self, payloads: list[dict[str, Any]]) -> None:
+        """실행 중 job의 leased_until을 늘린다. 이미 다른 워커가 다시 가져간 job은 건드리지 않는다."""
+        job_ids = [str(p["job_id"]) for p in payloads if p.get("job_id")]
+        if not job_ids:
+            return
+        with self._pool.connection() as conn:
+            conn.execute(
+                """
+                UPDATE task_jobs SET leased_until = %s
+                WHERE job_id = ANY(%s) AND claimed_by = %s AND leased_until IS NOT NULL
+                """,
+                (time.time() + self.visibility_timeout_seconds, job_ids, self.consumer_id),
+            )
+
+    def dead_letter(self, payload: dict[str, Any], reason: str) -> None:
+        with self._pool.connection() as conn:
+            conn.execute(
+                "INSERT INTO task_dead_jobs (job_id, queue_name, payload, reason, dead_at) VALUES (%s, %s, %s, %s, %s)",
+                (payload.get("job_id"), self.queue_name, json.dumps(_requeue_payload(payload)), reason, time.time()),
+            )
+
+    def list_dead_letters(self, limit: int = 50) -> list[dict[str, Any]]:
+        with self._pool.connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    """
+                    SELECT job_id, payload, reason, dead_at FROM task_dead_jobs
+                    WHERE queue_name = %s
+                    ORDER BY id DESC
+                    LIMIT %s
+                    """,
+                    (self.queue_name, max(0, int(limit))),
+                )
+                rows = cur.fetchall()
+        return [
+            {
+                "job_id": r["job_id"],
+                "payload": self._load_payload(r["payload"]),
+                "reason": r["reason"],
+                "dead_at": r["dead_at"],
+            }
+            for r in rows
+        ]
+
+    def stats(self) -> dict[str, Any]:
+        """대기 job 수, 지연 job 수, 실행 중(ack 전) job 수, 가장 오래 기다린 job의 대기 시간."""
+        now = time.time()
+        with self._pool.connection() as conn:
+            with conn.cursor() as cur:
+                # lease가 만료된 job은 다음 claim이 다시 가져가므로 대기로 센다.
+                cur.execute(
+                    """
+                    SELECT
+                        COUNT(*) FILTER (WHERE ready AND available_at <= %s) AS depth,
+                        COUNT(*) FILTER (WHERE ready AND available_at > %s) AS delayed,
+                        COUNT(*) FILTER (WHERE NOT ready) AS inflight,
+                        MIN(available_at) FILTER (WHERE ready AND available_at <= %s) AS oldest
+                    FROM (
+                        SELECT available_at, (leased_until IS NULL OR leased_until < %s) AS ready
+                        FROM task_jobs
+                        WHERE queue_name = %s
+                    ) AS j
+                    """,
+                    (now, now, now, now, self.queue_name),
+                )
+                row = cur.fetchone()
+        return {
+            "queue_name": self.queue_name,
+            "depth": int(row["depth"]),
+            "delayed": int(row["delayed"]),
+            "inflight": int(row["inflight"]),
+            "oldest_age_seconds": max(0.0, now - row["oldest"]) if row["oldest"] is not None else 0.0,
+        }
+
+    def heartbeat(self, worker_id: str, state: dict[str, Any]) -> None:
+        record = _worker_record(worker_id, state)
+        with self._pool.connection() as conn:
+            conn.execute(
+                """
+                INSERT INTO task_queue_workers (queue_name, worker_id, state, last_seen) VALUES (%s, %s, %s, %s)
+                ON CONFLICT (queue_name, worker_id) DO UPDATE SET state = EXCLUDED.state, last_seen = EXCLUDED.last_seen
+                """,
+                (self.queue_name, worker_id, json.dumps(record), record["last_seen"]),
+            )
+
+    def remove_worker(self, worker_id: str) -> None:
+        with self._pool.connection() as conn:
+            conn.execute(
+                "DELETE FROM task_queue_workers WHERE queue_name = %s AND worker_id = %s",
+                (self.queue_name, worker_id),
+            )
+
+    def list_workers(self) -> list[dict[str, Any]]:
+        with self._pool.connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    "DELETE FROM task_queue_workers WHERE queue_name = %s AND last_seen < %s",
+                    (self.queue_name, time.time() - DEFAULT_WORKER_RETENTION_SECONDS),
+                )
+                cur.execute(
+                    "SELECT state FROM task_queue_workers WHERE queue_name = %s ORDER BY worker_id",
+                    (self.queue_name,),
+                )
+                rows = cur.fetchall()
+        return [self._load_payload(r["state"]) for r in rows]
+
+    def close(self) -> None:
+        conn = getattr(self._listeners, "conn", None)
+        if conn is not None:
+            conn.close()
+        self._pool.close()
 
 
-def create_task_queue() -> TaskQueue:
+def create_task_queue(project_limits: Callable[[], dict[str, int]] | None = None) -> TaskQueue:
+    """환경 변수로 큐 백엔드를 고른다. project_limits는 fair 모드의 프로젝트별 상한 조회 함수."""
     backend = (os.getenv("ARCHITECTURE_QUEUE_BACKEND") or "local").lower()
+    fair = os.getenv("ARCHITECTURE_QUEUE_FAIR", "0").strip() == "1"
+    visibility_timeout = float(os.getenv("ARCHITECTURE_QUEUE_VISIBILITY_TIMEOUT_SECONDS", "1800"))
+    aging_seconds = float(
+        os.getenv("ARCHITECTURE_QUEUE_PRIORITY_AGING_SECONDS", str(DEFAULT_PRIORITY_AGING_SECONDS))
+    )
+    dedup_window = float(os.getenv("ARCHITECTURE_QUEUE_DEDUP_WINDOW_SECONDS", str(DEFAULT_DEDUP_WINDOW_SECONDS)))
     if backend == "redis":
         redis_url = os.getenv("ARCHITECTURE_REDIS_URL", "redis://127.0.0.1:6379/0")
-        return RedisTaskQueue(redis_url=redis_url)
-    return LocalTaskQueue()
+        return RedisTaskQueue(
+            redis_url=redis_url,
+            reliable=os.getenv("ARCHITECTURE_QUEUE_RELIABLE", "0").strip() == "1",
+            visibility_timeout_seconds=visibility_timeout,
+            fair=fair,
+            project_limits=project_limits,
+            priority_aging_seconds=aging_seconds,
+            dedup_window_seconds=dedup_window,
+        )
+    if backend == "postgres":
+        dsn = os.getenv("ARCHITECTURE_QUEUE_POSTGRES_DSN") or os.getenv("ARCHITECTURE_POSTGRES_DSN")
+        if not dsn:
+            raise ValueError("Postgres queue requires ARCHITECTURE_POSTGRES_DSN")
+        return PostgresTaskQueue(
+            dsn,
+            pool_max_size=int(os.getenv("ARCHITECTURE_QUEUE_POSTGRES_POOL_MAX_SIZE", "4")),
+            priority_aging_seconds=aging_seconds,
+            fair=fair,
+            project_limits=project_limits,
+            visibility_timeout_seconds=visibility_timeout,
+            dedup_window_seconds=dedup_window,
+        )
+    if backend == "sqlite":
+        db_path = (
+            os.getenv("ARCHITECTURE_QUEUE_SQLITE_PATH")
+            or os.getenv("ARCHITECTURE_DB_PATH")
+            or ".agent_architecture.db"
+        )
+        return SqliteTaskQueue(
+            db_path,
+            visibility_timeout_seconds=visibility_timeout,
+            priority_aging_seconds=aging_seconds,
+            fair=fair,
+            project_limits=project_limits,
+            dedup_window_seconds=dedup_window,
+        )
+    return LocalTaskQueue(fair=fair, project_limits=project_limits, dedup_window_seconds=dedup_window)
 
@@ -0,0 +1,229 @@
+"""모델별 LLM 호출 속도 제한: 분당 요청 수(RPM) + 분당 토큰 수(TPM) token bucket.
+
+Redis 백엔드는 모든 프로세스/pod가 같은 bucket을 나눠 쓰고, Redis가 없거나 장애면
+프로세스 내 bucket으로 대신한다. 한도를 넘는 호출은 실패시키지 않고 자리가 날 때까지 기다린다.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Protocol
+
+from core.metrics import Histogram
+
+# 대기 분포: 수십 ms ~ 수 분
+RATE_LIMIT_WAIT_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+
+@dataclass(slots=True, frozen=True)
+class RateLimit:
+    """분당 한도. 0이면 해당 축은 제한하지 않는다."""
+
+    requests_per_minute: float = 0.0
+    tokens_per_minute: float = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return self.requests_per_minute > 0 or self.tokens_per_minute > 0
+
+
+def _refill(level: float, elapsed: float, capacity: float) -> float:
+    return min(capacity, level + max(0.0, elapsed) * capacity / 60.0)
+
+
+class RateLimiterBackend(Protocol):
+    def reserve(self, key: str, limit: RateLimit, tokens: int) -> float: ...
+
+
+class LocalRateLimiterBackend:
+    """프로세스 내 token bucket. 다른 프로세스와 한도를 나누지 않는다."""
+
+    def __init__(self):
+        # (key, 축) -> (남은 양, 마지막 갱신 시각(monotonic))
+        self._buckets: dict[tuple[str, str], tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    def reserve(self, key: str, limit: RateLimit, tokens: int) -> float:
+        """요청 1건 + tokens를 예약하고, 예약분이 찰 때까지 기다려야 할 시간(초)을 반환한다."""
+        now = time.monotonic()
+        wait = 0.0
+        with self._lock:
+            for axis, capacity, cost in (
+                ("requests", limit.requests_per_minute, 1),
+                ("tokens", limit.tokens_per_minute, tokens),
+            ):
+                if capacity <= 0 or cost <= 0:
+                    continue
+                level, updated = self._buckets.get((key, axis), (capacity, now))
+                # 한도보다 큰 요청은 bucket이 가득 찬 만큼만 쓰게 해 영원히 막히지 않게 한다.
+                level = _refill(level, now - updated, capacity) - min(cost, capacity)
+                self._buckets[(key, axis)] = (level, now)
+                if level < 0:
+                    wait = max(wait, -level * 60.0 / capacity)
+        return wait
+
+
+# 요청/토큰 bucket을 한 번에 예약한다. 모자라면 음수(빚)로 두고 갚을 때까지의 대기 시간을 돌려준다.
+# 호출 순서대로 빚이 쌓이므로 대기 중인 호출이 재시도 경쟁 없이 차례로 풀린다.
+# pod 간 시계 차이가 refill 계산에 끼지 않도록 Redis 서버 시각(TIME)을 쓴다.
+# KEYS[1]=요청 bucket, KEYS[2]=토큰 bucket, ARGV = rpm, tpm, 요청 비용, 토큰 비용
+_REDIS_RESERVE_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local wait = 0
+for i = 1, 2 do
+    local capacity = tonumber(ARGV[i])
+    local cost = tonumber(ARGV[i + 2])
+    if capacity > 0 and cost > 0 then
+        local per_sec = capacity / 60
+        local state = redis.call('HMGET', KEYS[i], 'level', 'ts')
+        local level = tonumber(state[1]) or capacity
+        local ts = tonumber(state[2]) or now
+        level = math.min(capacity, level + math.max(0, now - ts) * per_sec)
+        level = level - math.min(cost, capacity)
+        if level < 0 then
+            wait = math.max(wait, -level / per_sec)
+        end
+        redis.call('HSET', KEYS[i], 'level', tostring(level), 'ts', tostring(now))
+        -- 가득 찰 때까지 걸리는 시간 뒤에는 키가 없어도 같은 상태다.
+        redis.call('PEXPIRE', KEYS[i], math.ceil((capacity - level) / per_sec * 1000) + 1000)
+    end
+end
+return tostring(wait)
+"""
+
+
+class RedisRateLimiterBackend:
+    """Redis에 bucket을 두어 모든 워커/pod가 같은 한도를 나눠 쓴다."""
+
+    def __init__(self, redis_url: str, prefix: str = "agent:llm_rate"):
+        try:
+            import redis
+        except Exception as e:
+            raise RuntimeError("Redis rate limiter를 사용하려면 redis 패키지가 필요합니다.") from e
+        self.prefix = prefix
+        self.client = redis.Redis.from_url(redis_url, decode_responses=True)
+        self._reserve_script = self.client.register_script(_REDIS_RESERVE_SCRIPT)
+
+    def reserve(self, key: str, limit: RateLimit, tokens: int) -> float:
+        return float(
+            self._reserve_script(
+                keys=[f"{self.prefix}:{key}:requests", f"{self.prefix}:{key}:tokens"],
+                args=[limit.requests_per_minute, limit.tokens_per_minute, 1, max(0, int(tokens))],
+            )
+        )
+
+
+class LLMRateLimiter:
+    """모델별 한도를 적용한다. 공유 백엔드 장애 시 프로세스 내 bucket으로 대신하고 호출은 막지 않는다."""
+
+    def __init__(
+        self,
+        limits: dict[str, RateLimit],
+        default_limit: RateLimit | None = None,
+        backend: RateLimiterBackend | None = None,
+        max_wait_seconds: float = 300.0,
+    ):
+        self.limits = dict(limits)
+        self.default_limit = default_limit or RateLimit()
+        self.backend = backend or LocalRateLimiterBackend()
+        self.max_wait_seconds = float(max_wait_seconds)
+        self._fallback = LocalRateLimiterBackend()
+        self.wait_seconds = Histogram(RATE_LIMIT_WAIT_BUCKETS)
+        self._counts_lock = threading.Lock()
+        self.calls_total = 0
+        self.throttled_total = 0
+        self.backend_errors_total = 0
+
+    def limit_for(self, model: str) -> RateLimit:
+        return self.limits.get(model, self.default_limit)
+
+    def acquire(self, model: str, tokens: int = 0) -> float:
+        """model 한도 안에서 호출 1건 + tokens를 확보할 때까지 기다리고, 기다린 시간(초)을 반환한다."""
+        limit = self.limit_for(model)
+        if not limit.enabled:
+            return 0.0
+        try:
+            wait = self.backend.reserve(model, limit, tokens)
+        except Exception as e:
+            with self._counts_lock:
+                self.backend_errors_total += 1
+            print(f"[rate-limit] shared limiter unavailable, using in-process bucket: {e}")
+            wait = self._fallback.reserve(model, limit, tokens)
+        # 빚이 너무 쌓였어도 호출은 보낸다 (provider 429 재시도에 맡김).
+        wait = min(max(0.0, wait), self.max_wait_seconds)
+        if wait > 0:
+            time.sleep(wait)
+        self.wait_seconds.observe(wait)
+        with self._counts_lock:
+            self.calls_total += 1
+            self.throttled_total += 1 if wait > 0 else 0
+        return wait
+
+    def metrics(self) -> dict:
+        with self._counts_lock:
+            counts = {
+                "calls_total": self.calls_total,
+                "throttled_total": self.throttled_total,
+                "backend_errors_total": self.backend_errors_total,
+            }
+        return {**counts, "backend": type(self.backend).__name__, "wait_seconds": self.wait_seconds.snapshot()}
+
+
+def parse_rate_limits(spec: str) -> dict[str, RateLimit]:
+    """`model=rpm:tpm,model2=rpm:tpm` 형식. tpm은 생략 가능 (0 = 제한 없음)."""
+    limits: dict[str, RateLimit] = {}
+    for item in (spec or "").split(","):
+        if "=" not in item:
+            continue
+        model, _, values = item.strip().rpartition("=")
+        rpm, _, tpm = values.partition(":")
+        limits[model.strip()] = RateLimit(float(rpm or 0), float(tpm or 0))
+    return limits
+
+
+def create_llm_rate_limiter() -> LLMRateLimiter | None:
+    """환경 변수로 limiter를 만든다. 한도가 하나도 없으면 None."""
+    limits = parse_rate_limits(os.getenv("LLM_RATE_LIMITS", ""))
+    default_limit = RateLimit(
+        float(os.getenv("LLM_RATE_LIMIT_RPM", "0") or 0),
+        float(os.getenv("LLM_RATE_LIMIT_TPM", "0") or 0),
+    )
+    if not default_limit.enabled and not any(limit.enabled for limit in limits.values()):
+        return None
+    backend_name = (os.getenv("LLM_RATE_LIMIT_BACKEND") or "").lower()
+    if not backend_name:
+        # 공유 큐가 Redis면 같은 Redis로 pod 간 한도를 나눈다.
+        queue_backend = (os.getenv("ARCHITECTURE_QUEUE_BACKEND") or "local").lower()
+        backend_name = "redis" if queue_backend == "redis" else "local"
+    backend: RateLimiterBackend | None = None
+    if backend_name == "redis":
+        redis_url = os.getenv("LLM_RATE_LIMIT_REDIS_URL") or os.getenv("ARCHITECTURE_REDIS_URL", "redis://127.0.0.1:6379/0")
+        try:
+            backend = RedisRateLimiterBackend(redis_url)
+        except RuntimeError as e:
+            print(f"[rate-limit] {e} in-process bucket으로 대신합니다.")
+    return LLMRateLimiter(
+        limits,
+        default_limit=default_limit,
+        backend=backend,
+        max_wait_seconds=float(os.getenv("LLM_RATE_LIMIT_MAX_WAIT_SECONDS", "300")),
+    )
+
+
+_limiter: LLMRateLimiter | None = None
+_limiter_loaded = False
+_limiter_lock = threading.Lock()
+
+
+def get_llm_rate_limiter() -> LLMRateLimiter | None:
+    """프로세스 공용 limiter (처음 호출 때 환경 변수로 생성)."""
+    global _limiter, _limiter_loaded
+    with _limiter_lock:
+        if not _limiter_loaded:
+            _limiter = create_llm_rate_limiter()
+            _limiter_loaded = True
+        return _limiter
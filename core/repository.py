@@ -2,16 +2,30 @@
 
 from __future__ import annotations
 
+import base64
+import json
 import sqlite3
 import threading
+import time
 import uuid
 import os
+from contextlib import contextmanager
+from contextvars import ContextVar
 from pathlib import Path
-from typing import Protocol
+from dataclasses import replace
+from typing import Any, Callable, Iterable, Iterator, Protocol
 
+from core.cache import RedisInvalidationBus, TTLCache
+from core.migrations import (
+    LATEST_VERSION,
+    apply_postgres_migrations,
+    apply_sqlite_migrations,
+    pending_versions,
+)
 from core.models import (
     AgentRole,
     ConversationMessage,
+    Page,
     Project,
     TaskSource,
     TaskStatus,
@@ -19,8 +33,17 @@ from core.models import (
     utc_now_iso,
 )
 
+# unit of work 버퍼: (상태 변경 목록, 대화 기록 목록)
+PendingWrites = tuple[list[tuple[str, TaskStatus]], list[ConversationMessage]]
+
+
+class _TransitionRejected(Exception):
+    """조건부 전이 불일치 시 같은 트랜잭션에 실린 버퍼 쓰기를 되돌리는 내부 신호."""
+
 
 class RepositoryBackend(Protocol):
+    def migrate(self) -> list[int]: ...
+    def schema_versions(self) -> set[int]: ...
     def upsert_project(self, project: Project) -> Project: ...
     def list_projects(self) -> list[Project]: ...
     def get_project(self, project_id: str) -> Project | None: ...
@@ -32,8 +55,26 @@ class RepositoryBackend(Protocol):
         source: TaskSource,
     ) -> WorkTask: ...
     def list_tasks(self, project_id: str | None = None) -> list[WorkTask]: ...
+    def list_tasks_page(
+        self,
+        project_id: str | None = None,
+        *,
+        limit: int = 100,
+        cursor: str | None = None,
+        direction: str = "desc",
+    ) -> Page: ...
     def get_task(self, task_id: str) -> WorkTask | None: ...
-    def update_task_status(self, task_id: str, status: TaskStatus) -> WorkTask | None: ...
+    def update_task_status(
+        self,
+        task_id: str,
+        status: TaskStatus,
+        expected_status: TaskStatus | Iterable[TaskStatus] | None = None,
+        message: ConversationMessage | None = None,
+        pending: PendingWrites | None = None,
+        *,
+        claimed_by: str | None = None,
+        expected_claimed_by: str | None = None,
+    ) -> WorkTask | None: ...
     def add_conversation(
         self,
         task_id: str,
@@ -41,90 +82,231 @@ class RepositoryBackend(Protocol):
         content: str,
         token_usage: int = 0,
     ) -> ConversationMessage: ...
+    def add_conversations(self, messages: list[ConversationMessage]) -> list[ConversationMessage]: ...
+    def write_batch(
+        self,
+        status_updates: list[tuple[str, TaskStatus]],
+        messages: list[ConversationMessage],
+    ) -> None: ...
     def list_conversations(self, task_id: str) -> list[ConversationMessage]: ...
+    def list_conversations_since(
+        self,
+        task_id: str,
+        after_seq: int = 0,
+        limit: int = 100,
+    ) -> list[ConversationMessage]: ...
+    def list_conversations_page(
+        self,
+        task_id: str,
+        *,
+        limit: int = 100,
+        cursor: str | None = None,
+        direction: str = "asc",
+    ) -> Page: ...
+
+
+MAX_PAGE_LIMIT = 500
+
+
+def _encode_cursor(values: tuple) -> str:
+    raw = json.dumps(list(values), separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(cursor: str, size: int) -> tuple:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except Exception as e:
+        raise ValueError("Invalid cursor") from e
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError("Invalid cursor")
+    return tuple(values)
+
+
+def _expected_status_values(expected: TaskStatus | Iterable[TaskStatus] | None) -> list[str]:
+    if expected is None:
+        return []
+    if isinstance(expected, TaskStatus):
+        return [expected.value]
+    return [TaskStatus(s).value for s in expected]
+
+
+def _group_by_task(messages: list[ConversationMessage]) -> dict[str, list[ConversationMessage]]:
+    groups: dict[str, list[ConversationMessage]] = {}
+    for message in messages:
+        groups.setdefault(message.task_id, []).append(message)
+    return groups
+
+
+def _page_params(limit: int, direction: str) -> tuple[int, str, str]:
+    """(limit, ORDER 방향, keyset 비교 연산자)를 검증해 반환한다."""
+    direction = direction.lower()
+    if direction not in {"asc", "desc"}:
+        raise ValueError("direction must be asc|desc")
+    limit = max(1, min(int(limit), MAX_PAGE_LIMIT))
+    return limit, direction.upper(), ">" if direction == "asc" else "<"
 
 
 class SqliteRepository:
-    """프로젝트/태스크/대화 데이터를 SQLite에 저장한다."""
+    """프로젝트/태스크/대화 데이터를 SQLite에 저장한다.
+
+    pooled=True이면 스레드별 reader 커넥션 + 단일 writer 커넥션을 재사용하고
+    WAL 저널을 켜서 읽기가 writer lock을 기다리지 않도록 한다.
+    """
 
-    def __init__(self, db_path: str):
+    def __init__(
+        self,
+        db_path: str,
+        *,
+        pooled: bool = False,
+        synchronous: str = "NORMAL",
+        busy_timeout_ms: int = 5000,
+        auto_migrate: bool = True,
+    ):
         self.db_path = str(Path(db_path))
+        self.pooled = pooled
+        self.auto_migrate = auto_migrate
+        self.synchronous = synchronous.upper()
+        if self.synchronous not in {"OFF", "NORMAL", "FULL", "EXTRA"}:
+            raise ValueError("SQLite synchronous must be OFF|NORMAL|FULL|EXTRA")
+        self.busy_timeout_ms = int(busy_timeout_ms)
         self._lock = threading.Lock()
+        self._local = threading.local()
+        self._pool_lock = threading.Lock()
+        # 스레드 ident -> 그 스레드의 reader 커넥션. 끝난 스레드의 커넥션은 새 reader를 만들 때 닫는다.
+        self._reader_conns: dict[int, sqlite3.Connection] = {}
+        self._writer_conn: sqlite3.Connection | None = None
+        if self.pooled:
+            self._writer_conn = self._connect()
         self._init_db()
 
     def _connect(self) -> sqlite3.Connection:
-        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        conn = sqlite3.connect(
+            self.db_path,
+            check_same_thread=False,
+            timeout=self.busy_timeout_ms / 1000,
+        )
         conn.row_factory = sqlite3.Row
         conn.execute("PRAGMA foreign_keys = ON")
+        if self.pooled:
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute(f"PRAGMA synchronous = {self.synchronous}")
+            conn.execute(f"PRAGMA busy_timeout = {self.busy_timeout_ms}")
         return conn
 
-    def _init_db(self) -> None:
+    @contextmanager
+    def _reader(self) -> Iterator[sqlite3.Connection]:
+        """읽기 커넥션. pooled 모드에서는 스레드별 커넥션을 재사용한다."""
+        if not self.pooled:
+            conn = self._connect()
+            try:
+                yield conn
+            finally:
+                conn.close()
+            return
+
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+            with self._pool_lock:
+                stale = self._prune_dead_readers()
+                # ident가 재사용됐다면 남아 있던 커넥션은 끝난 스레드의 것이다.
+                previous = self._reader_conns.pop(threading.get_ident(), None)
+                if previous is not None:
+                    stale.append(previous)
+                self._reader_conns[threading.get_ident()] = conn
+            for dead in stale:
+                dead.close()
+        yield conn
+
+    def _prune_dead_readers(self) -> list[sqlite3.Connection]:
+        """끝난 스레드(스레드별 커넥션을 더 쓰지 않음)의 reader를 목록에서 빼서 돌려준다. _pool_lock 안에서 호출."""
+        alive = {thread.ident for thread in threading.enumerate()}
+        return [self._reader_conns.pop(ident) for ident in list(self._reader_conns) if ident not in alive]
+
+    @contextmanager
+    def _writer(self) -> Iterator[sqlite3.Connection]:
+        """쓰기 커넥션. lock 안에서 트랜잭션 단위로 commit/rollback 한다."""
         with self._lock:
-            with self._connect() as conn:
-                conn.executescript(
-                    """
-                    CREATE TABLE IF NOT EXISTS projects (
-                        project_id TEXT PRIMARY KEY,
-                        name TEXT NOT NULL,
-                        repo_url TEXT NOT NULL,
-                        default_branch TEXT NOT NULL,
-                        tech_stack TEXT NOT NULL
-                    );
-
-                    CREATE TABLE IF NOT EXISTS tasks (
-                        task_id TEXT PRIMARY KEY,
-                        project_id TEXT NOT NULL,
-                        title TEXT NOT NULL,
-                        description TEXT NOT NULL,
-                        source TEXT NOT NULL,
-                        status TEXT NOT NULL,
-                        created_at TEXT NOT NULL,
-                        FOREIGN KEY(project_id) REFERENCES projects(project_id)
-                    );
-
-                    CREATE TABLE IF NOT EXISTS conversations (
-                        message_id TEXT PRIMARY KEY,
-                        task_id TEXT NOT NULL,
-                        agent_role TEXT NOT NULL,
-                        content TEXT NOT NULL,
-                        timestamp TEXT NOT NULL,
-                        token_usage INTEGER NOT NULL DEFAULT 0,
-                        FOREIGN KEY(task_id) REFERENCES tasks(task_id)
-                    );
-                    """
-                )
-                conn.commit()
+            conn = self._writer_conn if self.pooled else self._connect()
+            try:
+                with conn:
+                    yield conn
+            finally:
+                if not self.pooled:
+                    conn.close()
+
+    def pool_stats(self) -> dict:
+        with self._pool_lock:
+            readers = len(self._reader_conns)
+        return {
+            "enabled": self.pooled,
+            "reader_connections": readers,
+            "writer_connection": self._writer_conn is not None,
+        }
+
+    def close(self) -> None:
+        with self._pool_lock:
+            conns = list(self._reader_conns.values())
+            self._reader_conns.clear()
+        for conn in conns:
+            conn.close()
+        self._local = threading.local()
+        with self._lock:
+            if self._writer_conn is not None:
+                self._writer_conn.close()
+                self._writer_conn = None
+
+    def _init_db(self) -> None:
+        if self.auto_migrate:
+            self.migrate()
+
+    def migrate(self) -> list[int]:
+        with self._writer() as conn:
+            return apply_sqlite_migrations(conn)
+
+    def schema_versions(self) -> set[int]:
+        with self._reader() as conn:
+            exists = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'schema_version'"
+            ).fetchone()
+            if not exists:
+                return set()
+            rows = conn.execute("SELECT version FROM schema_version").fetchall()
+        return {int(r["version"]) for r in rows}
 
     # ---------- projects ----------
     def upsert_project(self, project: Project) -> Project:
-        with self._lock:
-            with self._connect() as conn:
-                conn.execute(
-                    """
-                    INSERT INTO projects (project_id, name, repo_url, default_branch, tech_stack)
-                    VALUES (?, ?, ?, ?, ?)
-                    ON CONFLICT(project_id) DO UPDATE SET
-                        name=excluded.name,
-                        repo_url=excluded.repo_url,
-                        default_branch=excluded.default_branch,
-                        tech_stack=excluded.tech_stack
-                    """,
-                    (
-                        project.project_id,
-                        project.name,
-                        project.repo_url,
-                        project.default_branch,
-                        project.tech_stack,
-                    ),
-                )
-                conn.commit()
+        with self._writer() as conn:
+            conn.execute(
+                """
+                INSERT INTO projects (project_id, name, repo_url, default_branch, tech_stack, max_concurrency)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(project_id) DO UPDATE SET
+                    name=excluded.name,
+                    repo_url=excluded.repo_url,
+                    default_branch=excluded.default_branch,
+                    tech_stack=excluded.tech_stack,
+                    max_concurrency=excluded.max_concurrency
+                """,
+                (
+                    project.project_id,
+                    project.name,
+                    project.repo_url,
+                    project.default_branch,
+                    project.tech_stack,
+                    project.max_concurrency,
+                ),
+            )
         return project
 
     def list_projects(self) -> list[Project]:
-        with self._connect() as conn:
+        with self._reader() as conn:
             rows = conn.execute(
                 """
-                SELECT project_id, name, repo_url, default_branch, tech_stack
+                SELECT project_id, name, repo_url, default_branch, tech_stack, max_concurrency
                 FROM projects
                 ORDER BY name ASC
                 """
@@ -132,10 +314,10 @@ class SqliteRepository:
         return [self._row_to_project(r) for r in rows]
 
     def get_project(self, project_id: str) -> Project | None:
-        with self._connect() as conn:
+        with self._reader() as conn:
             row = conn.execute(
                 """
-                SELECT project_id, name, repo_url, default_branch, tech_stack
+                SELECT project_id, name, repo_url, default_branch, tech_stack, max_concurrency
                 FROM projects
                 WHERE project_id = ?
                 """,
@@ -160,29 +342,27 @@ class SqliteRepository:
             status=TaskStatus.PENDING,
             created_at=utc_now_iso(),
         )
-        with self._lock:
-            with self._connect() as conn:
-                conn.execute(
-                    """
-                    INSERT INTO tasks (task_id, project_id, title, description, source, status, created_at)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                    """,
-                    (
-                        task.task_id,
-                        task.project_id,
-                        task.title,
-                        task.description,
-                        task.source.value,
-                        task.status.value,
-                        task.created_at,
-                    ),
-                )
-                conn.commit()
+        with self._writer() as conn:
+            conn.execute(
+                """
+                INSERT INTO tasks (task_id, project_id, title, description, source, status, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    task.task_id,
+                    task.project_id,
+                    task.title,
+                    task.description,
+                    task.source.value,
+                    task.status.value,
+                    task.created_at,
+                ),
+            )
         return task
 
     def list_tasks(self, project_id: str | None = None) -> list[WorkTask]:
         query = """
-            SELECT task_id, project_id, title, description, source, status, created_at
+            SELECT task_id, project_id, title, description, source, status, created_at, claimed_by
             FROM tasks
         """
         params: tuple = ()
@@ -191,15 +371,50 @@ class SqliteRepository:
             params = (project_id,)
         query += " ORDER BY created_at DESC"
 
-        with self._connect() as conn:
+        with self._reader() as conn:
             rows = conn.execute(query, params).fetchall()
         return [self._row_to_task(r) for r in rows]
 
+    def list_tasks_page(
+        self,
+        project_id: str | None = None,
+        *,
+        limit: int = 100,
+        cursor: str | None = None,
+        direction: str = "desc",
+    ) -> Page:
+        limit, order, op = _page_params(limit, direction)
+        clauses: list[str] = []
+        params: list = []
+        if project_id:
+            clauses.append("project_id = ?")
+            params.append(project_id)
+        if cursor:
+            clauses.append(f"(created_at, task_id) {op} (?, ?)")
+            params.extend(_decode_cursor(cursor, 2))
+        query = """
+            SELECT task_id, project_id, title, description, source, status, created_at, claimed_by
+            FROM tasks
+        """
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += f" ORDER BY created_at {order}, task_id {order} LIMIT ?"
+        params.append(limit + 1)
+
+        with self._reader() as conn:
+            rows = conn.execute(query, params).fetchall()
+        tasks = [self._row_to_task(r) for r in rows[:limit]]
+        next_cursor = None
+        if len(rows) > limit:
+            last = tasks[-1]
+            next_cursor = _encode_cursor((last.created_at, last.task_id))
+        return Page(items=tasks, next_cursor=next_cursor)
+
     def get_task(self, task_id: str) -> WorkTask | None:
-        with self._connect() as conn:
+        with self._reader() as conn:
             row = conn.execute(
                 """
-                SELECT task_id, project_id, title, description, source, status, created_at
+                SELECT task_id, project_id, title, description, source, status, created_at, claimed_by
                 FROM tasks
                 WHERE task_id = ?
                 """,
@@ -207,15 +422,63 @@ class SqliteRepository:
             ).fetchone()
         return self._row_to_task(row) if row else None
 
-    def update_task_status(self, task_id: str, status: TaskStatus) -> WorkTask | None:
-        with self._lock:
-            with self._connect() as conn:
-                conn.execute(
-                    "UPDATE tasks SET status = ? WHERE task_id = ?",
-                    (status.value, task_id),
-                )
-                conn.commit()
-        return self.get_task(task_id)
+    def update_task_status(
+        self,
+        task_id: str,
+        status: TaskStatus,
+        expected_status: TaskStatus | Iterable[TaskStatus] | None = None,
+        message: ConversationMessage | None = None,
+        pending: PendingWrites | None = None,
+        *,
+        claimed_by: str | None = None,
+        expected_claimed_by: str | None = None,
+    ) -> WorkTask | None:
+        """UPDATE ... RETURNING 한 번으로 상태를 바꾸고 변경된 행을 돌려준다.
+
+        expected_status가 있으면 현재 상태가 일치할 때만 전이한다(불일치 시 None).
+        claimed_by(선점 소유자)는 전이마다 새로 기록하고(None이면 비움), expected_claimed_by가 있으면 소유자도 일치해야 한다.
+        message가 있으면 같은 트랜잭션에서 seq를 발급해 함께 기록한다.
+        pending(unit of work 버퍼)은 전이 앞에 같은 트랜잭션으로 쓰고, 전이가 불일치면 함께 되돌린다.
+        """
+        expected = _expected_status_values(expected_status)
+        query = "UPDATE tasks SET status = ?, claimed_by = ?, last_message_seq = last_message_seq + ? WHERE task_id = ?"
+        params: list = [status.value, claimed_by, 1 if message is not None else 0, task_id]
+        if expected:
+            query += f" AND status IN ({', '.join('?' for _ in expected)})"
+            params.extend(expected)
+        if expected_claimed_by is not None:
+            query += " AND claimed_by = ?"
+            params.append(expected_claimed_by)
+        query += " RETURNING task_id, project_id, title, description, source, status, created_at, claimed_by, last_message_seq"
+
+        try:
+            with self._writer() as conn:
+                if pending is not None:
+                    self._write_batch(conn, *pending)
+                rows = conn.execute(query, params).fetchall()
+                if not rows:
+                    raise _TransitionRejected
+                row = rows[0]
+                if message is not None:
+                    message.seq = int(row["last_message_seq"])
+                    conn.execute(
+                        """
+                        INSERT INTO conversations (message_id, task_id, agent_role, content, timestamp, token_usage, seq)
+                        VALUES (?, ?, ?, ?, ?, ?, ?)
+                        """,
+                        (
+                            message.message_id,
+                            message.task_id,
+                            message.agent_role.value,
+                            message.content,
+                            message.timestamp,
+                            message.token_usage,
+                            message.seq,
+                        ),
+                    )
+        except _TransitionRejected:
+            return None
+        return self._row_to_task(row)
 
     # ---------- conversations ----------
     def add_conversation(
@@ -225,46 +488,143 @@ class SqliteRepository:
         content: str,
         token_usage: int = 0,
     ) -> ConversationMessage:
-        message = ConversationMessage(
-            message_id=str(uuid.uuid4()),
-            task_id=task_id,
-            agent_role=agent_role,
-            content=content,
-            timestamp=utc_now_iso(),
-            token_usage=token_usage,
-        )
-        with self._lock:
-            with self._connect() as conn:
-                conn.execute(
-                    """
-                    INSERT INTO conversations (message_id, task_id, agent_role, content, timestamp, token_usage)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                    """,
-                    (
-                        message.message_id,
-                        message.task_id,
-                        message.agent_role.value,
-                        message.content,
-                        message.timestamp,
-                        message.token_usage,
-                    ),
-                )
-                conn.commit()
+        message = ConversationMessage.new(task_id, agent_role, content, token_usage)
+        with self._writer() as conn:
+            message.seq = self._reserve_message_seqs(conn, task_id, 1)
+            conn.execute(
+                """
+                INSERT INTO conversations (message_id, task_id, agent_role, content, timestamp, token_usage, seq)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    message.message_id,
+                    message.task_id,
+                    message.agent_role.value,
+                    message.content,
+                    message.timestamp,
+                    message.token_usage,
+                    message.seq,
+                ),
+            )
         return message
 
     def list_conversations(self, task_id: str) -> list[ConversationMessage]:
-        with self._connect() as conn:
-            rows = conn.execute(
-                """
-                SELECT message_id, task_id, agent_role, content, timestamp, token_usage
-                FROM conversations
-                WHERE task_id = ?
-                ORDER BY timestamp ASC
-                """,
-                (task_id,),
-            ).fetchall()
+        query = """
+            SELECT message_id, task_id, agent_role, content, timestamp, token_usage, seq
+            FROM conversations
+            WHERE task_id = ?
+            ORDER BY seq ASC
+        """
+        with self._reader() as conn:
+            rows = conn.execute(query, (task_id,)).fetchall()
+        return [self._row_to_message(r) for r in rows]
+
+    def list_conversations_since(
+        self,
+        task_id: str,
+        after_seq: int = 0,
+        limit: int = 100,
+    ) -> list[ConversationMessage]:
+        query = """
+            SELECT message_id, task_id, agent_role, content, timestamp, token_usage, seq
+            FROM conversations
+            WHERE task_id = ? AND seq > ?
+            ORDER BY seq ASC
+            LIMIT ?
+        """
+        with self._reader() as conn:
+            rows = conn.execute(query, (task_id, int(after_seq), max(1, min(int(limit), MAX_PAGE_LIMIT)))).fetchall()
         return [self._row_to_message(r) for r in rows]
 
+    def list_conversations_page(
+        self,
+        task_id: str,
+        *,
+        limit: int = 100,
+        cursor: str | None = None,
+        direction: str = "asc",
+    ) -> Page:
+        limit, order, op = _page_params(limit, direction)
+        query = """
+            SELECT message_id, task_id, agent_role, content, timestamp, token_usage, seq
+            FROM conversations
+            WHERE task_id = ?
+        """
+        params: list = [task_id]
+        if cursor:
+            query += f" AND seq {op} ?"
+            params.extend(_decode_cursor(cursor, 1))
+        query += f" ORDER BY seq {order} LIMIT ?"
+        params.append(limit + 1)
+
+        with self._reader() as conn:
+            rows = conn.execute(query, params).fetchall()
+        messages = [self._row_to_message(r) for r in rows[:limit]]
+        next_cursor = None
+        if len(rows) > limit:
+            next_cursor = _encode_cursor((messages[-1].seq,))
+        return Page(items=messages, next_cursor=next_cursor)
+
+    def add_conversations(self, messages: list[ConversationMessage]) -> list[ConversationMessage]:
+        self.write_batch([], messages)
+        return messages
+
+    def write_batch(
+        self,
+        status_updates: list[tuple[str, TaskStatus]],
+        messages: list[ConversationMessage],
+    ) -> None:
+        """상태 변경과 대화 기록을 한 트랜잭션으로 반영한다."""
+        if not status_updates and not messages:
+            return
+        with self._writer() as conn:
+            self._write_batch(conn, status_updates, messages)
+
+    def _write_batch(
+        self,
+        conn: sqlite3.Connection,
+        status_updates: list[tuple[str, TaskStatus]],
+        messages: list[ConversationMessage],
+    ) -> None:
+        if status_updates:
+            conn.executemany(
+                "UPDATE tasks SET status = ? WHERE task_id = ?",
+                [(status.value, task_id) for task_id, status in status_updates],
+            )
+        if not messages:
+            return
+        for task_id, group in _group_by_task(messages).items():
+            first = self._reserve_message_seqs(conn, task_id, len(group))
+            for offset, message in enumerate(group):
+                message.seq = first + offset
+        conn.executemany(
+            """
+            INSERT INTO conversations (message_id, task_id, agent_role, content, timestamp, token_usage, seq)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            [
+                (
+                    m.message_id,
+                    m.task_id,
+                    m.agent_role.value,
+                    m.content,
+                    m.timestamp,
+                    m.token_usage,
+                    m.seq,
+                )
+                for m in messages
+            ],
+        )
+
+    @staticmethod
+    def _reserve_message_seqs(conn: sqlite3.Connection, task_id: str, count: int) -> int:
+        """tasks.last_message_seq를 count만큼 올리고 예약된 첫 seq를 반환한다."""
+        row = conn.execute(
+            "UPDATE tasks SET last_message_seq = last_message_seq + ? WHERE task_id = ? RETURNING last_message_seq",
+            (count, task_id),
+        ).fetchone()
+        return int(row[0]) - count + 1 if row else 0
+
     # ---------- row mappers ----------
     @staticmethod
     def _row_to_project(row: sqlite3.Row) -> Project:
@@ -274,6 +634,7 @@ class SqliteRepository:
             repo_url=row["repo_url"],
             default_branch=row["default_branch"],
             tech_stack=row["tech_stack"],
+            max_concurrency=int(row["max_concurrency"]),
         )
 
     @staticmethod
@@ -286,6 +647,7 @@ class SqliteRepository:
             source=TaskSource(row["source"]),
             status=TaskStatus(row["status"]),
             created_at=row["created_at"],
+            claimed_by=row["claimed_by"],
         )
 
     @staticmethod
@@ -297,15 +659,42 @@ class SqliteRepository:
             content=row["content"],
             timestamp=row["timestamp"],
             token_usage=row["token_usage"],
+            seq=row["seq"],
         )
 
 
 class PostgresRepository:
-    """프로젝트/태스크/대화 데이터를 Postgres에 저장한다."""
+    """프로젝트/태스크/대화 데이터를 Postgres에 저장한다.
+
+    pool_max_size > 0이면 psycopg_pool 커넥션 풀을 사용하고
+    모든 메서드가 풀에서 커넥션을 빌려 쓴다.
+    """
 
-    def __init__(self, dsn: str):
+    def __init__(
+        self,
+        dsn: str,
+        *,
+        pool_min_size: int = 0,
+        pool_max_size: int = 0,
+        pool_max_idle_seconds: float = 300.0,
+        pool_timeout_seconds: float = 30.0,
+        auto_migrate: bool = True,
+    ):
         self.dsn = dsn
+        self.auto_migrate = auto_migrate
         self._lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._checkouts_total = 0
+        self._checkout_seconds_total = 0.0
+        self._checkout_seconds_max = 0.0
+        self._pool = None
+        if pool_max_size > 0:
+            self._pool = self._create_pool(
+                min_size=max(0, min(pool_min_size, pool_max_size)),
+                max_size=pool_max_size,
+                max_idle=pool_max_idle_seconds,
+                timeout=pool_timeout_seconds,
+            )
         self._init_db()
 
     def _connect(self):
@@ -319,80 +708,137 @@ class PostgresRepository:
             ) from e
         return psycopg.connect(self.dsn, row_factory=dict_row)
 
-    def _init_db(self) -> None:
-        with self._lock:
+    def _create_pool(self, *, min_size: int, max_size: int, max_idle: float, timeout: float):
+        try:
+            from psycopg.rows import dict_row
+            from psycopg_pool import ConnectionPool
+        except Exception as e:
+            raise RuntimeError(
+                "Postgres 커넥션 풀을 사용하려면 psycopg_pool이 필요합니다. "
+                "requirements 설치 후 다시 시도하세요."
+            ) from e
+        pool = ConnectionPool(
+            self.dsn,
+            min_size=min_size,
+            max_size=max_size,
+            max_idle=max_idle,
+            timeout=timeout,
+            kwargs={"row_factory": dict_row},
+            check=ConnectionPool.check_connection,
+            open=False,
+        )
+        pool.open(wait=min_size > 0, timeout=timeout)
+        return pool
+
+    @contextmanager
+    def _connection(self) -> Iterator[Any]:
+        """커넥션을 빌려 블록 종료 시 commit(예외 시 rollback) 한다."""
+        if self._pool is None:
             with self._connect() as conn:
-                with conn.cursor() as cur:
-                    cur.execute(
-                        """
-                        CREATE TABLE IF NOT EXISTS projects (
-                            project_id TEXT PRIMARY KEY,
-                            name TEXT NOT NULL,
-                            repo_url TEXT NOT NULL,
-                            default_branch TEXT NOT NULL,
-                            tech_stack TEXT NOT NULL
-                        )
-                        """
-                    )
-                    cur.execute(
-                        """
-                        CREATE TABLE IF NOT EXISTS tasks (
-                            task_id TEXT PRIMARY KEY,
-                            project_id TEXT NOT NULL REFERENCES projects(project_id),
-                            title TEXT NOT NULL,
-                            description TEXT NOT NULL,
-                            source TEXT NOT NULL,
-                            status TEXT NOT NULL,
-                            created_at TEXT NOT NULL
-                        )
-                        """
-                    )
-                    cur.execute(
-                        """
-                        CREATE TABLE IF NOT EXISTS conversations (
-                            message_id TEXT PRIMARY KEY,
-                            task_id TEXT NOT NULL REFERENCES tasks(task_id),
-                            agent_role TEXT NOT NULL,
-                            content TEXT NOT NULL,
-                            timestamp TEXT NOT NULL,
-                            token_usage INTEGER NOT NULL DEFAULT 0
-                        )
-                        """
-                    )
-                conn.commit()
+                yield conn
+            return
+
+        started = time.perf_counter()
+        with self._pool.connection() as conn:
+            self._record_checkout(time.perf_counter() - started)
+            yield conn
+
+    @contextmanager
+    def _writer(self) -> Iterator[Any]:
+        # 풀 모드에서는 동시성 제어를 DB에 맡기고 프로세스 lock을 잡지 않는다.
+        if self._pool is not None:
+            with self._connection() as conn:
+                yield conn
+            return
+        with self._lock:
+            with self._connection() as conn:
+                yield conn
+
+    def _record_checkout(self, elapsed: float) -> None:
+        with self._stats_lock:
+            self._checkouts_total += 1
+            self._checkout_seconds_total += elapsed
+            self._checkout_seconds_max = max(self._checkout_seconds_max, elapsed)
+
+    def pool_stats(self) -> dict:
+        if self._pool is None:
+            return {"enabled": False}
+        stats = self._pool.get_stats()
+        pool_size = int(stats.get("pool_size", 0))
+        available = int(stats.get("pool_available", 0))
+        with self._stats_lock:
+            checkouts = self._checkouts_total
+            avg_ms = (self._checkout_seconds_total / checkouts * 1000) if checkouts else 0.0
+            max_ms = self._checkout_seconds_max * 1000
+        return {
+            "enabled": True,
+            "min_size": self._pool.min_size,
+            "max_size": self._pool.max_size,
+            "size": pool_size,
+            "in_use": max(0, pool_size - available),
+            "available": available,
+            "waiting": int(stats.get("requests_waiting", 0)),
+            "checkouts_total": checkouts,
+            "checkout_latency_ms_avg": round(avg_ms, 3),
+            "checkout_latency_ms_max": round(max_ms, 3),
+            "connection_errors_total": int(stats.get("connections_errors", 0)),
+        }
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.close()
+
+    def _init_db(self) -> None:
+        if self.auto_migrate:
+            self.migrate()
+
+    def migrate(self) -> list[int]:
+        with self._writer() as conn:
+            return apply_postgres_migrations(conn)
+
+    def schema_versions(self) -> set[int]:
+        with self._connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("SELECT to_regclass('schema_version') AS name")
+                row = cur.fetchone()
+                if not row or row["name"] is None:
+                    return set()
+                cur.execute("SELECT version FROM schema_version")
+                rows = cur.fetchall()
+        return {int(r["version"]) for r in rows}
 
     # ---------- projects ----------
     def upsert_project(self, project: Project) -> Project:
-        with self._lock:
-            with self._connect() as conn:
-                with conn.cursor() as cur:
-                    cur.execute(
-                        """
-                        INSERT INTO projects (project_id, name, repo_url, default_branch, tech_stack)
-                        VALUES (%s, %s, %s, %s, %s)
-                        ON CONFLICT(project_id) DO UPDATE SET
-                            name=EXCLUDED.name,
-                            repo_url=EXCLUDED.repo_url,
-                            default_branch=EXCLUDED.default_branch,
-                            tech_stack=EXCLUDED.tech_stack
-                        """,
-                        (
-                            project.project_id,
-                            project.name,
-                            project.repo_url,
-                            project.default_branch,
-                            project.tech_stack,
-                        ),
-                    )
-                conn.commit()
+        with self._writer() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    """
+                    INSERT INTO projects (project_id, name, repo_url, default_branch, tech_stack, max_concurrency)
+                    VALUES (%s, %s, %s, %s, %s, %s)
+                    ON CONFLICT(project_id) DO UPDATE SET
+                        name=EXCLUDED.name,
+                        repo_url=EXCLUDED.repo_url,
+                        default_branch=EXCLUDED.default_branch,
+                        tech_stack=EXCLUDED.tech_stack,
+                        max_concurrency=EXCLUDED.max_concurrency
+                    """,
+                    (
+                        project.project_id,
+                        project.name,
+                        project.repo_url,
+                        project.default_branch,
+                        project.tech_stack,
+                        project.max_concurrency,
+                    ),
+                )
         return project
 
     def list_projects(self) -> list[Project]:
-        with self._connect() as conn:
+        with self._connection() as conn:
             with conn.cursor() as cur:
                 cur.execute(
                     """
-                    SELECT project_id, name, repo_url, default_branch, tech_stack
+                    SELECT project_id, name, repo_url, default_branch, tech_stack, max_concurrency
                     FROM projects
                     ORDER BY name ASC
                     """
@@ -401,11 +847,11 @@ class PostgresRepository:
         return [self._row_to_project(r) for r in rows]
 
     def get_project(self, project_id: str) -> Project | None:
-        with self._connect() as conn:
+        with self._connection() as conn:
             with conn.cursor() as cur:
                 cur.execute(
                     """
-                    SELECT project_id, name, repo_url, default_branch, tech_stack
+                    SELECT project_id, name, repo_url, default_branch, tech_stack, max_concurrency
                     FROM projects
                     WHERE project_id = %s
                     """,
@@ -431,30 +877,28 @@ class PostgresRepository:
             status=TaskStatus.PENDING,
             created_at=utc_now_iso(),
         )
-        with self._lock:
-            with self._connect() as conn:
-                with conn.cursor() as cur:
-                    cur.execute(
-                        """
-                        INSERT INTO tasks (task_id, project_id, title, description, source, status, created_at)
-                        VALUES (%s, %s, %s, %s, %s, %s, %s)
-                        """,
-                        (
-                            task.task_id,
-                            task.project_id,
-                            task.title,
-                            task.description,
-                            task.source.value,
-                            task.status.value,
-                            task.created_at,
-                        ),
-                    )
-                conn.commit()
+        with self._writer() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    """
+                    INSERT INTO tasks (task_id, project_id, title, description, source, status, created_at)
+                    VALUES (%s, %s, %s, %s, %s, %s, %s)
+                    """,
+                    (
+                        task.task_id,
+                        task.project_id,
+                        task.title,
+                        task.description,
+                        task.source.value,
+                        task.status.value,
+                        task.created_at,
+                    ),
+                )
         return task
 
     def list_tasks(self, project_id: str | None = None) -> list[WorkTask]:
         query = """
-            SELECT task_id, project_id, title, description, source, status, created_at
+            SELECT task_id, project_id, title, description, source, status, created_at, claimed_by
             FROM tasks
         """
         params: tuple = ()
@@ -463,18 +907,55 @@ class PostgresRepository:
             params = (project_id,)
         query += " ORDER BY created_at DESC"
 
-        with self._connect() as conn:
+        with self._connection() as conn:
             with conn.cursor() as cur:
                 cur.execute(query, params)
                 rows = cur.fetchall()
         return [self._row_to_task(r) for r in rows]
 
+    def list_tasks_page(
+        self,
+        project_id: str | None = None,
+        *,
+        limit: int = 100,
+        cursor: str | None = None,
+        direction: str = "desc",
+    ) -> Page:
+        limit, order, op = _page_params(limit, direction)
+        clauses: list[str] = []
+        params: list = []
+        if project_id:
+            clauses.append("project_id = %s")
+            params.append(project_id)
+        if cursor:
+            clauses.append(f"(created_at, task_id) {op} (%s, %s)")
+            params.extend(_decode_cursor(cursor, 2))
+        query = """
+            SELECT task_id, project_id, title, description, source, status, created_at, claimed_by
+            FROM tasks
+        """
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += f" ORDER BY created_at {order}, task_id {order} LIMIT %s"
+        params.append(limit + 1)
+
+        with self._connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(query, params)
+                rows = cur.fetchall()
+        tasks = [self._row_to_task(r) for r in rows[:limit]]
+        next_cursor = None
+        if len(rows) > limit:
+            last = tasks[-1]
+            next_cursor = _encode_cursor((last.created_at, last.task_id))
+        return Page(items=tasks, next_cursor=next_cursor)
+
     def get_task(self, task_id: str) -> WorkTask | None:
-        with self._connect() as conn:
+        with self._connection() as conn:
             with conn.cursor() as cur:
                 cur.execute(
                     """
-                    SELECT task_id, project_id, title, description, source, status, created_at
+                    SELECT task_id, project_id, title, description, source, status, created_at, claimed_by
                     FROM tasks
                     WHERE task_id = %s
                     """,
@@ -483,16 +964,74 @@ class PostgresRepository:
                 row = cur.fetchone()
         return self._row_to_task(row) if row else None
 
-    def update_task_status(self, task_id: str, status: TaskStatus) -> WorkTask | None:
-        with self._lock:
-            with self._connect() as conn:
+    def update_task_status(
+        self,
+        task_id: str,
+        status: TaskStatus,
+        expected_status: TaskStatus | Iterable[TaskStatus] | None = None,
+        message: ConversationMessage | None = None,
+        pending: PendingWrites | None = None,
+        *,
+        claimed_by: str | None = None,
+        expected_claimed_by: str | None = None,
+    ) -> WorkTask | None:
+        """UPDATE ... RETURNING 한 문장(메시지가 있으면 CTE)으로 상태 전이를 끝낸다.
+
+        expected_status가 있으면 현재 상태가 일치할 때만 전이한다(불일치 시 None).
+        claimed_by(선점 소유자)는 전이마다 새로 기록하고(None이면 비움), expected_claimed_by가 있으면 소유자도 일치해야 한다.
+        pending(unit of work 버퍼)은 전이 앞에 같은 트랜잭션으로 쓰고, 전이가 불일치면 함께 되돌린다.
+        """
+        expected = _expected_status_values(expected_status)
+        update_sql = (
+            "UPDATE tasks SET status = %s, claimed_by = %s, last_message_seq = last_message_seq + %s WHERE task_id = %s"
+        )
+        params: list = [status.value, claimed_by, 1 if message is not None else 0, task_id]
+        if expected:
+            update_sql += " AND status = ANY(%s)"
+            params.append(expected)
+        if expected_claimed_by is not None:
+            update_sql += " AND claimed_by = %s"
+            params.append(expected_claimed_by)
+        update_sql += " RETURNING task_id, project_id, title, description, source, status, created_at, claimed_by, last_message_seq"
+
+        if message is None:
+            query = update_sql
+        else:
+            query = f"""
+                WITH updated AS ({update_sql}),
+                inserted AS (
+                    INSERT INTO conversations (message_id, task_id, agent_role, content, timestamp, token_usage, seq)
+                    SELECT %s, task_id, %s, %s, %s, %s, last_message_seq FROM updated
+                    RETURNING seq
+                )
+                SELECT * FROM updated
+            """
+            params.extend(
+                [
+                    message.message_id,
+                    message.agent_role.value,
+                    message.content,
+                    message.timestamp,
+                    message.token_usage,
+                ]
+            )
+
+        try:
+            with self._writer() as conn:
                 with conn.cursor() as cur:
-                    cur.execute(
-                        "UPDATE tasks SET status = %s WHERE task_id = %s",
-                        (status.value, task_id),
-                    )
-                conn.commit()
-        return self.get_task(task_id)
+                    if pending is not None:
+                        self._write_batch(cur, *pending)
+                    cur.execute(query, params)
+                    row = cur.fetchone()
+                    if row is None and pending is not None:
+                        raise _TransitionRejected
+        except _TransitionRejected:
+            return None
+        if row is None:
+            return None
+        if message is not None:
+            message.seq = int(row["last_message_seq"])
+        return self._row_to_task(row)
 
     # ---------- conversations ----------
     def add_conversation(
@@ -502,49 +1041,152 @@ class PostgresRepository:
         content: str,
         token_usage: int = 0,
     ) -> ConversationMessage:
-        message = ConversationMessage(
-            message_id=str(uuid.uuid4()),
-            task_id=task_id,
-            agent_role=agent_role,
-            content=content,
-            timestamp=utc_now_iso(),
-            token_usage=token_usage,
-        )
-        with self._lock:
-            with self._connect() as conn:
-                with conn.cursor() as cur:
-                    cur.execute(
-                        """
-                        INSERT INTO conversations (message_id, task_id, agent_role, content, timestamp, token_usage)
-                        VALUES (%s, %s, %s, %s, %s, %s)
-                        """,
-                        (
-                            message.message_id,
-                            message.task_id,
-                            message.agent_role.value,
-                            message.content,
-                            message.timestamp,
-                            message.token_usage,
-                        ),
-                    )
-                conn.commit()
-        return message
-
-    def list_conversations(self, task_id: str) -> list[ConversationMessage]:
-        with self._connect() as conn:
+        message = ConversationMessage.new(task_id, agent_role, content, token_usage)
+        with self._writer() as conn:
             with conn.cursor() as cur:
+                message.seq = self._reserve_message_seqs(cur, task_id, 1)
                 cur.execute(
                     """
-                    SELECT message_id, task_id, agent_role, content, timestamp, token_usage
-                    FROM conversations
-                    WHERE task_id = %s
-                    ORDER BY timestamp ASC
+                    INSERT INTO conversations (message_id, task_id, agent_role, content, timestamp, token_usage, seq)
+                    VALUES (%s, %s, %s, %s, %s, %s, %s)
                     """,
-                    (task_id,),
+                    (
+                        message.message_id,
+                        message.task_id,
+                        message.agent_role.value,
+                        message.content,
+                        message.timestamp,
+                        message.token_usage,
+                        message.seq,
+                    ),
                 )
+        return message
+
+    def list_conversations(self, task_id: str) -> list[ConversationMessage]:
+        query = """
+            SELECT message_id, task_id, agent_role, content, timestamp, token_usage, seq
+            FROM conversations
+            WHERE task_id = %s
+            ORDER BY seq ASC
+        """
+        with self._connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(query, (task_id,))
+                rows = cur.fetchall()
+        return [self._row_to_message(r) for r in rows]
+
+    def list_conversations_since(
+        self,
+        task_id: str,
+        after_seq: int = 0,
+        limit: int = 100,
+    ) -> list[ConversationMessage]:
+        query = """
+            SELECT message_id, task_id, agent_role, content, timestamp, token_usage, seq
+            FROM conversations
+            WHERE task_id = %s AND seq > %s
+            ORDER BY seq ASC
+            LIMIT %s
+        """
+        with self._connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(query, (task_id, int(after_seq), max(1, min(int(limit), MAX_PAGE_LIMIT))))
                 rows = cur.fetchall()
         return [self._row_to_message(r) for r in rows]
 
+    def list_conversations_page(
+        self,
+        task_id: str,
+        *,
+        limit: int = 100,
+        cursor: str | None = None,
+        direction: str = "asc",
+    ) -> Page:
+        limit, order, op = _page_params(limit, direction)
+        query = """
+            SELECT message_id, task_id, agent_role, content, timestamp, token_usage, seq
+            FROM conversations
+            WHERE task_id = %s
+        """
+        params: list = [task_id]
+        if cursor:
+            query += f" AND seq {op} %s"
+            params.extend(_decode_cursor(cursor, 1))
+        query += f" ORDER BY seq {order} LIMIT %s"
+        params.append(limit + 1)
+
+        with self._connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(query, params)
+                rows = cur.fetchall()
+        messages = [self._row_to_message(r) for r in rows[:limit]]
+        next_cursor = None
+        if len(rows) > limit:
+            next_cursor = _encode_cursor((messages[-1].seq,))
+        return Page(items=messages, next_cursor=next_cursor)
+
+    def add_conversations(self, messages: list[ConversationMessage]) -> list[ConversationMessage]:
+        self.write_batch([], messages)
+        return messages
+
+    def write_batch(
+        self,
+        status_updates: list[tuple[str, TaskStatus]],
+        messages: list[ConversationMessage],
+    ) -> None:
+        """상태 변경과 대화 기록을 한 트랜잭션으로 반영한다."""
+        if not status_updates and not messages:
+            return
+        with self._writer() as conn:
+            with conn.cursor() as cur:
+                self._write_batch(cur, status_updates, messages)
+
+    def _write_batch(
+        self,
+        cur,
+        status_updates: list[tuple[str, TaskStatus]],
+        messages: list[ConversationMessage],
+    ) -> None:
+        if status_updates:
+            cur.executemany(
+                "UPDATE tasks SET status = %s WHERE task_id = %s",
+                [(status.value, task_id) for task_id, status in status_updates],
+            )
+        if not messages:
+            return
+        for task_id, group in _group_by_task(messages).items():
+            first = self._reserve_message_seqs(cur, task_id, len(group))
+            for offset, message in enumerate(group):
+                message.seq = first + offset
+        cur.executemany(
+            """
+            INSERT INTO conversations (message_id, task_id, agent_role, content, timestamp, token_usage, seq)
+            VALUES (%s, %s, %s, %s, %s, %s, %s)
+            """,
+            [
+                (
+                    m.message_id,
+                    m.task_id,
+                    m.agent_role.value,
+                    m.content,
+                    m.timestamp,
+                    m.token_usage,
+                    m.seq,
+                )
+                for m in messages
+            ],
+        )
+
+    @staticmethod
+    def _reserve_message_seqs(cur, task_id: str, count: int) -> int:
+        """tasks 행 lock으로 태스크별 seq 발급 순서 = commit 순서를 보장한다."""
+        cur.execute(
+            "UPDATE tasks SET last_message_seq = last_message_seq + %s WHERE task_id = %s RETURNING last_message_seq",
+            (count, task_id),
+        )
+        row = cur.fetchone()
+        return int(row["last_message_seq"]) - count + 1 if row else 0
+
     # ---------- row mappers ----------
     @staticmethod
     def _row_to_project(row: dict) -> Project:
@@ -554,6 +1196,7 @@ class PostgresRepository:
             repo_url=row["repo_url"],
             default_branch=row["default_branch"],
             tech_stack=row["tech_stack"],
+            max_concurrency=int(row["max_concurrency"]),
         )
 
     @staticmethod
@@ -566,6 +1209,7 @@ class PostgresRepository:
             source=TaskSource(row["source"]),
             status=TaskStatus(row["status"]),
             created_at=row["created_at"],
+            claimed_by=row["claimed_by"],
         )
 
     @staticmethod
@@ -577,15 +1221,111 @@ class PostgresRepository:
             content=row["content"],
             timestamp=row["timestamp"],
             token_usage=row["token_usage"],
+            seq=row["seq"],
         )
 
 
+class UnitOfWork:
+    """상태 변경/대화 기록을 버퍼링했다가 flush 시 한 트랜잭션으로 반영한다."""
+
+    def __init__(
+        self,
+        backend: RepositoryBackend,
+        on_flush: Callable[[list[str]], None] | None = None,
+    ):
+        self.backend = backend
+        self._on_flush = on_flush
+        self._status_updates: list[tuple[str, TaskStatus]] = []
+        self._messages: list[ConversationMessage] = []
+        # 이 unit of work에서 본 태스크 행(조건부 전이의 RETURNING + 버퍼된 상태). 버퍼 전이 때 다시 읽지 않는다.
+        self._tasks: dict[str, WorkTask] = {}
+
+    @property
+    def pending(self) -> int:
+        return len(self._status_updates) + len(self._messages)
+
+    def add_conversation(
+        self,
+        task_id: str,
+        agent_role: AgentRole,
+        content: str,
+        token_usage: int = 0,
+    ) -> ConversationMessage:
+        message = ConversationMessage.new(task_id, agent_role, content, token_usage)
+        self._messages.append(message)
+        return message
+
+    def update_task_status(
+        self,
+        task_id: str,
+        status: TaskStatus,
+        message: ConversationMessage | None = None,
+    ) -> WorkTask | None:
+        """상태 변경을 버퍼에 싣는다. 행은 flush 때 쓰므로 여기서 읽지 않는다.
+
+        이 unit of work에서 본 태스크면 버퍼된 상태를 반영한 사본을, 처음 보는 태스크면 None을 돌려준다.
+        """
+        self._status_updates.append((task_id, status))
+        if message is not None:
+            self._messages.append(message)
+        known = self._tasks.get(task_id)
+        if known is None:
+            return None
+        known = replace(known, status=status)
+        self._tasks[task_id] = known
+        return known
+
+    def transition(
+        self,
+        task_id: str,
+        status: TaskStatus,
+        expected_status: TaskStatus | Iterable[TaskStatus],
+        message: ConversationMessage | None = None,
+        *,
+        claimed_by: str | None = None,
+        expected_claimed_by: str | None = None,
+    ) -> WorkTask | None:
+        """조건부 전이는 즉시 반영하고, 지금까지 버퍼된 기록을 같은 트랜잭션에 싣는다.
+
+        불일치(None)면 버퍼는 그대로 남아 블록 종료 시 flush된다.
+        """
+        pending = (self._status_updates, self._messages)
+        task = self.backend.update_task_status(
+            task_id,
+            status,
+            expected_status,
+            message,
+            pending=pending,
+            claimed_by=claimed_by,
+            expected_claimed_by=expected_claimed_by,
+        )
+        if task is None:
+            return None
+        self._tasks[task_id] = task
+        self._status_updates, self._messages = [], []
+        if self._on_flush is not None:
+            self._on_flush([task_id] + [pending_id for pending_id, _ in pending[0]])
+        return task
+
+    def flush(self) -> None:
+        status_updates, messages = self._status_updates, self._messages
+        if not status_updates and not messages:
+            return
+        self._status_updates, self._messages = [], []
+        self.backend.write_batch(status_updates, messages)
+        if status_updates and self._on_flush is not None:
+            self._on_flush([task_id for task_id, _ in status_updates])
+
+
 class ArchitectureRepository:
     """환경 설정에 따라 저장소 백엔드를 선택한다.
 
     - sqlite: ARCHITECTURE_DB_PATH
     - postgres: ARCHITECTURE_POSTGRES_DSN
     - hybrid: postgres 우선, 실패 시 sqlite fallback
+    - sqlite 커넥션 풀/WAL: ARCHITECTURE_SQLITE_POOL=1
+    - postgres 커넥션 풀: 기본 사용(ARCHITECTURE_POSTGRES_POOL_MAX_SIZE 기본 10, 0이면 호출마다 connect)
+    - project/task read-through 캐시: ARCHITECTURE_REPO_CACHE_SIZE>0
     """
 
     def __init__(
@@ -594,6 +1334,9 @@ class ArchitectureRepository:
         *,
         backend: str | None = None,
         postgres_dsn: str | None = None,
+        sqlite_pooled: bool | None = None,
+        auto_migrate: bool | None = None,
+        cache_size: int | None = None,
     ):
         configured_backend = (backend or os.getenv("ARCHITECTURE_DB_BACKEND") or "sqlite").lower()
         if configured_backend not in {"sqlite", "postgres", "hybrid"}:
@@ -604,6 +1347,19 @@ class ArchitectureRepository:
         self.fallback_reason = ""
         self.sqlite_path = db_path or os.getenv("ARCHITECTURE_DB_PATH") or ".agent_architecture.db"
         self.postgres_dsn = postgres_dsn or os.getenv("ARCHITECTURE_POSTGRES_DSN")
+        if sqlite_pooled is None:
+            sqlite_pooled = os.getenv("ARCHITECTURE_SQLITE_POOL", "0").strip() == "1"
+        self.sqlite_pooled = sqlite_pooled
+        if auto_migrate is None:
+            auto_migrate = os.getenv("ARCHITECTURE_DB_AUTO_MIGRATE", "1").strip() != "0"
+        self.auto_migrate = auto_migrate
+        # 진행 중인 unit of work는 저장소 인스턴스별로 추적한다 (다른 저장소의 쓰기를 가로채지 않음).
+        self._active_uow: ContextVar[UnitOfWork | None] = ContextVar(
+            f"architecture_active_uow_{id(self):x}", default=None
+        )
+        self._init_cache(
+            int(os.getenv("ARCHITECTURE_REPO_CACHE_SIZE", "0")) if cache_size is None else cache_size
+        )
 
         fallback_enabled = (
             configured_backend == "hybrid"
@@ -614,25 +1370,116 @@ class ArchitectureRepository:
             if not self.postgres_dsn:
                 if configured_backend == "postgres" and not fallback_enabled:
                     raise ValueError("Postgres backend requires ARCHITECTURE_POSTGRES_DSN")
-                self.backend = SqliteRepository(self.sqlite_path)
+                self.backend = self._create_sqlite_backend()
                 self.backend_name = "sqlite"
                 self.fallback_reason = "postgres_dsn_missing"
                 return
             try:
-                self.backend = PostgresRepository(self.postgres_dsn)
+                self.backend = self._create_postgres_backend()
                 self.backend_name = "postgres"
                 return
             except Exception as e:
                 if configured_backend == "postgres" and not fallback_enabled:
                     raise
-                self.backend = SqliteRepository(self.sqlite_path)
+                self.backend = self._create_sqlite_backend()
                 self.backend_name = "sqlite"
                 self.fallback_reason = f"postgres_init_failed:{e}"
                 return
 
-        self.backend = SqliteRepository(self.sqlite_path)
+        self.backend = self._create_sqlite_backend()
         self.backend_name = "sqlite"
 
+    def _init_cache(self, cache_size: int) -> None:
+        self.cache: TTLCache | None = None
+        self.cache_bus: RedisInvalidationBus | None = None
+        self.cache_bus_error = ""
+        if cache_size <= 0:
+            return
+        self.cache = TTLCache(
+            maxsize=cache_size,
+            ttl_seconds=float(os.getenv("ARCHITECTURE_REPO_CACHE_TTL_SECONDS", "5")),
+        )
+        redis_url = os.getenv("ARCHITECTURE_REPO_CACHE_REDIS_URL", "").strip()
+        if redis_url:
+            try:
+                self.cache_bus = RedisInvalidationBus(redis_url, self.cache.invalidate)
+            except Exception as e:
+                # 채널 없이도 TTL로 수렴하므로 로컬 캐시만으로 계속 동작한다.
+                self.cache_bus_error = str(e)
+
+    def _cache_get(self, key: str):
+        if self.cache is None:
+            return None
+        cached = self.cache.get(key)
+        return replace(cached) if cached is not None else None
+
+    def _cache_set(self, key: str, value) -> None:
+        if self.cache is not None and value is not None:
+            self.cache.set(key, replace(value))
+
+    def _invalidate(self, keys: list[str]) -> None:
+        if self.cache is None:
+            return
+        for key in keys:
+            self.cache.invalidate(key)
+            if self.cache_bus is not None:
+                self.cache_bus.publish(key)
+
+    def _invalidate_tasks(self, task_ids: list[str]) -> None:
+        self._invalidate([f"task:{task_id}" for task_id in task_ids])
+
+    def get_cache_stats(self) -> dict:
+        if self.cache is None:
+            return {"enabled": False}
+        stats = self.cache.stats()
+        stats["redis_invalidation"] = self.cache_bus is not None
+        if self.cache_bus_error:
+            stats["redis_invalidation_error"] = self.cache_bus_error
+        return stats
+
+    def _create_sqlite_backend(self) -> SqliteRepository:
+        return SqliteRepository(
+            self.sqlite_path,
+            pooled=self.sqlite_pooled,
+            synchronous=os.getenv("ARCHITECTURE_SQLITE_SYNCHRONOUS", "NORMAL"),
+            busy_timeout_ms=int(os.getenv("ARCHITECTURE_SQLITE_BUSY_TIMEOUT_MS", "5000")),
+            auto_migrate=self.auto_migrate,
+        )
+
+    def _create_postgres_backend(self) -> PostgresRepository:
+        return PostgresRepository(
+            self.postgres_dsn,
+            pool_min_size=int(os.getenv("ARCHITECTURE_POSTGRES_POOL_MIN_SIZE", "1")),
+            pool_max_size=int(os.getenv("ARCHITECTURE_POSTGRES_POOL_MAX_SIZE", "10")),
+            pool_max_idle_seconds=float(os.getenv("ARCHITECTURE_POSTGRES_POOL_MAX_IDLE_SECONDS", "300")),
+            pool_timeout_seconds=float(os.getenv("ARCHITECTURE_POSTGRES_POOL_TIMEOUT_SECONDS", "30")),
+            auto_migrate=self.auto_migrate,
+        )
+
+    def migrate(self) -> list[int]:
+        return self.backend.migrate()
+
+    def get_schema_status(self) -> dict:
+        versions = self.backend.schema_versions()
+        return {
+            "backend": self.backend_name,
+            "current_version": max(versions, default=0),
+            "latest_version": LATEST_VERSION,
+            "pending_versions": pending_versions(versions),
+        }
+
+    def get_pool_stats(self) -> dict:
+        stats_fn = getattr(self.backend, "pool_stats", None)
+        stats = stats_fn() if callable(stats_fn) else {"enabled": False}
+        return {"backend": self.backend_name, **stats}
+
+    def close(self) -> None:
+        if self.cache_bus is not None:
+            self.cache_bus.close()
+        close = getattr(self.backend, "close", None)
+        if callable(close):
+            close()
+
     def get_runtime_profile(self) -> dict:
         return {
             "configured_backend": self.configured_backend,
@@ -640,17 +1487,30 @@ class ArchitectureRepository:
             "fallback_active": bool(self.fallback_reason),
             "fallback_reason": self.fallback_reason,
             "sqlite_path": self.sqlite_path,
+            "sqlite_pooled": self.sqlite_pooled,
             "postgres_configured": bool(self.postgres_dsn),
         }
 
     def upsert_project(self, project: Project) -> Project:
-        return self.backend.upsert_project(project)
+        stored = self.backend.upsert_project(project)
+        self._invalidate([f"project:{project.project_id}"])
+        return stored
 
     def list_projects(self) -> list[Project]:
         return self.backend.list_projects()
 
+    def get_project_concurrency_limits(self) -> dict[str, int]:
+        """fair-share 큐가 참조하는 프로젝트별 동시 실행 상한 (제한 있는 프로젝트만)."""
+        return {p.project_id: p.max_concurrency for p in self.backend.list_projects() if p.max_concurrency > 0}
+
     def get_project(self, project_id: str) -> Project | None:
-        return self.backend.get_project(project_id)
+        key = f"project:{project_id}"
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+        project = self.backend.get_project(project_id)
+        self._cache_set(key, project)
+        return project
 
     def create_task(
         self,
@@ -659,16 +1519,70 @@ class ArchitectureRepository:
         description: str,
         source: TaskSource,
     ) -> WorkTask:
-        return self.backend.create_task(project_id, title, description, source)
+        task = self.backend.create_task(project_id, title, description, source)
+        self._invalidate_tasks([task.task_id])
+        return task
 
     def list_tasks(self, project_id: str | None = None) -> list[WorkTask]:
         return self.backend.list_tasks(project_id)
 
+    def list_tasks_page(
+        self,
+        project_id: str | None = None,
+        *,
+        limit: int = 100,
+        cursor: str | None = None,
+        direction: str = "desc",
+    ) -> Page:
+        return self.backend.list_tasks_page(project_id, limit=limit, cursor=cursor, direction=direction)
+
     def get_task(self, task_id: str) -> WorkTask | None:
-        return self.backend.get_task(task_id)
+        key = f"task:{task_id}"
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+        task = self.backend.get_task(task_id)
+        self._cache_set(key, task)
+        return task
 
-    def update_task_status(self, task_id: str, status: TaskStatus) -> WorkTask | None:
-        return self.backend.update_task_status(task_id, status)
+    def update_task_status(
+        self,
+        task_id: str,
+        status: TaskStatus,
+        *,
+        expected_status: TaskStatus | Iterable[TaskStatus] | None = None,
+        message: ConversationMessage | None = None,
+        claimed_by: str | None = None,
+        expected_claimed_by: str | None = None,
+    ) -> WorkTask | None:
+        """상태 전이. expected_status가 있으면 unit of work 안에서도 즉시 원자적으로 반영한다.
+
+        unit of work 안의 조건부 전이는 버퍼된 기록을 같은 트랜잭션으로 함께 반영한다.
+        비조건 전이는 버퍼에 실어 flush 때 반영하며 행을 읽지 않는다 (그 unit of work에서 처음 보는 태스크면 None).
+        claimed_by는 새 선점 소유자(None이면 비움), expected_claimed_by는 현재 소유자 조건이다.
+        """
+        uow = self._active_uow.get()
+        if uow is not None:
+            if expected_status is None and expected_claimed_by is None:
+                return uow.update_task_status(task_id, status, message)
+            return uow.transition(
+                task_id,
+                status,
+                expected_status,
+                message,
+                claimed_by=claimed_by,
+                expected_claimed_by=expected_claimed_by,
+            )
+        task = self.backend.update_task_status(
+            task_id,
+            status,
+            expected_status,
+            message,
+            claimed_by=claimed_by,
+            expected_claimed_by=expected_claimed_by,
+        )
+        self._invalidate_tasks([task_id])
+        return task
 
     def add_conversation(
         self,
@@ -677,7 +1591,50 @@ class ArchitectureRepository:
         content: str,
         token_usage: int = 0,
     ) -> ConversationMessage:
+        uow = self._active_uow.get()
+        if uow is not None:
+            return uow.add_conversation(task_id, agent_role, content, token_usage)
         return self.backend.add_conversation(task_id, agent_role, content, token_usage)
 
+    def add_conversations(self, messages: list[ConversationMessage]) -> list[ConversationMessage]:
+        return self.backend.add_conversations(messages)
+
+    @contextmanager
+    def unit_of_work(self) -> Iterator[UnitOfWork]:
+        """블록 안의 update_task_status/add_conversation을 모아 종료 시 한 번에 flush 한다.
+
+        예외가 나도 이미 버퍼된 기록은 flush 한다 (기존 즉시 기록 방식과 동일한 가시성).
+        중첩 호출 시 바깥 unit of work에 합류한다.
+        """
+        outer = self._active_uow.get()
+        if outer is not None:
+            yield outer
+            return
+        uow = UnitOfWork(self.backend, on_flush=self._invalidate_tasks)
+        token = self._active_uow.set(uow)
+        try:
+            yield uow
+        finally:
+            self._active_uow.reset(token)
+            uow.flush()
+
     def list_conversations(self, task_id: str) -> list[ConversationMessage]:
         return self.backend.list_conversations(task_id)
+
+    def list_conversations_page(
+        self,
+        task_id: str,
+        *,
+        limit: int = 100,
+        cursor: str | None = None,
+        direction: str = "asc",
+    ) -> Page:
+        return self.backend.list_conversations_page(task_id, limit=limit, cursor=cursor, direction=direction)
+
+    def list_conversations_since(
+        self,
+        task_id: str,
+        after_seq: int = 0,
+        limit: int = 100,
+    ) -> list[ConversationMessage]:
+        return self.backend.list_conversations_since(task_id, after_seq, limit)
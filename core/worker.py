@@ -2,10 +2,18 @@
 
 from __future__ import annotations
 
+import os
+import random
+import socket
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import Any
+from typing import Any, Callable
 
-from core.queue import TaskQueue
+from core.metrics import Histogram
+from core.models import TaskStatus
+from core.queue import TaskQueue, job_wait_seconds
 from core.orchestrator import ManagerOrchestrator
 
 
@@ -15,27 +23,438 @@ class WorkerResult:
     task_id: str | None
     message: str
     payload: dict[str, Any] | None = None
+    error: Exception | None = None
+
+
+# 요청 자체가 잘못된 4xx는 다시 보내도 같으므로 재시도하지 않는다 (시간 초과/속도 제한 계열만 예외).
+RETRYABLE_HTTP_STATUSES = frozenset({408, 425, 429})
+# 입력/코드 오류는 재시도해도 같은 결과라 바로 dead-letter로 보낸다.
+NON_RETRYABLE_ERRORS: tuple[type[Exception], ...] = (
+    ValueError,
+    TypeError,
+    KeyError,
+    AttributeError,
+    NotImplementedError,
+    PermissionError,
+)
+
+
+def _http_status(error: Exception) -> int | None:
+    """HTTP 클라이언트 예외(requests/httpx/PyGithub/LLM SDK)의 응답 상태 코드."""
+    response = getattr(error, "response", None)
+    for status in (
+        getattr(error, "status_code", None),
+        getattr(error, "status", None),
+        getattr(response, "status_code", None),
+    ):
+        if isinstance(status, int):
+            return status
+    return None
+
+
+@dataclass(slots=True)
+class RetryPolicy:
+    """실패한 job의 자동 재시도 정책: 지수 백오프 + jitter, 최대 시도 횟수 초과 시 dead-letter."""
+
+    max_attempts: int = 3
+    base_delay_seconds: float = 5.0
+    max_delay_seconds: float = 300.0
+    jitter_ratio: float = 0.5
+    non_retryable_errors: tuple[type[Exception], ...] = NON_RETRYABLE_ERRORS
+
+    def is_retryable(self, error: Exception | None) -> bool:
+        """원인을 모르는 실패(None)는 재시도한다. HTTP 오류는 상태 코드로, 나머지는 예외 타입으로 판단한다."""
+        if error is None:
+            return True
+        status = _http_status(error)
+        if status is not None:
+            return status >= 500 or status in RETRYABLE_HTTP_STATUSES
+        return not isinstance(error, self.non_retryable_errors)
+
+    def delay_for(self, attempt: int) -> float:
+        """attempt번째 시도가 실패한 뒤 다음 시도까지의 지연(초)."""
+        delay = min(self.max_delay_seconds, self.base_delay_seconds * (2 ** max(0, attempt - 1)))
+        # 같은 장애로 동시에 실패한 job들이 한꺼번에 재시도하지 않도록 흩뜨린다.
+        return delay * (1 - self.jitter_ratio * random.random())
+
+
+_TASK_FAILED = "Task failed"
+
+
+def _claim_owner(payload: dict[str, Any]) -> str | None:
+    """태스크 선점 소유자: 재시도 체인의 첫 job_id (재전달은 같은 job_id로 온다)."""
+    return payload.get("claim_owner") or payload.get("job_id")
+
+# heartbeat가 이 시간 넘게 없으면 멈추거나 죽은 워커로 본다.
+DEFAULT_WORKER_STALE_AFTER_SECONDS = 30.0
 
 
 class WorkerRuntime:
     """큐에서 task를 읽어 오케스트레이터 실행으로 전달."""
 
-    def __init__(self, task_queue: TaskQueue, orchestrator: ManagerOrchestrator):
+    def __init__(
+        self,
+        task_queue: TaskQueue,
+        orchestrator: ManagerOrchestrator,
+        max_deliveries: int = 5,
+        concurrency: int = 1,
+        retry_policy: RetryPolicy | None = None,
+    ):
         self.task_queue = task_queue
         self.orchestrator = orchestrator
+        self.max_deliveries = max(1, int(max_deliveries))
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.concurrency = max(1, int(concurrency))
+        # 예약된(dequeue 중이거나 실행 중인) 슬롯 수. 슬롯이 풀리면 _slot_freed로 dispatch를 깨운다.
+        self._in_flight = 0
+        self._slots_lock = threading.Lock()
+        self._slot_freed = threading.Condition(self._slots_lock)
+        # dispatch로 넘긴 job: future -> (시작 시각, payload). 멈춘 crew 감지와 drain 시 미완료 job 회수용
+        self._running: dict[Future, tuple[float, dict[str, Any]]] = {}
+        # True면 새 job을 가져오지 않는다 (SIGTERM 후 drain 중)
+        self.draining = False
+        self._executor: ThreadPoolExecutor | None = None
+        # 큐 대기(dequeue 시점 - enqueue/ready 시점)와 실행 시간 분포
+        self.queue_wait_seconds = Histogram()
+        self.execution_seconds = Histogram()
+        # 처리를 마친(ack된) job 수
+        self.tasks_completed = 0
+
+    def metrics(self) -> dict[str, Any]:
+        return {
+            "concurrency": self.concurrency,
+            "queue_wait_seconds": self.queue_wait_seconds.snapshot(),
+            "execution_seconds": self.execution_seconds.snapshot(),
+        }
+
+    def oldest_running_seconds(self) -> float:
+        """dispatch로 실행 중인 job 중 가장 오래 돈 job의 경과 시간(초). 없으면 0."""
+        with self._slots_lock:
+            started = min((since for since, _ in self._running.values()), default=None)
+        return 0.0 if started is None else time.monotonic() - started
+
+    def heartbeat_state(self) -> dict[str, Any]:
+        """worker registry에 올릴 현재 상태: 사용 중 슬롯, 완료 건수, 실행 중 job과 시작 시각(epoch)."""
+        now, mono = time.time(), time.monotonic()
+        with self._slots_lock:
+            running = [
+                {
+                    "task_id": payload.get("task_id"),
+                    "job_id": payload.get("job_id"),
+                    "started_at": now - (mono - since),
+                }
+                for since, payload in self._running.values()
+            ]
+            return {
+                "concurrency": self.concurrency,
+                "slots_used": self._in_flight,
+                "tasks_completed": self.tasks_completed,
+                "draining": self.draining,
+                "running": sorted(running, key=lambda r: r["started_at"]),
+            }
+
+    def drain(self, timeout_seconds: float) -> list[dict[str, Any]]:
+        """새 job을 더 가져오지 않고, 실행 중 job이 끝나기를 최대 timeout_seconds 기다린다.
+
+        기한 안에 끝나지 못한 job의 payload를 반환한다 (모두 끝났으면 빈 리스트).
+        """
+        deadline = time.monotonic() + max(0.0, timeout_seconds)
+        with self._slot_freed:
+            self.draining = True
+            while self._running:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._slot_freed.wait(remaining)
+            return [payload for _, payload in self._running.values()]
+
+    def abandon(self, payloads: list[dict[str, Any]]) -> None:
+        """drain 기한을 넘긴 job을 큐에 되돌리고 태스크 선점을 풀어 다른 워커가 처음부터 이어받게 한다."""
+        for payload in payloads:
+            task_id = payload.get("task_id")
+            if task_id:
+                self.orchestrator.release_task(task_id)
+            self.task_queue.nack(payload, requeue=True)
+
+    def renew_leases(self) -> int:
+        """실행 중 job의 큐 lease를 visibility timeout만큼 다시 늘린다. 늘린 job 수를 반환한다.
+
+        오래 걸리는 crew가 실행 중에 reaper에게 회수되어 다른 워커에서 한 번 더 실행되지 않게 한다.
+        """
+        with self._slots_lock:
+            payloads = [payload for _, payload in self._running.values()]
+        if payloads:
+            self.task_queue.extend_lease(payloads)
+        return len(payloads)
+
+    def free_slots(self) -> int:
+        with self._slots_lock:
+            return max(0, self.concurrency - self._in_flight)
 
     def run_once(self, timeout_seconds: int = 1) -> WorkerResult:
         payload = self.task_queue.dequeue(timeout_seconds=timeout_seconds)
         if not payload:
             return WorkerResult(ok=True, task_id=None, message="No task in queue")
+        return self._process(payload)
+
+    def run_batch(self, timeout_seconds: int = 1) -> list[WorkerResult]:
+        """빈 실행 슬롯 수만큼 job을 한 번에 가져와 병렬로 실행하고, 모두 끝날 때까지 기다린다."""
+        free = self._reserve_slots(0)
+        try:
+            if free == 0:
+                return []
+            payloads = self.task_queue.dequeue_many(free, timeout_seconds=timeout_seconds)
+            if len(payloads) <= 1:
+                return [self._process(p) for p in payloads]
+            return list(self._pool().map(self._process, payloads))
+        finally:
+            self._release_slots(free)
+
+    def dispatch(
+        self,
+        timeout_seconds: int = 1,
+        on_result: Callable[[WorkerResult], None] | None = None,
+        max_items: int | None = None,
+    ) -> int:
+        """빈 슬롯만큼만 dequeue해 스레드 풀에 넘기고 바로 돌아온다 (앞선 job 완료를 기다리지 않음).
+
+        슬롯이 모두 차 있으면 하나가 빌 때까지 최대 timeout_seconds 기다린다. 넘긴 job 수를 반환한다.
+        max_items를 주면 빈 슬롯이 더 있어도 그 수까지만 가져온다.
+        """
+        free = self._reserve_slots(timeout_seconds)
+        if max_items is not None and free > max_items:
+            self._release_slots(free - max(0, max_items))
+            free = max(0, max_items)
+        if free == 0:
+            return 0
+        try:
+            payloads = self.task_queue.dequeue_many(free, timeout_seconds=timeout_seconds)
+        except Exception:
+            self._release_slots(free)
+            raise
+        self._release_slots(free - len(payloads))
+        pool = self._pool()
+        for payload in payloads:
+            future = pool.submit(self._process, payload)
+            with self._slots_lock:
+                self._running[future] = (time.monotonic(), payload)
+            future.add_done_callback(lambda f, p=payload: self._on_done(f, p, on_result))
+        return len(payloads)
+
+    def _on_done(
+        self,
+        future: Future,
+        payload: dict[str, Any],
+        on_result: Callable[[WorkerResult], None] | None,
+    ) -> None:
+        with self._slots_lock:
+            self._running.pop(future, None)
+        self._release_slots(1)
+        error = future.exception()
+        if error is None:
+            result = future.result()
+        else:
+            # ack/retry 적재 중 큐 오류: ack되지 않았으므로 visibility timeout 뒤 재전달된다.
+            result = WorkerResult(
+                ok=False,
+                task_id=payload.get("task_id"),
+                message=f"Worker error: {error}",
+                payload=payload,
+            )
+        if on_result is not None:
+            on_result(result)
+
+    def _reserve_slots(self, wait_seconds: float) -> int:
+        with self._slot_freed:
+            if self.draining:
+                return 0
+            if self._in_flight >= self.concurrency and wait_seconds > 0:
+                self._slot_freed.wait(wait_seconds)
+            free = max(0, self.concurrency - self._in_flight)
+            self._in_flight += free
+            return free
+
+    def _release_slots(self, count: int) -> None:
+        if count <= 0:
+            return
+        with self._slot_freed:
+            self._in_flight -= count
+            self._slot_freed.notify_all()
+
+    def _pool(self) -> ThreadPoolExecutor:
+        with self._slots_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="worker")
+            return self._executor
+
+    def close(self, wait: bool = True) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+
+    def _process(self, payload: dict[str, Any]) -> WorkerResult:
+        waited = job_wait_seconds(payload)
+        if waited is not None:
+            self.queue_wait_seconds.observe(waited)
+        if int(payload.get("delivery_count", 1)) > self.max_deliveries:
+            # 실행할 때마다 워커를 죽이는 poison job은 더 돌리지 않고 격리한다.
+            self.task_queue.dead_letter(payload, f"Exceeded {self.max_deliveries} deliveries")
+            self._ack(payload)
+            return WorkerResult(
+                ok=False,
+                task_id=payload.get("task_id"),
+                message="Dead-lettered: too many deliveries",
+                payload=payload,
+            )
+        started = time.perf_counter()
+        try:
+            result = self._execute(payload)
+        except Exception as e:
+            return self._retry_or_dead_letter(payload, f"Task execution error: {e}", e)
+        finally:
+            self.execution_seconds.observe(time.perf_counter() - started)
+        if result.message == _TASK_FAILED:
+            return self._retry_or_dead_letter(payload, _TASK_FAILED, result.error)
+        # 실행이 끝난 뒤에만 ack 한다. 프로세스가 죽으면 ack되지 않아 visibility timeout 후 재전달된다.
+        self._ack(payload)
+        return result
 
+    def _retry_or_dead_letter(
+        self, payload: dict[str, Any], reason: str, error: Exception | None = None
+    ) -> WorkerResult:
+        attempt = int(payload.get("attempt", 1))
+        policy = self.retry_policy
+        if not policy.is_retryable(error):
+            self.task_queue.dead_letter(payload, f"{reason}: {error!r}")
+            message = f"{reason}; dead-lettered without retry (non-retryable {type(error).__name__})"
+        elif attempt < policy.max_attempts:
+            delay = policy.delay_for(attempt)
+            # 큐가 새로 찍는 필드는 버린다 (새 job_id, enqueued_at/ready_at 기준으로 대기 시간 측정).
+            dropped = ("job_id", "delivery_count", "enqueued_at", "ready_at")
+            retry = {k: v for k, v in payload.items() if k not in dropped}
+            retry["attempt"] = attempt + 1
+            # 재시도 job은 새 job_id를 받으므로 선점 소유자는 체인의 첫 job으로 고정한다.
+            retry["claim_owner"] = _claim_owner(payload)
+            # 지연 job을 먼저 적재한 뒤 ack 한다. 그 사이 죽어도 job은 사라지지 않고, 중복 실행은 claim이 막는다.
+            self.task_queue.enqueue(retry, delay_seconds=delay)
+            message = f"{reason}; retry {attempt + 1}/{policy.max_attempts} in {delay:.1f}s"
+        else:
+            self.task_queue.dead_letter(payload, reason)
+            message = f"{reason}; dead-lettered after {attempt} attempts"
+        self._ack(payload)
+        return WorkerResult(ok=False, task_id=payload.get("task_id"), message=message, payload=payload)
+
+    def _execute(self, payload: dict[str, Any]) -> WorkerResult:
         task_id = payload.get("task_id")
         if not task_id:
             return WorkerResult(ok=False, task_id=None, message="Invalid payload: missing task_id", payload=payload)
 
-        task = self.orchestrator.execute_task(task_id)
+        # 재전달/재시도 job은 같은 job(재시도 체인)이 선점한 채 남긴 IN_PROGRESS만 이어받는다.
+        # 재시도 대기 중 다른 job이 태스크를 다시 선점했다면 그 실행은 건드리지 않는다.
+        # 실행 중 job의 lease는 renew_leases가 늘리므로, 재전달은 이전 실행의 lease가 실제로 만료됐다는 뜻이다.
+        reclaim = int(payload.get("delivery_count", 1)) > 1 or int(payload.get("attempt", 1)) > 1
+        errors: list[Exception] = []
+        task = self.orchestrator.execute_task(
+            task_id, reclaim=reclaim, on_error=errors.append, owner=_claim_owner(payload)
+        )
         if task is None:
             return WorkerResult(ok=False, task_id=task_id, message="Task not found", payload=payload)
+        if task.status == TaskStatus.IN_PROGRESS:
+            return WorkerResult(ok=True, task_id=task_id, message="Task already claimed", payload=payload)
+        if task.status == TaskStatus.FAILED:
+            error = errors[0] if errors else None
+            return WorkerResult(ok=False, task_id=task_id, message=_TASK_FAILED, payload=payload, error=error)
 
         return WorkerResult(ok=True, task_id=task_id, message="Task executed", payload=payload)
 
+    def _ack(self, payload: dict[str, Any]) -> None:
+        ack = getattr(self.task_queue, "ack", None)
+        if callable(ack):
+            ack(payload)
+        # 성공/재시도 적재/dead-letter 모두 ack로 끝난다.
+        with self._slots_lock:
+            self.tasks_completed += 1
+
+
+class WorkerHeartbeat:
+    """워커 상태를 큐 백엔드의 worker registry에 주기적으로 기록한다 (GET /api/workers)."""
+
+    def __init__(
+        self,
+        runtime: WorkerRuntime,
+        worker_id: str | None = None,
+        interval_seconds: float = 10.0,
+        extra: Callable[[], dict[str, Any]] | None = None,
+    ):
+        self.runtime = runtime
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.interval_seconds = float(interval_seconds)
+        self.extra = extra
+        self.started_at = time.time()
+        self._last_beat = 0.0
+
+    def beat(self, state: str = "running", force: bool = False) -> None:
+        """interval마다 한 번만 기록하고 실행 중 job의 lease를 늘린다.
+
+        레지스트리/큐 장애가 job 처리를 막지 않도록 오류는 삼킨다.
+        """
+        now = time.monotonic()
+        if not force and now - self._last_beat < self.interval_seconds:
+            return
+        self._last_beat = now
+        try:
+            self.runtime.renew_leases()
+        except Exception as e:
+            print(f"[worker] lease renewal failed: {e}")
+        record = {
+            **self.runtime.heartbeat_state(),
+            **(self.extra() if self.extra is not None else {}),
+            "state": state,
+            "host": socket.gethostname(),
+            "pid": os.getpid(),
+            "started_at": self.started_at,
+        }
+        try:
+            self.runtime.task_queue.heartbeat(self.worker_id, record)
+        except Exception as e:
+            print(f"[worker] heartbeat failed: {e}")
+
+    def remove(self) -> None:
+        try:
+            self.runtime.task_queue.remove_worker(self.worker_id)
+        except Exception:
+            pass
+
+
+def describe_workers(
+    task_queue: TaskQueue,
+    stale_after_seconds: float = DEFAULT_WORKER_STALE_AFTER_SECONDS,
+    now: float | None = None,
+) -> dict[str, Any]:
+    """registry의 워커 목록에 heartbeat 경과 시간/stale 여부와 실행 중 job의 경과 시간을 붙이고 용량을 요약한다."""
+    now = time.time() if now is None else now
+    workers = []
+    for record in task_queue.list_workers():
+        age = max(0.0, now - float(record.get("last_seen", 0.0)))
+        running = [
+            {**job, "running_seconds": round(max(0.0, now - float(job["started_at"])), 1)}
+            for job in record.get("running", [])
+        ]
+        workers.append(
+            {
+                **record,
+                "running": running,
+                "heartbeat_age_seconds": round(age, 1),
+                "stale": age > stale_after_seconds,
+            }
+        )
+    live = [w for w in workers if not w["stale"]]
+    return {
+        "workers": workers,
+        "live": len(live),
+        "stale": len(workers) - len(live),
+        "slots_total": sum(int(w.get("concurrency", 0)) for w in live),
+        "slots_used": sum(int(w.get("slots_used", 0)) for w in live),
+        "stale_after_seconds": stale_after_seconds,
+    }
+
@@ -34,9 +34,22 @@ class TaskWorkflowEngine:
             "description": task.description,
             "logs": [],
         }
-        if self._compiled_graph is not None:
-            return self._compiled_graph.invoke(initial)
-        return self._execute_fallback(initial)
+        # 실행 전체의 기록을 한 unit of work로 모은다 (호출자가 연 unit of work가 있으면 합류).
+        with self.repo.unit_of_work():
+            if self._compiled_graph is not None:
+                return self._compiled_graph.invoke(initial)
+            return self._execute_fallback(initial)
+
+    def _run_node(self, node, state: WorkflowState, publish: bool = False) -> WorkflowState:
+        # 노드 기록은 실행 단위로 버퍼링하고, 진행을 알려야 하는 노드(publish)만 끝나자마자 flush한다.
+        with self.repo.unit_of_work() as uow:
+            state = node(state)
+            if publish:
+                uow.flush()
+            return state
+
+    def _node(self, node, publish: bool = False):
+        return lambda state: self._run_node(node, state, publish)
 
     def _try_build_langgraph(self):
         try:
@@ -45,11 +58,12 @@ class TaskWorkflowEngine:
             return None
 
         graph = StateGraph(WorkflowState)
-        graph.add_node("pm", self._pm_node)
-        graph.add_node("cto", self._cto_node)
-        graph.add_node("developer", self._developer_node)
-        graph.add_node("qa", self._qa_node)
-        graph.add_node("marketing", self._marketing_node)
+        graph.add_node("pm", self._node(self._pm_node))
+        graph.add_node("cto", self._node(self._cto_node))
+        # 개발 단계는 오래 걸리므로 여기까지의 기록을 바로 보여 준다.
+        graph.add_node("developer", self._node(self._developer_node, publish=True))
+        graph.add_node("qa", self._node(self._qa_node))
+        graph.add_node("marketing", self._node(self._marketing_node))
 
         graph.set_entry_point("pm")
         graph.add_edge("pm", "cto")
@@ -61,11 +75,11 @@ class TaskWorkflowEngine:
         return graph.compile()
 
     def _execute_fallback(self, state: WorkflowState) -> dict[str, Any]:
-        state = self._pm_node(state)
-        state = self._cto_node(state)
-        state = self._developer_node(state)
-        state = self._qa_node(state)
-        state = self._marketing_node(state)
+        state = self._run_node(self._pm_node, state)
+        state = self._run_node(self._cto_node, state)
+        state = self._run_node(self._developer_node, state, publish=True)
+        state = self._run_node(self._qa_node, state)
+        state = self._run_node(self._marketing_node, state)
         return state
 
     def _pm_node(self, state: WorkflowState) -> WorkflowState:
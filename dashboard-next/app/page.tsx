@@ -34,9 +34,30 @@ type TaskFeedPayload = {
   conversations: Conversation[];
 };
 
+type TaskFeedDeltaPayload = {
+  task: Task;
+  new_messages: Conversation[];
+};
+
 const API_BASE = process.env.NEXT_PUBLIC_API_BASE ?? "http://127.0.0.1:3000";
 const WS_BASE = process.env.NEXT_PUBLIC_WS_BASE ?? "ws://127.0.0.1:3000";
 const API_KEY = process.env.NEXT_PUBLIC_ARCHITECTURE_API_KEY ?? "";
+// 태스크 목록은 cursor 페이지로 받는다 (서버 최대 500).
+const TASK_PAGE_SIZE = 100;
+
+type TaskPage = {
+  tasks: Task[];
+  next_cursor: string | null;
+};
+
+async function fetchTaskPage(projectId: string, cursor?: string | null): Promise<TaskPage> {
+  const params = new URLSearchParams({ limit: String(TASK_PAGE_SIZE) });
+  if (cursor) params.set("cursor", cursor);
+  const res = await fetch(`${API_BASE}/api/projects/${projectId}/tasks?${params}`);
+  if (!res.ok) throw new Error("태스크 목록 조회 실패");
+  const data = await res.json();
+  return { tasks: data.tasks ?? [], next_cursor: data.next_cursor ?? null };
+}
 
 function toLocalTime(iso: string) {
   try {
@@ -54,6 +75,7 @@ export default function Home() {
   const [projects, setProjects] = useState<Project[]>([]);
   const [selectedProjectId, setSelectedProjectId] = useState<string>("");
   const [tasks, setTasks] = useState<Task[]>([]);
+  const [tasksCursor, setTasksCursor] = useState<string | null>(null);
   const [selectedTaskId, setSelectedTaskId] = useState<string>("");
   const [taskFeed, setTaskFeed] = useState<TaskFeedPayload | null>(null);
   const [statusMessage, setStatusMessage] = useState<string>("");
@@ -94,10 +116,9 @@ export default function Home() {
     const run = async () => {
       if (!selectedProjectId) return;
       try {
-        const res = await fetch(`${API_BASE}/api/projects/${selectedProjectId}/tasks`);
-        if (!res.ok) throw new Error("태스크 목록 조회 실패");
-        const data = await res.json();
-        setTasks(data.tasks ?? []);
+        const page = await fetchTaskPage(selectedProjectId);
+        setTasks(page.tasks);
+        setTasksCursor(page.next_cursor);
       } catch (e) {
         setStatusMessage(String(e));
       }
@@ -119,6 +140,13 @@ export default function Home() {
       if (payload.type === "task_feed") {
         setTaskFeed(payload.data as TaskFeedPayload);
         setStatusMessage(`실시간 연결됨: ${selectedTaskId}`);
+      } else if (payload.type === "task_feed_delta") {
+        // 최초 task_feed 이후에는 신규 메시지만 오므로 기존 목록 뒤에 이어 붙인다.
+        const delta = payload.data as TaskFeedDeltaPayload;
+        setTaskFeed((prev) => ({
+          task: delta.task,
+          conversations: [...(prev?.conversations ?? []), ...delta.new_messages],
+        }));
       } else if (payload.type === "error") {
         setStatusMessage(`WS 오류: ${payload.detail}`);
       }
@@ -151,6 +179,27 @@ export default function Home() {
     setSelectedProjectId(projectForm.project_id);
   }
 
+  async function reloadTasks(projectId: string) {
+    try {
+      const page = await fetchTaskPage(projectId);
+      setTasks(page.tasks);
+      setTasksCursor(page.next_cursor);
+    } catch (e) {
+      setStatusMessage(String(e));
+    }
+  }
+
+  async function loadMoreTasks() {
+    if (!selectedProjectId || !tasksCursor) return;
+    try {
+      const page = await fetchTaskPage(selectedProjectId, tasksCursor);
+      setTasks((prev) => [...prev, ...page.tasks]);
+      setTasksCursor(page.next_cursor);
+    } catch (e) {
+      setStatusMessage(String(e));
+    }
+  }
+
   async function handleCreateTask(e: FormEvent<HTMLFormElement>) {
     e.preventDefault();
     if (!selectedProjectId) {
@@ -174,11 +223,7 @@ export default function Home() {
     }
     const data = await res.json();
     setStatusMessage(`태스크 생성 + 큐 적재 완료: ${data.task.task_id}`);
-    const tasksRes = await fetch(`${API_BASE}/api/projects/${selectedProjectId}/tasks`);
-    if (tasksRes.ok) {
-      const tasksData = await tasksRes.json();
-      setTasks(tasksData.tasks ?? []);
-    }
+    await reloadTasks(selectedProjectId);
     setSelectedTaskId(data.task.task_id);
     setTaskFeed(null);
   }
@@ -196,11 +241,7 @@ export default function Home() {
     const data = await res.json();
     setStatusMessage(data.message);
     if (selectedProjectId) {
-      const tasksRes = await fetch(`${API_BASE}/api/projects/${selectedProjectId}/tasks`);
-      if (tasksRes.ok) {
-        const tasksData = await tasksRes.json();
-        setTasks(tasksData.tasks ?? []);
-      }
+      await reloadTasks(selectedProjectId);
     }
   }
 
@@ -263,6 +304,7 @@ export default function Home() {
               onChange={(e) => {
                 setSelectedProjectId(e.target.value);
                 setTasks([]);
+                setTasksCursor(null);
                 setSelectedTaskId("");
                 setTaskFeed(null);
               }}
@@ -346,6 +388,15 @@ export default function Home() {
                 </button>
               );
             })}
+            {tasksCursor && (
+              <button
+                className="rounded border border-slate-700 py-1 text-sm text-slate-300 hover:border-slate-500"
+                type="button"
+                onClick={loadMoreTasks}
+              >
+                더 보기
+              </button>
+            )}
           </div>
 
           <div className="rounded border border-slate-800 bg-slate-800 p-4">
@@ -11,11 +11,11 @@ import time
 from pathlib import Path
 from typing import Literal
 
-from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect, Request
-from fastapi.responses import HTMLResponse, FileResponse
+from fastapi import FastAPI, Header, HTTPException, Query, WebSocket, WebSocketDisconnect, Request
+from fastapi.responses import HTMLResponse, FileResponse, PlainTextResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 # 프로젝트 루트 기준으로 import (server는 dashboard/ 안에 있음)
 import sys
@@ -25,11 +25,13 @@ if str(_root) not in sys.path:
 
 from dashboard_state import get_snapshot, is_running
 from usage_tracking import is_over_limit, reset_usage
+from core.metrics import collect_queue_stats, render_prometheus, render_queue_metrics
 from core.models import AgentRole, Project, TaskSource, TaskStatus
 from core.orchestrator import ManagerOrchestrator
-from core.repository import ArchitectureRepository
+from core.repository import MAX_PAGE_LIMIT, ArchitectureRepository
 from core.queue import create_task_queue
-from core.worker import WorkerRuntime
+from core.ratelimit import get_llm_rate_limiter
+from core.worker import DEFAULT_WORKER_STALE_AFTER_SECONDS, WorkerRuntime, describe_workers
 
 app = FastAPI(title="Agent Team Dashboard")
 
@@ -58,9 +60,10 @@ _repo = ArchitectureRepository(
     postgres_dsn=_postgres_dsn,
 )
 _orchestrator = ManagerOrchestrator(_repo)
-_task_queue = create_task_queue()
+_task_queue = create_task_queue(project_limits=_repo.get_project_concurrency_limits)
 _worker_runtime = WorkerRuntime(_task_queue, _orchestrator)
 _api_key = os.getenv("ARCHITECTURE_API_KEY", "").strip()
+_worker_stale_after = float(os.getenv("WORKER_STALE_AFTER_SECONDS", str(DEFAULT_WORKER_STALE_AFTER_SECONDS)))
 
 _metrics_lock = threading.Lock()
 _metrics = {
@@ -82,6 +85,7 @@ class ProjectCreateRequest(BaseModel):
     repo_url: str
     default_branch: str = "master"
     tech_stack: str = ""
+    max_concurrency: int = Field(default=0, ge=0)
 
 
 class TaskCreateRequest(BaseModel):
@@ -90,10 +94,17 @@ class TaskCreateRequest(BaseModel):
     description: str
     source: Literal["github", "cli", "discord", "scheduler"] = "cli"
     auto_enqueue: bool = False
+    priority: Literal["high", "normal", "low"] = "normal"
+
+
+class TaskBatchCreateRequest(BaseModel):
+    # 한 요청이 한 트랜잭션/enqueue_many로 처리되므로 목록 조회와 같은 상한을 둔다.
+    tasks: list[TaskCreateRequest] = Field(..., max_length=MAX_PAGE_LIMIT)
 
 
 class TaskStatusUpdateRequest(BaseModel):
     status: Literal["pending", "in_progress", "done", "failed"]
+    expected_status: Literal["pending", "in_progress", "done", "failed"] | None = None
 
 
 class ConversationCreateRequest(BaseModel):
@@ -121,6 +132,9 @@ def _require_api_key(request: Request):
 
 def _queue_ready_check() -> tuple[bool, str]:
     try:
+        if hasattr(_task_queue, "ping"):
+            _task_queue.ping()
+            return True, "ok"
         client = getattr(_task_queue, "client", None)
         if client is not None and hasattr(client, "ping"):
             client.ping()
@@ -216,15 +230,42 @@ def api_metrics():
     data["db_configured_backend"] = db_profile["configured_backend"]
     data["db_active_backend"] = db_profile["active_backend"]
     data["db_fallback_active"] = db_profile["fallback_active"]
+    data["db_pool"] = _repo.get_pool_stats()
+    data["repo_cache"] = _repo.get_cache_stats()
     data["queue_backend"] = os.getenv("ARCHITECTURE_QUEUE_BACKEND", "local")
+    data["queue"] = collect_queue_stats(_task_queue)
+    data["worker"] = _worker_runtime.metrics()
+    limiter = get_llm_rate_limiter()
+    data["llm_rate_limit"] = limiter.metrics() if limiter is not None else None
     return data
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+def prometheus_metrics():
+    """Prometheus scrape용. external-metrics adapter가 agent_queue_depth 등을 HPA에 넘긴다."""
+    with _metrics_lock:
+        counters = {f"agent_{k}": v for k, v in _metrics.items()}
+    body = render_queue_metrics(collect_queue_stats(_task_queue), _worker_runtime.metrics(), counters)
+    limiter = get_llm_rate_limiter()
+    if limiter is not None:
+        rate = limiter.metrics()
+        body += render_prometheus(
+            {
+                "agent_llm_calls_total": rate["calls_total"],
+                "agent_llm_rate_limited_calls_total": rate["throttled_total"],
+                "agent_llm_rate_limit_backend_errors_total": rate["backend_errors_total"],
+            },
+            {"agent_llm_rate_limit_wait_seconds": rate["wait_seconds"]},
+        )
+    return PlainTextResponse(body, media_type="text/plain; version=0.0.4")
+
+
 @app.get("/api/runtime/profile")
 def api_runtime_profile():
     db_profile = _repo.get_runtime_profile()
     return {
         "db": db_profile,
+        "db_schema": _repo.get_schema_status(),
         "queue_backend": os.getenv("ARCHITECTURE_QUEUE_BACKEND", "local"),
         "api_key_enabled": bool(_api_key),
         "cors_origins": list(_cors_origins),
@@ -245,22 +286,46 @@ def api_upsert_project(body: ProjectCreateRequest, request: Request):
         repo_url=body.repo_url,
         default_branch=body.default_branch,
         tech_stack=body.tech_stack,
+        max_concurrency=body.max_concurrency,
     )
     stored = _repo.upsert_project(project)
     return {"project": stored.to_dict()}
 
 
 @app.get("/api/projects/{project_id}/tasks")
-def api_list_project_tasks(project_id: str):
+def api_list_project_tasks(
+    project_id: str,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_LIMIT),
+    cursor: str | None = None,
+    direction: Literal["asc", "desc"] = "desc",
+):
     project = _repo.get_project(project_id)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
-    tasks = _repo.list_tasks(project_id=project_id)
-    return {"tasks": [t.to_dict() for t in tasks]}
+    try:
+        page = _repo.list_tasks_page(project_id, limit=limit, cursor=cursor, direction=direction)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"tasks": [t.to_dict() for t in page.items], "next_cursor": page.next_cursor}
+
+
+def _enqueue_task_once(task, priority: str, idempotency_key: str | None) -> tuple[str, bool]:
+    """같은 task(또는 같은 task의 같은 Idempotency-Key)의 재요청은 dedup 창 안에서 기존 job을 돌려준다."""
+    # Idempotency-Key는 task별로 구분해 다른 task 요청이 같은 key를 써도 남의 job을 돌려받지 않는다.
+    dedup_key = f"idem:{task.task_id}:{idempotency_key}" if idempotency_key else f"task:{task.task_id}"
+    return _task_queue.enqueue_unique(
+        {"task_id": task.task_id, "project_id": task.project_id},
+        dedup_key,
+        priority=priority,
+    )
 
 
 @app.post("/api/tasks")
-def api_create_task(body: TaskCreateRequest, request: Request):
+def api_create_task(
+    body: TaskCreateRequest,
+    request: Request,
+    idempotency_key: str | None = Header(None, alias="Idempotency-Key"),
+):
     _require_api_key(request)
     project = _repo.get_project(body.project_id)
     if not project:
@@ -273,34 +338,82 @@ def api_create_task(body: TaskCreateRequest, request: Request):
     )
     payload = result.to_dict()
     if body.auto_enqueue:
-        job_id = _task_queue.enqueue(
-            {
-                "task_id": result.task.task_id,
-                "project_id": result.task.project_id,
-            }
-        )
-        payload["queue"] = {"enqueued": True, "job_id": job_id}
+        job_id, deduplicated = _enqueue_task_once(result.task, body.priority, idempotency_key)
+        payload["queue"] = {
+            "enqueued": True,
+            "job_id": job_id,
+            "priority": body.priority,
+            "deduplicated": deduplicated,
+        }
     else:
         payload["queue"] = {"enqueued": False}
     return payload
 
 
+@app.post("/api/tasks/batch")
+def api_create_tasks_batch(body: TaskBatchCreateRequest, request: Request):
+    _require_api_key(request)
+    missing = sorted({t.project_id for t in body.tasks if not _repo.get_project(t.project_id)})
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Project not found: {', '.join(missing)}")
+    results = [
+        _orchestrator.create_task_with_plan(
+            project_id=t.project_id,
+            title=t.title,
+            description=t.description,
+            source=TaskSource(t.source),
+        )
+        for t in body.tasks
+    ]
+    # auto_enqueue 대상은 한 번의 enqueue_many(단일 LPUSH / 단일 트랜잭션)로 적재한다.
+    to_enqueue = [(t, r.task) for t, r in zip(body.tasks, results) if t.auto_enqueue]
+    job_ids = iter(
+        _task_queue.enqueue_many(
+            [
+                {"task_id": task.task_id, "project_id": task.project_id, "priority": t.priority}
+                for t, task in to_enqueue
+            ]
+        )
+    )
+    items = []
+    for t, r in zip(body.tasks, results):
+        payload = r.to_dict()
+        payload["queue"] = (
+            {"enqueued": True, "job_id": next(job_ids), "priority": t.priority}
+            if t.auto_enqueue
+            else {"enqueued": False}
+        )
+        items.append(payload)
+    return {"tasks": items}
+
+
 @app.patch("/api/tasks/{task_id}/status")
 def api_update_task_status(task_id: str, body: TaskStatusUpdateRequest, request: Request):
     _require_api_key(request)
-    updated = _orchestrator.update_status(task_id, TaskStatus(body.status))
+    expected = TaskStatus(body.expected_status) if body.expected_status else None
+    updated = _orchestrator.update_status(task_id, TaskStatus(body.status), expected_status=expected)
     if not updated:
+        if expected is not None and _repo.get_task(task_id) is not None:
+            raise HTTPException(status_code=409, detail="Task status does not match expected_status")
         raise HTTPException(status_code=404, detail="Task not found")
     return {"task": updated.to_dict()}
 
 
 @app.get("/api/tasks/{task_id}/conversations")
-def api_list_conversations(task_id: str):
+def api_list_conversations(
+    task_id: str,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_LIMIT),
+    cursor: str | None = None,
+    direction: Literal["asc", "desc"] = "asc",
+):
     task = _repo.get_task(task_id)
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
-    messages = _repo.list_conversations(task_id)
-    return {"messages": [m.to_dict() for m in messages]}
+    try:
+        page = _repo.list_conversations_page(task_id, limit=limit, cursor=cursor, direction=direction)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"messages": [m.to_dict() for m in page.items], "next_cursor": page.next_cursor}
 
 
 @app.get("/api/tasks/{task_id}/feed")
@@ -327,13 +440,29 @@ def api_add_conversation(task_id: str, body: ConversationCreateRequest, request:
 
 
 @app.post("/api/tasks/{task_id}/enqueue")
-def api_enqueue_task(task_id: str, request: Request):
+def api_enqueue_task(
+    task_id: str,
+    request: Request,
+    priority: Literal["high", "normal", "low"] = Query("normal"),
+    idempotency_key: str | None = Header(None, alias="Idempotency-Key"),
+):
     _require_api_key(request)
     task = _repo.get_task(task_id)
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
-    job_id = _task_queue.enqueue({"task_id": task_id, "project_id": task.project_id})
-    return {"ok": True, "task_id": task_id, "job_id": job_id}
+    job_id, deduplicated = _enqueue_task_once(task, priority, idempotency_key)
+    return {"ok": True, "task_id": task_id, "job_id": job_id, "priority": priority, "deduplicated": deduplicated}
+
+
+@app.get("/api/queue/dead-letters")
+def api_list_dead_letters(limit: int = Query(50, ge=1, le=MAX_PAGE_LIMIT)):
+    return {"dead_letters": _task_queue.list_dead_letters(limit)}
+
+
+@app.get("/api/workers")
+def api_list_workers():
+    """heartbeat를 올린 워커 목록 (실행 중 job/경과 시간, stale 여부)과 live 워커의 슬롯 합계."""
+    return describe_workers(_task_queue, _worker_stale_after)
 
 
 @app.post("/api/workers/run-once")
@@ -370,25 +499,34 @@ async def ws_task_feed(websocket: WebSocket, task_id: str):
             await websocket.close(code=1008)
             return
 
+        # 최초 1회는 전체 대화를 task_feed로 보내고, 이후에는 seq 이후 신규 메시지만 task_feed_delta로 보낸다.
+        # 클라이언트가 new_messages를 이어 붙이므로 서버는 대화 목록을 들고 있지 않는다.
+        last_seq = 0
         last_signature = ""
         while True:
-            payload = _build_task_feed_payload(task_id)
-            task = payload.get("task")
-            conversations = payload.get("conversations", [])
+            task = _repo.get_task(task_id)
             if task is None:
                 await websocket.send_json({"type": "error", "detail": "Task deleted"})
                 await websocket.close(code=1008)
                 return
 
-            latest_message_id = conversations[-1]["message_id"] if conversations else ""
-            signature = f"{task['status']}|{len(conversations)}|{latest_message_id}"
+            new_messages: list[dict] = []
+            while True:
+                page = _repo.list_conversations_since(task_id, last_seq, MAX_PAGE_LIMIT)
+                new_messages.extend(m.to_dict() for m in page)
+                if page:
+                    last_seq = page[-1].seq
+                if len(page) < MAX_PAGE_LIMIT:
+                    break
+
+            signature = f"{task.status.value}|{last_seq}"
             if signature != last_signature:
+                if not last_signature:
+                    frame_type, data = "task_feed", {"task": task.to_dict(), "conversations": new_messages}
+                else:
+                    frame_type, data = "task_feed_delta", {"task": task.to_dict(), "new_messages": new_messages}
                 await websocket.send_json(
-                    {
-                        "type": "task_feed",
-                        "task_id": task_id,
-                        "data": payload,
-                    }
+                    {"type": frame_type, "task_id": task_id, "data": data, "last_seq": last_seq}
                 )
                 last_signature = signature
 
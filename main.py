@@ -14,12 +14,14 @@ main.py
 """
 
 import argparse
+import random
 import time
 import os
 import threading
 import json
 import re
 from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+from types import SimpleNamespace
 from datetime import datetime, timezone
 
 from pathlib import Path
@@ -46,8 +48,9 @@ from usage_hooks import register_usage_hooks
 register_usage_hooks()
 
 from crewai import Crew, Process
-from github import Auth, Github
 
+from core.isolation import run_isolated
+from tools.github_tools import get_repository, pin_refs_for_run
 from agents.agents import manager_agent, dev_agent, qa_agent, ui_designer_agent, ui_publisher_agent
 from tasks.tasks import (
     create_issue_analysis_task,
@@ -93,11 +96,8 @@ def _format_crew_result(result) -> str:
 
 
 def _get_repo():
-    """PyGithub repo 객체 반환 (댓글 검증용)."""
-    token = os.getenv("GITHUB_TOKEN")
-    repo_name = os.getenv("GITHUB_REPO")
-    g = Github(auth=Auth.Token(token)) if token else Github()
-    return g.get_repo(repo_name.strip())
+    """PyGithub repo 객체 반환 (댓글 검증용). 툴과 같은 공용 클라이언트/캐시를 쓴다."""
+    return get_repository()
 
 
 def _count_comments(repo, issue_number: int) -> int:
@@ -120,7 +120,21 @@ AGENT_OBJECT_MAP = {
     "qa":      qa_agent,
 }
 
-CREW_TIMEOUT_SECONDS = 600  # 10분 초과 시 강제 종료
+CREW_TIMEOUT_SECONDS = int(os.getenv("CREW_TIMEOUT_SECONDS", "600"))  # 10분 초과 시 강제 종료
+# 단계별 기한 (미설정 시 CREW_TIMEOUT_SECONDS)
+CREW_STAGE_TIMEOUT_ENV = {
+    "planning": "CREW_PLANNING_TIMEOUT_SECONDS",
+    "execution": "CREW_EXECUTION_TIMEOUT_SECONDS",
+}
+
+
+def _crew_stage_timeout(stage: str) -> float:
+    return float(os.getenv(CREW_STAGE_TIMEOUT_ENV[stage]) or CREW_TIMEOUT_SECONDS)
+
+
+def _crew_isolation() -> str:
+    """thread: 같은 프로세스에서 실행 (타임아웃 시 호출자만 풀림), process: 자식 프로세스에서 실행 후 기한 초과 시 강제 종료."""
+    return (os.getenv("CREW_ISOLATION") or "thread").strip().lower()
 
 
 def _find_missing_agents(repo, issue_number: int, before_count: int, expected_headers: list[str]) -> list[str]:
@@ -209,44 +223,18 @@ def _parse_agent_ids_from_result(result) -> list[str] | None:
     return None
 
 
-def _run_manager_planning(issue_number: int, dashboard_callback=None) -> list[str]:
-    """1단계: 매니저만 단독 실행해 팀 구성 JSON을 파싱한다. 실패 시 기본 세트 반환."""
-    print(f"[1단계] 매니저 플래닝 시작 (이슈 #{issue_number})")
+def _build_planning_crew(issue_number: int, task_callback=None) -> Crew:
     task = create_issue_analysis_task(issue_number)
-    crew = Crew(
+    return Crew(
         agents=[manager_agent],
         tasks=[task],
         process=Process.sequential,
         verbose=False,
-        task_callback=dashboard_callback,
+        task_callback=task_callback,
     )
 
-    with ThreadPoolExecutor(max_workers=1) as ex:
-        fut = ex.submit(crew.kickoff)
-        try:
-            result = fut.result(timeout=CREW_TIMEOUT_SECONDS)
-        except FuturesTimeoutError:
-            print(f"[1단계] 매니저 플래닝 타임아웃 - 기본 에이전트 세트 사용: {_DEFAULT_AGENT_IDS}")
-            return _DEFAULT_AGENT_IDS
-        except Exception as e:
-            print(f"[1단계] 매니저 플래닝 실패: {e} - 기본 에이전트 세트 사용: {_DEFAULT_AGENT_IDS}")
-            return _DEFAULT_AGENT_IDS
-
-    agent_ids = _parse_agent_ids_from_result(result)
-    if agent_ids:
-        print(f"[1단계] 매니저 선발 에이전트: {agent_ids}")
-        return agent_ids
-    else:
-        print(f"[1단계] JSON 파싱 실패 - 기본 에이전트 세트 사용: {_DEFAULT_AGENT_IDS}")
-        return _DEFAULT_AGENT_IDS
-
 
-def _run_dynamic_crew(
-    issue_number: int,
-    selected_agent_ids: list[str],
-    dashboard_callback=None,
-):
-    """2단계: 선발된 에이전트로 동적 크루를 구성하고 실행한다."""
+def _build_dynamic_crew(issue_number: int, selected_agent_ids: list[str], task_callback=None) -> Crew | None:
     feature_branch = f"feature/issue-{issue_number}"
     design_branch = f"design/issue-{issue_number}"
 
@@ -267,26 +255,132 @@ def _run_dynamic_crew(
         agents.append(agent_obj)
 
     if not tasks:
-        print("[2단계] 실행할 태스크 없음 - 건너뜀")
         return None
 
-    id_list = ", ".join(selected_agent_ids)
-    print(f"[2단계] 동적 크루 실행: [{id_list}]")
-
-    crew = Crew(
+    return Crew(
         agents=agents,
         tasks=tasks,
         process=Process.sequential,
         verbose=False,
-        task_callback=dashboard_callback,
+        task_callback=task_callback,
     )
 
-    with ThreadPoolExecutor(max_workers=1) as ex:
-        fut = ex.submit(crew.kickoff)
-        try:
-            return fut.result(timeout=CREW_TIMEOUT_SECONDS)
-        except FuturesTimeoutError:
-            raise RuntimeError(f"크루 실행 시간 초과 ({CREW_TIMEOUT_SECONDS}초)")
+
+def _build_stage_crew(stage: str, issue_number: int, agent_ids: list[str] | None, task_callback=None) -> Crew | None:
+    if stage == "planning":
+        return _build_planning_crew(issue_number, task_callback)
+    return _build_dynamic_crew(issue_number, agent_ids or [], task_callback)
+
+
+def _kickoff_pinned(crew: Crew):
+    """kickoff 1회 동안 tool이 읽는 브랜치 SHA를 고정한다 (실행 중 push가 스냅샷에 섞이지 않음)."""
+    with pin_refs_for_run():
+        return crew.kickoff()
+
+
+def _kickoff_isolated(stage: str, issue_number: int, agent_ids: list[str] | None = None, on_event=None):
+    """(자식 프로세스 진입점) crew를 만들어 실행하고, pipe로 넘길 수 있게 결과를 텍스트로 돌려준다.
+
+    태스크 완료("task")와 LLM 사용량 증분("usage")은 on_event로 부모에 보내 _replay_isolated_event가 재생한다.
+    """
+    task_callback = None
+    if on_event is not None:
+        from usage_tracking import set_usage_forwarder
+
+        set_usage_forwarder(lambda delta: on_event(("usage", delta)))
+
+        def task_callback(output):
+            # TaskOutput은 pickle을 보장하지 않아 대시보드 콜백이 쓰는 텍스트만 넘긴다.
+            text = getattr(output, "raw_output", None) or getattr(output, "raw", None) or ""
+            on_event(("task", str(text)[:4000]))
+
+    crew = _build_stage_crew(stage, issue_number, agent_ids, task_callback)
+    if crew is None:
+        return None
+    result = _kickoff_pinned(crew)
+    if result is None or isinstance(result, str):
+        return result
+    # CrewOutput도 pickle을 보장하지 않아 텍스트로 넘긴다 (도구 호출 객체도 문자열로 남아 _format_crew_result가 판별).
+    return getattr(result, "raw", None) or str(result)
+
+
+def _replay_isolated_event(event, task_callback=None) -> None:
+    """자식 크루가 보낸 이벤트를 부모에서 스레드 모드와 같은 경로로 반영한다."""
+    kind, value = event
+    if kind == "usage":
+        from usage_tracking import add_usage
+
+        add_usage(**value)
+    elif kind == "task" and task_callback is not None:
+        task_callback(SimpleNamespace(raw_output=value))
+
+
+def _kickoff_with_timeout(stage: str, issue_number: int, agent_ids: list[str] | None = None, task_callback=None):
+    """crew를 단계별 기한 안에 실행한다. 기한 초과 시 TimeoutError.
+
+    CREW_ISOLATION=process면 자식 프로세스에서 실행하고 기한이 지나면 프로세스를 죽여 LLM 호출까지 끊는다.
+    """
+    timeout = _crew_stage_timeout(stage)
+    if _crew_isolation() == "process":
+        return run_isolated(
+            _kickoff_isolated,
+            (stage, issue_number, agent_ids),
+            timeout_seconds=timeout,
+            on_event=lambda event: _replay_isolated_event(event, task_callback),
+            name=f"crew-{stage}-issue-{issue_number}",
+        )
+
+    crew = _build_stage_crew(stage, issue_number, agent_ids, task_callback)
+    if crew is None:
+        return None
+    ex = ThreadPoolExecutor(max_workers=1)
+    try:
+        return ex.submit(_kickoff_pinned, crew).result(timeout=timeout)
+    except FuturesTimeoutError:
+        raise TimeoutError(f"{stage} timed out after {timeout:g}s") from None
+    finally:
+        # with 블록처럼 폭주한 스레드를 기다리지 않는다 (스레드 자체는 멈출 수 없음).
+        ex.shutdown(wait=False)
+
+
+def _run_manager_planning(issue_number: int, dashboard_callback=None) -> list[str]:
+    """1단계: 매니저만 단독 실행해 팀 구성 JSON을 파싱한다. 실패 시 기본 세트 반환."""
+    print(f"[1단계] 매니저 플래닝 시작 (이슈 #{issue_number})")
+    try:
+        result = _kickoff_with_timeout("planning", issue_number, task_callback=dashboard_callback)
+    except TimeoutError:
+        print(f"[1단계] 매니저 플래닝 타임아웃 - 기본 에이전트 세트 사용: {_DEFAULT_AGENT_IDS}")
+        return _DEFAULT_AGENT_IDS
+    except Exception as e:
+        print(f"[1단계] 매니저 플래닝 실패: {e} - 기본 에이전트 세트 사용: {_DEFAULT_AGENT_IDS}")
+        return _DEFAULT_AGENT_IDS
+
+    agent_ids = _parse_agent_ids_from_result(result)
+    if agent_ids:
+        print(f"[1단계] 매니저 선발 에이전트: {agent_ids}")
+        return agent_ids
+    else:
+        print(f"[1단계] JSON 파싱 실패 - 기본 에이전트 세트 사용: {_DEFAULT_AGENT_IDS}")
+        return _DEFAULT_AGENT_IDS
+
+
+def _run_dynamic_crew(
+    issue_number: int,
+    selected_agent_ids: list[str],
+    dashboard_callback=None,
+):
+    """2단계: 선발된 에이전트로 동적 크루를 구성하고 실행한다."""
+    if not any(aid in TASK_FACTORY and aid in AGENT_OBJECT_MAP for aid in selected_agent_ids):
+        print("[2단계] 실행할 태스크 없음 - 건너뜀")
+        return None
+
+    id_list = ", ".join(selected_agent_ids)
+    print(f"[2단계] 동적 크루 실행: [{id_list}]")
+
+    try:
+        return _kickoff_with_timeout("execution", issue_number, selected_agent_ids, task_callback=dashboard_callback)
+    except TimeoutError:
+        raise RuntimeError(f"크루 실행 시간 초과 ({_crew_stage_timeout('execution'):g}초)") from None
 
 
 def process_issue(issue_number: int, dashboard_callback=None):
@@ -355,16 +449,14 @@ def process_issue(issue_number: int, dashboard_callback=None):
 def watch_new_issues(interval_seconds: int = 300, process_fn=None):
     """새로운 GitHub 이슈를 주기적으로 감시. process_fn이 있으면 그걸로 이슈 처리 (대시보드 연동용)."""
     run_issue = process_fn or process_issue
-    token = os.getenv("GITHUB_TOKEN")
     repo_name = os.getenv("GITHUB_REPO")
     if not repo_name or not repo_name.strip():
         raise ValueError(
             "GITHUB_REPO가 .env에 없거나 비어 있습니다. "
             "예: GITHUB_REPO=owner/repo 형식으로 설정하세요."
         )
-    g = Github(auth=Auth.Token(token)) if token else Github()
     try:
-        repo = g.get_repo(repo_name.strip())
+        repo = get_repository(repo_name.strip())
     except Exception as e:
         print(f"[오류] 레포지토리 접근 실패: {repo_name.strip()}")
         print(f"       {e}")
@@ -374,6 +466,7 @@ def watch_new_issues(interval_seconds: int = 300, process_fn=None):
     print(f"   저장소: {os.getenv('GITHUB_REPO')}")
     print(f"   라벨 'agent-todo' 달린 이슈만 처리합니다\n")
 
+    consecutive_errors = 0
     while True:
         try:
             issues = list(repo.get_issues(state="open", labels=["agent-todo"]))
@@ -395,6 +488,7 @@ def watch_new_issues(interval_seconds: int = 300, process_fn=None):
                     except Exception:
                         pass
 
+            consecutive_errors = 0
             print(f"이슈 조회: {len(issues)}건 (신규 {new_count}건) - {interval_seconds}초 후 재조회 (누적 처리: {len(processed_issues)})")
             time.sleep(interval_seconds)
 
@@ -402,9 +496,12 @@ def watch_new_issues(interval_seconds: int = 300, process_fn=None):
             print("\nWatch stopped.")
             break
         except Exception as e:
+            # 일시적 오류는 전체 주기를 기다리지 않고 지수 백오프(+jitter)로 재시도한다. 상한은 감시 주기.
+            consecutive_errors += 1
+            delay = min(interval_seconds, 5 * 2 ** (consecutive_errors - 1)) * (0.5 + random.random() / 2)
             print(f"[오류] 이슈 조회 실패 (레포 접근 등): {e}")
-            print(f"       {interval_seconds}초 후 재시도...")
-            time.sleep(interval_seconds)
+            print(f"       {delay:.0f}초 후 재시도... (연속 실패 {consecutive_errors}회)")
+            time.sleep(delay)
 
 
 def run_dashboard(port: int = 3000, watch: bool = False, interval: int = 300):
@@ -0,0 +1,96 @@
+"""
+scripts/bench_sqlite_repository.py
+
+SqliteRepository 기본 모드(호출마다 connect) vs pooled 모드(WAL + 커넥션 재사용) 처리량 비교.
+
+사용법:
+    python scripts/bench_sqlite_repository.py
+    python scripts/bench_sqlite_repository.py --threads 8 --seconds 5 --write-ratio 0.1
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+_root = Path(__file__).resolve().parent.parent
+if str(_root) not in sys.path:
+    sys.path.insert(0, str(_root))
+
+from core.models import AgentRole, Project, TaskSource
+from core.repository import SqliteRepository
+
+
+def _run(pooled: bool, threads: int, seconds: float, write_ratio: float) -> float:
+    fd, db_path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    repo = SqliteRepository(db_path, pooled=pooled)
+    try:
+        repo.upsert_project(
+            Project(
+                project_id="bench",
+                name="bench",
+                repo_url="https://example.com/bench.git",
+                default_branch="master",
+                tech_stack="python",
+            )
+        )
+        task_ids = [
+            repo.create_task("bench", f"task-{i}", "bench task", TaskSource.CLI).task_id
+            for i in range(50)
+        ]
+        for task_id in task_ids:
+            repo.add_conversation(task_id, AgentRole.PM, "seed")
+
+        deadline = time.perf_counter() + seconds
+        counts = [0] * threads
+
+        def worker(idx: int):
+            rnd = random.Random(idx)
+            while time.perf_counter() < deadline:
+                task_id = rnd.choice(task_ids)
+                if rnd.random() < write_ratio:
+                    repo.add_conversation(task_id, AgentRole.DEVELOPER, "bench message")
+                elif rnd.random() < 0.5:
+                    repo.get_task(task_id)
+                else:
+                    repo.list_conversations(task_id)
+                counts[idx] += 1
+
+        pool = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+        for t in pool:
+            t.start()
+        for t in pool:
+            t.join()
+        return sum(counts) / seconds
+    finally:
+        repo.close()
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(db_path + suffix):
+                os.remove(db_path + suffix)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SqliteRepository pooled 모드 벤치마크")
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--write-ratio", type=float, default=0.1)
+    args = parser.parse_args()
+
+    baseline = _run(False, args.threads, args.seconds, args.write_ratio)
+    pooled = _run(True, args.threads, args.seconds, args.write_ratio)
+    print(f"[bench] threads={args.threads} seconds={args.seconds} write_ratio={args.write_ratio}")
+    print(f"[bench] per-call connect : {baseline:,.0f} ops/sec")
+    print(f"[bench] pooled + WAL     : {pooled:,.0f} ops/sec")
+    if baseline:
+        print(f"[bench] speedup          : x{pooled / baseline:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+scripts/bench_task_queue.py
+
+TaskQueue 백엔드별 enqueue / dequeue+ack 처리량 비교.
+
+사용법:
+    python scripts/bench_task_queue.py                                  # local, sqlite
+    python scripts/bench_task_queue.py --batch-size 50                  # enqueue_many/dequeue_many
+    python scripts/bench_task_queue.py --high-ratio 0.1                 # 우선순위 lane별 p95 대기 시간
+    python scripts/bench_task_queue.py --redis-url redis://127.0.0.1:6379/15
+    python scripts/bench_task_queue.py --postgres-dsn postgresql://... --jobs 5000
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from pathlib import Path
+
+_root = Path(__file__).resolve().parent.parent
+if str(_root) not in sys.path:
+    sys.path.insert(0, str(_root))
+
+from core.queue import LocalTaskQueue, PostgresTaskQueue, RedisTaskQueue, SqliteTaskQueue
+
+
+def _p95(values: list[float]) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+
+def _bench(name: str, task_queue, jobs: int, consumers: int, batch_size: int = 1, high_ratio: float = 0.0) -> None:
+    rnd = random.Random(0)
+
+    def job(i: int) -> dict:
+        if high_ratio <= 0:
+            priority = "normal"
+        else:
+            priority = "high" if rnd.random() < high_ratio else rnd.choice(["normal", "low"])
+        return {"task_id": f"bench-{i}", "project_id": "bench", "priority": priority}
+
+    started = time.perf_counter()
+    if batch_size > 1:
+        for start in range(0, jobs, batch_size):
+            task_queue.enqueue_many([job(i) for i in range(start, min(jobs, start + batch_size))])
+    else:
+        for i in range(jobs):
+            task_queue.enqueue(job(i))
+    enqueue_secs = time.perf_counter() - started
+
+    consumed = [0] * consumers
+    waits: dict[str, list[float]] = {}
+
+    def consume(idx: int):
+        while True:
+            payloads = task_queue.dequeue_many(batch_size, timeout_seconds=1)
+            if not payloads:
+                return
+            now = time.time()
+            for payload in payloads:
+                waits.setdefault(payload["priority"], []).append(now - payload["enqueued_at"])
+                task_queue.ack(payload)
+            consumed[idx] += len(payloads)
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=consume, args=(i,)) for i in range(consumers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    # 마지막 1초 timeout 대기는 처리 시간에서 제외한다.
+    dequeue_secs = max(time.perf_counter() - started - 1.0, 1e-9)
+
+    print(
+        f"[bench] {name:<8} enqueue {jobs / enqueue_secs:>10,.0f} jobs/s | "
+        f"dequeue+ack {sum(consumed) / dequeue_secs:>10,.0f} jobs/s "
+        f"({sum(consumed)} jobs, {consumers} consumers, batch={batch_size})"
+    )
+    if high_ratio > 0:
+        summary = " | ".join(f"{p} p95 {_p95(waits.get(p, [])) * 1000:,.1f}ms" for p in ("high", "normal", "low"))
+        print(f"[bench] {name:<8} queue wait: {summary}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TaskQueue 백엔드 벤치마크")
+    parser.add_argument("--jobs", type=int, default=2000)
+    parser.add_argument("--consumers", type=int, default=4)
+    parser.add_argument("--redis-url", default="")
+    parser.add_argument("--postgres-dsn", default="")
+    parser.add_argument("--batch-size", type=int, default=1, help="enqueue_many/dequeue_many 배치 크기")
+    parser.add_argument("--high-ratio", type=float, default=0.0, help="high 우선순위 job 비율 (0이면 전부 normal)")
+    args = parser.parse_args()
+
+    _bench("local", LocalTaskQueue(), args.jobs, args.consumers, args.batch_size, args.high_ratio)
+
+    fd, db_path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    try:
+        sqlite_queue = SqliteTaskQueue(db_path, poll_interval_seconds=0.05)
+        _bench("sqlite", sqlite_queue, args.jobs, args.consumers, args.batch_size, args.high_ratio)
+        sqlite_queue.close()
+    finally:
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(db_path + suffix):
+                os.remove(db_path + suffix)
+
+    queue_name = f"bench:{uuid.uuid4().hex[:8]}"
+    if args.redis_url:
+        redis_queue = RedisTaskQueue(args.redis_url, queue_name=queue_name)
+        _bench("redis", redis_queue, args.jobs, args.consumers, args.batch_size, args.high_ratio)
+        redis_queue.client.delete(*redis_queue.lanes.values())
+    if args.postgres_dsn:
+        pg_queue = PostgresTaskQueue(args.postgres_dsn, queue_name=queue_name)
+        _bench("postgres", pg_queue, args.jobs, args.consumers, args.batch_size, args.high_ratio)
+        pg_queue.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -85,6 +85,12 @@ class ArchitectureApiTests(unittest.TestCase):
         list_tasks_res = self.client.get("/api/projects/next-song/tasks")
         self.assertEqual(list_tasks_res.status_code, 200)
         self.assertEqual(list_tasks_res.json()["tasks"][0]["task_id"], task_id)
+        self.assertIsNone(list_tasks_res.json()["next_cursor"])
+
+        page_res = self.client.get(f"/api/tasks/{task_id}/conversations?limit=1")
+        self.assertEqual(page_res.status_code, 200)
+        self.assertEqual(len(page_res.json()["messages"]), 1)
+        self.assertIsNotNone(page_res.json()["next_cursor"])
 
     def test_create_task_requires_existing_project(self):
         res = self.client.post(
@@ -129,6 +135,14 @@ class ArchitectureApiTests(unittest.TestCase):
         self.assertTrue(run_once_res.json()["ok"])
         self.assertEqual(run_once_res.json()["task_id"], task_id)
 
+        metrics = self.client.get("/api/metrics").json()
+        self.assertEqual(metrics["queue"]["depth"], 0)
+        self.assertEqual(metrics["worker"]["queue_wait_seconds"]["count"], 1)
+        prom_res = self.client.get("/metrics")
+        self.assertEqual(prom_res.status_code, 200)
+        self.assertIn('agent_queue_depth{queue="local"} 0.0', prom_res.text)
+        self.assertIn("agent_task_execution_seconds_count", prom_res.text)
+
         task_list_res = self.client.get("/api/projects/ai-agent-system/tasks")
         self.assertEqual(task_list_res.status_code, 200)
         self.assertEqual(task_list_res.json()["tasks"][0]["status"], "done")
@@ -141,6 +155,122 @@ class ArchitectureApiTests(unittest.TestCase):
         self.assertIn("developer", roles)
         self.assertIn("qa", roles)
 
+    def test_workers_endpoint_lists_heartbeats_and_flags_stale_workers(self):
+        queue = self.server._task_queue
+        queue.heartbeat("host-a:1", {"concurrency": 4, "slots_used": 1, "tasks_completed": 7, "running": []})
+        queue.heartbeat("host-b:2", {"concurrency": 2, "slots_used": 2, "tasks_completed": 3, "running": []})
+        queue._workers["host-b:2"]["last_seen"] -= 120
+
+        res = self.client.get("/api/workers")
+        self.assertEqual(res.status_code, 200)
+        body = res.json()
+        self.assertEqual([w["worker_id"] for w in body["workers"]], ["host-a:1", "host-b:2"])
+        self.assertEqual([w["stale"] for w in body["workers"]], [False, True])
+        self.assertEqual((body["live"], body["stale"]), (1, 1))
+        self.assertEqual((body["slots_total"], body["slots_used"]), (4, 1))
+
+    def test_batch_create_enqueues_in_one_call_and_worker_pulls_batch(self):
+        self.client.post(
+            "/api/projects",
+            json={
+                "project_id": "ai-agent-system",
+                "name": "ai-agent-system",
+                "repo_url": "https://github.com/org/ai-agent-system",
+                "default_branch": "master",
+                "tech_stack": "FastAPI, LangGraph, Redis, Postgres",
+            },
+        )
+        batch_res = self.client.post(
+            "/api/tasks/batch",
+            json={
+                "tasks": [
+                    {
+                        "project_id": "ai-agent-system",
+                        "title": f"Imported issue {i}",
+                        "description": "bulk import",
+                        "source": "github",
+                        "auto_enqueue": i < 2,
+                    }
+                    for i in range(3)
+                ]
+            },
+        )
+        self.assertEqual(batch_res.status_code, 200)
+        items = batch_res.json()["tasks"]
+        self.assertEqual([t["queue"]["enqueued"] for t in items], [True, True, False])
+
+        jobs = self.server._task_queue.dequeue_many(10, timeout_seconds=1)
+        self.assertEqual([j["task_id"] for j in jobs], [t["task"]["task_id"] for t in items[:2]])
+
+        # 일반 태스크 뒤에 적재해도 high 우선순위가 먼저 소비된다.
+        normal_task_id = items[2]["task"]["task_id"]
+        self.client.post(f"/api/tasks/{normal_task_id}/enqueue")
+        hot_res = self.client.post(f"/api/tasks/{items[0]['task']['task_id']}/enqueue?priority=high")
+        self.assertEqual(hot_res.status_code, 200)
+        self.assertEqual(hot_res.json()["priority"], "high")
+        self.assertEqual(self.server._task_queue.dequeue(timeout_seconds=1)["task_id"], items[0]["task"]["task_id"])
+
+        bad_res = self.client.post(f"/api/tasks/{normal_task_id}/enqueue?priority=urgent")
+        self.assertEqual(bad_res.status_code, 422)
+
+        oversized_res = self.client.post(
+            "/api/tasks/batch",
+            json={
+                "tasks": [
+                    {"project_id": "ai-agent-system", "title": f"bulk {i}", "description": "", "source": "github"}
+                    for i in range(self.server.MAX_PAGE_LIMIT + 1)
+                ]
+            },
+        )
+        self.assertEqual(oversized_res.status_code, 422)
+
+    def test_enqueue_is_deduplicated_within_window(self):
+        self.client.post(
+            "/api/projects",
+            json={
+                "project_id": "dedup-project",
+                "name": "dedup-project",
+                "repo_url": "https://github.com/org/dedup-project",
+                "default_branch": "master",
+                "tech_stack": "FastAPI",
+            },
+        )
+        create_res = self.client.post(
+            "/api/tasks",
+            json={"project_id": "dedup-project", "title": "dedup", "description": "desc", "source": "cli"},
+        )
+        task_id = create_res.json()["task"]["task_id"]
+
+        first = self.client.post(f"/api/tasks/{task_id}/enqueue").json()
+        second = self.client.post(f"/api/tasks/{task_id}/enqueue").json()
+        self.assertFalse(first["deduplicated"])
+        self.assertTrue(second["deduplicated"])
+        self.assertEqual(first["job_id"], second["job_id"])
+
+        # 클라이언트 Idempotency-Key는 task 기준 key와 별도로 취급된다.
+        keyed = self.client.post(f"/api/tasks/{task_id}/enqueue", headers={"Idempotency-Key": "retry-1"}).json()
+        keyed_again = self.client.post(f"/api/tasks/{task_id}/enqueue", headers={"Idempotency-Key": "retry-1"}).json()
+        self.assertFalse(keyed["deduplicated"])
+        self.assertEqual(keyed["job_id"], keyed_again["job_id"])
+        self.assertTrue(keyed_again["deduplicated"])
+
+        # auto_enqueue도 같은 dedup key를 쓰므로 직후의 수동 enqueue는 기존 job을 돌려준다.
+        auto = self.client.post(
+            "/api/tasks",
+            json={"project_id": "dedup-project", "title": "auto", "description": "desc", "auto_enqueue": True},
+        ).json()
+        self.assertFalse(auto["queue"]["deduplicated"])
+        again = self.client.post(f"/api/tasks/{auto['task']['task_id']}/enqueue").json()
+        self.assertTrue(again["deduplicated"])
+        self.assertEqual(again["job_id"], auto["queue"]["job_id"])
+
+        # 같은 Idempotency-Key라도 다른 task면 별도 job으로 적재된다.
+        other = self.client.post(
+            f"/api/tasks/{auto['task']['task_id']}/enqueue", headers={"Idempotency-Key": "retry-1"}
+        ).json()
+        self.assertFalse(other["deduplicated"])
+        self.assertNotEqual(other["job_id"], keyed["job_id"])
+
     def test_websocket_task_feed_streams_updates(self):
         self.client.post(
             "/api/projects",
@@ -175,8 +305,11 @@ class ArchitectureApiTests(unittest.TestCase):
             self.assertEqual(patch_res.status_code, 200)
 
             second_payload = websocket.receive_json()
-            self.assertEqual(second_payload["type"], "task_feed")
+            self.assertEqual(second_payload["type"], "task_feed_delta")
             self.assertEqual(second_payload["data"]["task"]["status"], "in_progress")
+            # 이후 프레임은 최초 전송 이후의 신규 메시지만 담는다.
+            self.assertNotIn("conversations", second_payload["data"])
+            self.assertEqual(second_payload["last_seq"], first_payload["last_seq"] + len(second_payload["data"]["new_messages"]))
 
         feed_res = self.client.get(f"/api/tasks/{task_id}/feed")
         self.assertEqual(feed_res.status_code, 200)
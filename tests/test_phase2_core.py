@@ -1,12 +1,39 @@
 import os
+import sqlite3
 import tempfile
+import threading
+import time
 import unittest
 
-from core.models import Project, TaskSource
+from core.models import AgentRole, ConversationMessage, Project, TaskSource, TaskStatus
 from core.orchestrator import ManagerOrchestrator
-from core.queue import LocalTaskQueue
+from core.cache import ContentAddressedCache
+from core.isolation import IsolatedExecutionError, IsolatedTimeoutError, run_isolated
+from core.metrics import render_queue_metrics
+from core.migrations import QUEUE_MIGRATIONS
+from core.queue import LocalTaskQueue, RedisTaskQueue, SqliteTaskQueue, create_task_queue
+from core.ratelimit import LLMRateLimiter, RateLimit, parse_rate_limits
 from core.repository import ArchitectureRepository
-from core.worker import WorkerRuntime
+from core.worker import RetryPolicy, WorkerHeartbeat, WorkerRuntime, describe_workers
+from worker_main import WorkerSupervisor, _run_loop
+
+try:
+    import fakeredis
+except ImportError:  # pragma: no cover - optional test dependency
+    fakeredis = None
+
+
+def _crashing_child(slot, status_queue):
+    raise SystemExit(3)
+
+
+def _isolated_stage(seconds, fail=False, on_event=None):
+    if on_event is not None:
+        on_event({"step": 1})
+    time.sleep(seconds)
+    if fail:
+        raise ValueError("boom")
+    return os.getpid()
 
 
 class Phase2CoreTests(unittest.TestCase):
@@ -14,6 +41,18 @@ class Phase2CoreTests(unittest.TestCase):
         with self.assertRaises(ValueError):
             ArchitectureRepository(backend="postgres", postgres_dsn=None)
 
+    def test_postgres_queue_requires_dsn(self):
+        saved = {k: os.environ.pop(k, None) for k in ("ARCHITECTURE_POSTGRES_DSN", "ARCHITECTURE_QUEUE_POSTGRES_DSN")}
+        os.environ["ARCHITECTURE_QUEUE_BACKEND"] = "postgres"
+        try:
+            with self.assertRaises(ValueError):
+                create_task_queue()
+        finally:
+            os.environ.pop("ARCHITECTURE_QUEUE_BACKEND", None)
+            for key, value in saved.items():
+                if value is not None:
+                    os.environ[key] = value
+
     def test_worker_no_task_returns_idle_result(self):
         tmp = tempfile.NamedTemporaryFile(delete=False)
         tmp.close()
@@ -79,6 +118,1029 @@ class Phase2CoreTests(unittest.TestCase):
         self.assertEqual(profile["fallback_reason"], "postgres_dsn_missing")
         os.remove(tmp.name)
 
+    def test_sqlite_pooled_mode_uses_wal_and_shared_connections(self):
+        tmp = tempfile.NamedTemporaryFile(delete=False)
+        tmp.close()
+        repo = ArchitectureRepository(db_path=tmp.name, backend="sqlite", sqlite_pooled=True)
+        self.assertTrue(repo.get_runtime_profile()["sqlite_pooled"])
+        self.assertEqual(repo.get_pool_stats()["backend"], "sqlite")
+        self.assertTrue(repo.get_pool_stats()["enabled"])
+        repo.upsert_project(
+            Project(
+                project_id="p1",
+                name="project1",
+                repo_url="https://example.com/repo.git",
+                default_branch="master",
+                tech_stack="python",
+            )
+        )
+        task = repo.create_task("p1", "task-1", "desc", TaskSource.CLI)
+
+        def write_messages():
+            for _ in range(20):
+                repo.add_conversation(task.task_id, AgentRole.DEVELOPER, "msg")
+
+        threads = [threading.Thread(target=write_messages) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(len(repo.list_conversations(task.task_id)), 80)
+        with repo.backend._reader() as conn:
+            mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+        self.assertEqual(mode.lower(), "wal")
+
+        # 짧게 끝나는 스레드들의 reader는 다음 reader를 만들 때 닫혀 누적되지 않는다.
+        for _ in range(5):
+            reader = threading.Thread(target=repo.list_conversations, args=(task.task_id,))
+            reader.start()
+            reader.join()
+        self.assertEqual(repo.get_pool_stats()["reader_connections"], 2)
+
+        repo.close()
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(tmp.name + suffix):
+                os.remove(tmp.name + suffix)
+
+    def test_migrations_create_indexes_and_are_idempotent(self):
+        tmp = tempfile.NamedTemporaryFile(delete=False)
+        tmp.close()
+        repo = ArchitectureRepository(db_path=tmp.name, backend="sqlite")
+        status = repo.get_schema_status()
+        self.assertEqual(status["current_version"], status["latest_version"])
+        self.assertEqual(status["pending_versions"], [])
+        self.assertEqual(repo.migrate(), [])
+
+        with repo.backend._reader() as conn:
+            indexes = {
+                r["name"]
+                for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'").fetchall()
+            }
+        self.assertIn("idx_tasks_project_created", indexes)
+        self.assertIn("idx_tasks_status_created", indexes)
+        self.assertIn("idx_conversations_task_timestamp", indexes)
+
+        repo.close()
+        os.remove(tmp.name)
+
+    def test_queue_tables_are_versioned_and_upgrade_unversioned_files(self):
+        tmp = tempfile.NamedTemporaryFile(delete=False)
+        tmp.close()
+        # 버전 관리 이전 _init_db가 만든 큐 파일 (available_at 컬럼 추가 전)
+        conn = sqlite3.connect(tmp.name)
+        conn.execute(
+            """
+            CREATE TABLE task_jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                job_id TEXT NOT NULL UNIQUE,
+                queue_name TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                enqueued_at REAL NOT NULL,
+                claimed_at REAL,
+                claimed_by TEXT,
+                deliveries INTEGER NOT NULL DEFAULT 0,
+                sort_key REAL NOT NULL DEFAULT 0,
+                project_id TEXT NOT NULL DEFAULT ''
+            )
+            """
+        )
+        conn.execute(
+            "INSERT INTO task_jobs (job_id, queue_name, payload, enqueued_at) VALUES (?, ?, ?, ?)",
+            ("j1", "agent:task_queue", '{"job_id": "j1", "task_id": "t1"}', time.time()),
+        )
+        conn.commit()
+        conn.close()
+
+        q = SqliteTaskQueue(tmp.name)
+        self.assertEqual(q.migrate(), [])
+        versions = [r[0] for r in q._conn().execute("SELECT version FROM queue_schema_version ORDER BY version")]
+        self.assertEqual(versions, [m.version for m in QUEUE_MIGRATIONS])
+        self.assertEqual(q.dequeue(timeout_seconds=0)["task_id"], "t1")
+        q.heartbeat("w1", {"slots_total": 1})
+        self.assertEqual([w["worker_id"] for w in q.list_workers()], ["w1"])
+
+        q.close()
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(tmp.name + suffix):
+                os.remove(tmp.name + suffix)
+
+    def test_keyset_pagination_walks_tasks_and_conversations(self):
+        tmp = tempfile.NamedTemporaryFile(delete=False)
+        tmp.close()
+        repo = ArchitectureRepository(db_path=tmp.name, backend="sqlite")
+        repo.upsert_project(
+            Project(
+                project_id="p1",
+                name="project1",
+                repo_url="https://example.com/repo.git",
+                default_branch="master",
+                tech_stack="python",
+            )
+        )
+        created = [repo.create_task("p1", f"task-{i}", "desc", TaskSource.CLI) for i in range(5)]
+        for i in range(5):
+            repo.add_conversation(created[0].task_id, AgentRole.PM, f"msg-{i}")
+
+        seen: list[str] = []
+        cursor = None
+        while True:
+            page = repo.list_tasks_page("p1", limit=2, cursor=cursor)
+            seen.extend(t.task_id for t in page.items)
+            cursor = page.next_cursor
+            if cursor is None:
+                break
+        self.assertEqual(seen, [t.task_id for t in repo.list_tasks("p1")])
+
+        first = repo.list_conversations_page(created[0].task_id, limit=3)
+        self.assertEqual([m.content for m in first.items], ["msg-0", "msg-1", "msg-2"])
+        rest = repo.list_conversations_page(created[0].task_id, limit=3, cursor=first.next_cursor)
+        self.assertEqual([m.content for m in rest.items], ["msg-3", "msg-4"])
+        self.assertIsNone(rest.next_cursor)
+
+        with self.assertRaises(ValueError):
+            repo.list_tasks_page("p1", cursor="not-a-cursor")
+
+        os.remove(tmp.name)
+
+    def test_conversation_seq_is_monotonic_and_supports_since_reads(self):
+        tmp = tempfile.NamedTemporaryFile(delete=False)
+        tmp.close()
+        repo = ArchitectureRepository(db_path=tmp.name, backend="sqlite")
+        repo.upsert_project(
+            Project(
+                project_id="p1",
+                name="project1",
+                repo_url="https://example.com/repo.git",
+                default_branch="master",
+                tech_stack="python",
+            )
+        )
+        task = repo.create_task("p1", "task-1", "desc", TaskSource.CLI)
+        other = repo.create_task("p1", "task-2", "desc", TaskSource.CLI)
+        for i in range(4):
+            repo.add_conversation(task.task_id, AgentRole.PM, f"msg-{i}")
+        repo.add_conversation(other.task_id, AgentRole.QA, "other")
+
+        seqs = [m.seq for m in repo.list_conversations(task.task_id)]
+        self.assertEqual(seqs, [1, 2, 3, 4])
+        self.assertEqual(repo.list_conversations(other.task_id)[0].seq, 1)
+
+        since = repo.list_conversations_since(task.task_id, after_seq=2)
+        self.assertEqual([m.content for m in since], ["msg-2", "msg-3"])
+        self.assertEqual(repo.list_conversations_since(task.task_id, after_seq=4), [])
+        self.assertEqual(len(repo.list_conversations_since(task.task_id, after_seq=0, limit=1)), 1)
+
+        os.remove(tmp.name)
+
+    def test_unit_of_work_buffers_writes_until_flush(self):
+        tmp = tempfile.NamedTemporaryFile(delete=False)
+        tmp.close()
+        repo = ArchitectureRepository(db_path=tmp.name, backend="sqlite")
+        repo.upsert_project(
+            Project(
+                project_id="p1",
+                name="project1",
+                repo_url="https://example.com/repo.git",
+                default_branch="master",
+                tech_stack="python",
+            )
+        )
+        task = repo.create_task("p1", "task-1", "desc", TaskSource.CLI)
+
+        with repo.unit_of_work() as uow:
+            repo.add_conversation(task.task_id, AgentRole.PM, "first")
+            repo.add_conversation(task.task_id, AgentRole.CTO, "second")
+            # 버퍼된 전이는 행을 읽지 않는다: 이 unit of work에서 처음 보는 태스크면 None이고 flush 때 반영된다.
+            self.assertIsNone(repo.update_task_status(task.task_id, TaskStatus.IN_PROGRESS))
+            self.assertEqual(uow.pending, 3)
+            self.assertEqual(repo.list_conversations(task.task_id), [])
+            self.assertEqual(repo.get_task(task.task_id).status, TaskStatus.PENDING)
+
+        self.assertEqual([m.seq for m in repo.list_conversations(task.task_id)], [1, 2])
+        self.assertEqual(repo.get_task(task.task_id).status, TaskStatus.IN_PROGRESS)
+
+        repo.add_conversations(
+            [
+                ConversationMessage.new(task.task_id, AgentRole.QA, "bulk-1"),
+                ConversationMessage.new(task.task_id, AgentRole.QA, "bulk-2"),
+            ]
+        )
+        self.assertEqual([m.seq for m in repo.list_conversations(task.task_id)], [1, 2, 3, 4])
+
+        # 다른 저장소 인스턴스의 쓰기는 이 unit of work에 합류하지 않고 바로 반영된다.
+        other = ArchitectureRepository(db_path=tmp.name, backend="sqlite")
+        with repo.unit_of_work() as uow:
+            other.add_conversation(task.task_id, AgentRole.QA, "other-repo")
+            self.assertEqual(uow.pending, 0)
+            self.assertEqual(repo.list_conversations(task.task_id)[-1].content, "other-repo")
+
+        os.remove(tmp.name)
+
+    def test_repository_cache_hits_and_invalidates_on_status_update(self):
+        tmp = tempfile.NamedTemporaryFile(delete=False)
+        tmp.close()
+        repo = ArchitectureRepository(db_path=tmp.name, backend="sqlite", cache_size=16)
+        repo.upsert_project(
+            Project(
+                project_id="p1",
+                name="project1",
+                repo_url="https://example.com/repo.git",
+                default_branch="master",
+                tech_stack="python",
+            )
+        )
+        task = repo.create_task("p1", "task-1", "desc", TaskSource.CLI)
+
+        self.assertEqual(repo.get_task(task.task_id).status, TaskStatus.PENDING)
+        self.assertEqual(repo.get_task(task.task_id).status, TaskStatus.PENDING)
+        stats = repo.get_cache_stats()
+        self.assertEqual(stats["misses"], 1)
+        self.assertEqual(stats["hits"], 1)
+
+        repo.update_task_status(task.task_id, TaskStatus.IN_PROGRESS)
+        self.assertEqual(repo.get_task(task.task_id).status, TaskStatus.IN_PROGRESS)
+
+        with repo.unit_of_work():
+            repo.update_task_status(task.task_id, TaskStatus.DONE)
+        self.assertEqual(repo.get_task(task.task_id).status, TaskStatus.DONE)
+
+        os.remove(tmp.name)
+
+    def test_workflow_batches_node_writes_and_flushes_only_progress_nodes(self):
+        tmp = tempfile.NamedTemporaryFile(delete=False)
+        tmp.close()
+        repo = ArchitectureRepository(db_path=tmp.name, backend="sqlite")
+        repo.upsert_project(
+            Project(
+                project_id="p1",
+                name="project1",
+                repo_url="https://example.com/repo.git",
+                default_branch="master",
+                tech_stack="python",
+            )
+        )
+        orchestrator = ManagerOrchestrator(repo)
+        task = repo.create_task("p1", "task-1", "desc", TaskSource.CLI)
+        seen_by_qa = []
+        engine = orchestrator.workflow_engine
+        qa_node = engine._qa_node
+
+        def observing_qa(state):
+            seen_by_qa.extend(m.agent_role for m in repo.list_conversations(task.task_id))
+            return qa_node(state)
+
+        engine._qa_node = observing_qa
+        engine._compiled_graph = None
+        writes = []
+        backend = repo.backend
+        for name in ("update_task_status", "write_batch", "add_conversation", "add_conversations"):
+            original = getattr(backend, name)
+            setattr(backend, name, lambda *a, _f=original, _n=name, **kw: writes.append(_n) or _f(*a, **kw))
+        final = orchestrator.execute_task(task.task_id)
+
+        self.assertEqual(final.status, TaskStatus.DONE)
+        # 선점, developer(진행 노드) flush, 종료 전이(나머지 노드 기록 + 요약) 세 트랜잭션으로 끝난다.
+        self.assertEqual(writes, ["update_task_status", "write_batch", "update_task_status"])
+        # 진행 노드까지의 기록은 QA 노드가 돌 때 이미 보인다.
+        self.assertEqual(seen_by_qa[-3:], [AgentRole.PM, AgentRole.CTO, AgentRole.DEVELOPER])
+        contents = [m.content for m in repo.list_conversations(task.task_id)]
+        self.assertTrue(contents[-2].startswith("Workflow logs:"))
+        self.assertIn("done", contents[-1])
+
+        os.remove(tmp.name)
+
+    def test_execute_task_does_not_finish_a_task_whose_claim_was_lost(self):
+        tmp = tempfile.NamedTemporaryFile(delete=False)
+        tmp.close()
+        repo = ArchitectureRepository(db_path=tmp.name, backend="sqlite")
+        repo.upsert_project(
+            Project(
+                project_id="p1",
+                name="project1",
+                repo_url="https://example.com/repo.git",
+                default_branch="master",
+                tech_stack="python",
+            )
+        )
+        orchestrator = ManagerOrchestrator(repo)
+        task = repo.create_task("p1", "task-1", "desc", TaskSource.CLI)
+        engine = orchestrator.workflow_engine
+        marketing_node = engine._marketing_node
+
+        def released_marketing(state):
+            # drain 기한 초과로 다른 곳에서 선점이 풀린 상황
+            orchestrator.release_task(task.task_id)
+            return marketing_node(state)
+
+        engine._marketing_node = released_marketing
+        engine._compiled_graph = None
+        final = orchestrator.execute_task(task.task_id)
+        self.assertEqual(final.status, TaskStatus.PENDING)
+        self.assertEqual(repo.get_task(task.task_id).status, TaskStatus.PENDING)
+
+        # 조건부 전이가 불일치면 버퍼는 남아 블록 종료 시 flush되고, 일치하면 전이와 함께 반영된다.
+        with repo.unit_of_work() as uow:
+            repo.add_conversation(task.task_id, AgentRole.QA, "buffered")
+            self.assertIsNone(orchestrator.update_status(task.task_id, TaskStatus.DONE, TaskStatus.IN_PROGRESS))
+            self.assertEqual(uow.pending, 1)
+            done = orchestrator.update_status(task.task_id, TaskStatus.DONE, TaskStatus.PENDING)
+            self.assertEqual(done.status, TaskStatus.DONE)
+            self.assertEqual(uow.pending, 0)
+            # 조건부 전이로 본 태스크는 이후 버퍼된 전이에서 다시 읽지 않고 버퍼 상태로 돌려준다.
+            reopened = repo.update_task_status(task.task_id, TaskStatus.FAILED)
+            self.assertEqual((reopened.task_id, reopened.status), (task.task_id, TaskStatus.FAILED))
+        contents = [m.content for m in repo.list_conversations(task.task_id)]
+        self.assertEqual(contents[-2], "buffered")
+        self.assertIn("done", contents[-1])
+
+        os.remove(tmp.name)
+
+    def test_conditional_status_transition_claims_task_once(self):
+        tmp = tempfile.NamedTemporaryFile(delete=False)
+        tmp.close()
+        repo = ArchitectureRepository(db_path=tmp.name, backend="sqlite")
+        repo.upsert_project(
+            Project(
+                project_id="p1",
+                name="project1",
+                repo_url="https://example.com/repo.git",
+                default_branch="master",
+                tech_stack="python",
+            )
+        )
+        orchestrator = ManagerOrchestrator(repo)
+        task = repo.create_task("p1", "task-1", "desc", TaskSource.CLI)
+
+        claimed = orchestrator.claim_task(task.task_id)
+        self.assertIsNotNone(claimed)
+        self.assertEqual(claimed.status, TaskStatus.IN_PROGRESS)
+        self.assertIsNone(orchestrator.claim_task(task.task_id))
+        self.assertIsNone(
+            repo.update_task_status(task.task_id, TaskStatus.DONE, expected_status=TaskStatus.PENDING)
+        )
+
+        messages = repo.list_conversations(task.task_id)
+        self.assertEqual(len(messages), 1)
+        self.assertEqual(messages[0].seq, 1)
+        self.assertIn("in_progress", messages[0].content)
+
+        q = LocalTaskQueue()
+        q.enqueue({"task_id": task.task_id})
+        result = WorkerRuntime(q, orchestrator).run_once(timeout_seconds=1)
+        self.assertTrue(result.ok)
+        self.assertEqual(result.message, "Task already claimed")
+
+        # drain 기한을 넘긴 태스크는 선점을 풀어 다시 claim할 수 있게 한다.
+        self.assertEqual(orchestrator.release_task(task.task_id).status, TaskStatus.PENDING)
+        self.assertIsNone(orchestrator.release_task(task.task_id))
+        self.assertIsNotNone(orchestrator.claim_task(task.task_id))
+
+        os.remove(tmp.name)
+
+    def test_sqlite_queue_is_shared_and_requeues_unacked_jobs(self):
+        tmp = tempfile.NamedTemporaryFile(delete=False)
+        tmp.close()
+        producer = SqliteTaskQueue(tmp.name)
+        consumer = SqliteTaskQueue(tmp.name, visibility_timeout_seconds=0.05)
+        job_ids = [producer.enqueue({"task_id": f"t{i}"}) for i in range(3)]
+
+        first = consumer.dequeue_many(2, timeout_seconds=1)
+        self.assertEqual([j["job_id"] for j in first], job_ids[:2])
+        consumer.ack(first[0])
+
+        # ack되지 않은 job은 visibility timeout 이후 다시 전달된다.
+        time.sleep(0.1)
+        redelivered = consumer.dequeue_many(5, timeout_seconds=1)
+        self.assertEqual(sorted(j["job_id"] for j in redelivered), sorted(job_ids[1:]))
+        for job in redelivered:
+            consumer.ack(job)
+        self.assertIsNone(consumer.dequeue(timeout_seconds=0))
+
+        producer.close()
+        consumer.close()
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(tmp.name + suffix):
+                os.remove(tmp.name + suffix)
+
+    def test_worker_reclaims_redelivered_job_after_crash(self):
+        tmp = tempfile.NamedTemporaryFile(delete=False)
+        tmp.close()
+        repo = ArchitectureRepository(db_path=tmp.name, backend="sqlite")
+        repo.upsert_project(
+            Project(
+                project_id="p1",
+                name="project1",
+                repo_url="https://example.com/repo.git",
+                default_branch="master",
+                tech_stack="python",
+            )
+        )
+        orchestrator = ManagerOrchestrator(repo)
+        task = repo.create_task("p1", "task-1", "desc", TaskSource.CLI)
+        q = SqliteTaskQueue(tmp.name, visibility_timeout_seconds=0.05)
+        q.enqueue({"task_id": task.task_id})
+
+        # 첫 워커가 선점 후 ack 없이 죽은 상황
+        crashed = q.dequeue(timeout_seconds=1)
+        self.assertEqual(crashed["delivery_count"], 1)
+        orchestrator.claim_task(task.task_id, owner=crashed["job_id"])
+
+        time.sleep(0.1)
+        result = WorkerRuntime(q, orchestrator).run_once(timeout_seconds=1)
+        self.assertTrue(result.ok)
+        self.assertEqual(result.payload["delivery_count"], 2)
+        self.assertEqual(result.message, "Task executed")
+        self.assertEqual(repo.get_task(task.task_id).status, TaskStatus.DONE)
+        self.assertIsNone(q.dequeue(timeout_seconds=0))
+
+        q.close()
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(tmp.name + suffix):
+                os.remove(tmp.name + suffix)
+
+    def test_worker_renews_lease_so_long_job_is_not_redelivered_or_hijacked(self):
+        tmp = tempfile.NamedTemporaryFile(delete=False)
+        tmp.close()
+        repo = ArchitectureRepository(db_path=tmp.name, backend="sqlite")
+        repo.upsert_project(
+            Project(
+                project_id="p1",
+                name="project1",
+                repo_url="https://example.com/repo.git",
+                default_branch="master",
+                tech_stack="python",
+            )
+        )
+        task = repo.create_task("p1", "task-1", "desc", TaskSource.CLI)
+        runs = []
+        gate = threading.Event()
+
+        class SlowWorkflow:
+            def execute(self, task):
+                runs.append(task.task_id)
+                gate.wait(5)
+                return {"logs": []}
+
+        orchestrator = ManagerOrchestrator(repo, workflow_engine=SlowWorkflow())
+        q = SqliteTaskQueue(tmp.name, visibility_timeout_seconds=0.2, poll_interval_seconds=0.01)
+        q.enqueue({"task_id": task.task_id, "project_id": "p1"})
+        worker = WorkerRuntime(q, orchestrator)
+        heartbeat = WorkerHeartbeat(worker, worker_id="w1", interval_seconds=0.05)
+        self.assertEqual(worker.dispatch(timeout_seconds=1), 1)
+
+        # visibility timeout의 몇 배 동안 실행돼도 heartbeat가 lease를 늘려 다른 워커가 다시 가져가지 못한다.
+        other = WorkerRuntime(SqliteTaskQueue(tmp.name, visibility_timeout_seconds=0.2), orchestrator)
+        deadline = time.monotonic() + 0.8
+        while time.monotonic() < deadline:
+            heartbeat.beat()
+            self.assertEqual(other.run_once(timeout_seconds=0).message, "No task in queue")
+            time.sleep(0.02)
+        gate.set()
+        worker.drain(5)
+        self.assertEqual(runs, [task.task_id])
+        self.assertEqual(repo.get_task(task.task_id).status, TaskStatus.DONE)
+        self.assertIsNone(q.dequeue(timeout_seconds=0))
+
+        # lease가 만료돼 재전달되더라도 다른 job이 선점한 IN_PROGRESS는 가로채지 않는다.
+        running = orchestrator.claim_task(task.task_id, owner="job-live")
+        self.assertEqual(running.claimed_by, "job-live")
+        self.assertIsNone(orchestrator.claim_task(task.task_id, reclaim=True, owner="job-other"))
+        self.assertEqual(orchestrator.claim_task(task.task_id, reclaim=True, owner="job-live").claimed_by, "job-live")
+        worker.close()
+        heartbeat.remove()
+        q.close()
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(tmp.name + suffix):
+                os.remove(tmp.name + suffix)
+
+    def test_queue_batch_enqueue_and_worker_run_batch(self):
+        tmp = tempfile.NamedTemporaryFile(delete=False)
+        tmp.close()
+        repo = ArchitectureRepository(db_path=tmp.name, backend="sqlite")
+        repo.upsert_project(
+            Project(
+                project_id="p1",
+                name="project1",
+                repo_url="https://example.com/repo.git",
+                default_branch="master",
+                tech_stack="python",
+            )
+        )
+        orchestrator = ManagerOrchestrator(repo)
+        tasks = [repo.create_task("p1", f"task-{i}", "desc", TaskSource.CLI) for i in range(5)]
+
+        for q in (LocalTaskQueue(), SqliteTaskQueue(tmp.name)):
+            job_ids = q.enqueue_many([{"task_id": t.task_id} for t in tasks])
+            self.assertEqual(len(set(job_ids)), 5)
+            worker = WorkerRuntime(q, orchestrator, concurrency=3)
+            first = worker.run_batch(timeout_seconds=1)
+            second = worker.run_batch(timeout_seconds=1)
+            self.assertEqual(len(first), 3)
+            self.assertEqual(len(second), 2)
+            self.assertTrue(all(r.ok and r.message == "Task executed" for r in first + second))
+            self.assertEqual(worker.free_slots(), 3)
+            self.assertEqual(worker.run_batch(timeout_seconds=0), [])
+            worker.close()
+
+        self.assertTrue(all(repo.get_task(t.task_id).status == TaskStatus.DONE for t in tasks))
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(tmp.name + suffix):
+                os.remove(tmp.name + suffix)
+
+    def test_worker_dispatch_refills_slots_without_waiting_for_batch(self):
+        gates = {f"t{i}": threading.Event() for i in range(4)}
+
+        class GatedOrchestrator:
+            def execute_task(self, task_id, reclaim=False, on_error=None, owner=None):
+                gates[task_id].wait(5)
+                return type("Task", (), {"status": TaskStatus.DONE})()
+
+        q = LocalTaskQueue()
+        q.enqueue_many([{"task_id": task_id} for task_id in gates])
+        results = []
+        worker = WorkerRuntime(q, GatedOrchestrator(), concurrency=2)
+
+        self.assertEqual(worker.dispatch(timeout_seconds=0, on_result=results.append), 2)
+        self.assertEqual(worker.free_slots(), 0)
+        # 슬롯이 다 찼으면 큐에서 더 꺼내지 않는다.
+        self.assertEqual(worker.dispatch(timeout_seconds=0.05, on_result=results.append), 0)
+        self.assertEqual(q.stats()["depth"], 2)
+
+        # 한 job이 끝나면 나머지 job을 기다리지 않고 빈 슬롯 하나만 채운다.
+        gates["t0"].set()
+        self.assertEqual(worker.dispatch(timeout_seconds=1, on_result=results.append), 1)
+        self.assertEqual(q.stats()["depth"], 1)
+
+        for gate in gates.values():
+            gate.set()
+        self.assertEqual(worker.dispatch(timeout_seconds=1, on_result=results.append), 1)
+        worker.close()
+        self.assertEqual(sorted(r.task_id for r in results), ["t0", "t1", "t2", "t3"])
+        self.assertTrue(all(r.ok for r in results))
+        self.assertEqual(worker.free_slots(), 2)
+
+    def test_worker_drain_stops_dequeue_and_requeues_unfinished_jobs(self):
+        gates = {"fast": threading.Event(), "slow": threading.Event()}
+        released = []
+
+        class GatedOrchestrator:
+            def execute_task(self, task_id, reclaim=False, on_error=None, owner=None):
+                gates[task_id].wait(5)
+                return type("Task", (), {"status": TaskStatus.DONE})()
+
+            def release_task(self, task_id):
+                released.append(task_id)
+
+        q = LocalTaskQueue()
+        q.enqueue_many([{"task_id": "fast"}, {"task_id": "slow"}])
+        worker = WorkerRuntime(q, GatedOrchestrator(), concurrency=2)
+        self.assertEqual(worker.dispatch(timeout_seconds=0), 2)
+
+        gates["fast"].set()
+        leftovers = worker.drain(0.3)
+        self.assertEqual([p["task_id"] for p in leftovers], ["slow"])
+        # drain 중에는 새 job을 가져오지 않는다.
+        q.enqueue({"task_id": "late"})
+        self.assertEqual(worker.dispatch(timeout_seconds=0), 0)
+
+        worker.abandon(leftovers)
+        self.assertEqual(released, ["slow"])
+        self.assertEqual(sorted(j["task_id"] for j in q.dequeue_many(10, timeout_seconds=0)), ["late", "slow"])
+        gates["slow"].set()
+        worker.close()
+
+    def test_worker_heartbeat_publishes_running_jobs_to_registry(self):
+        tmp = tempfile.NamedTemporaryFile(delete=False)
+        tmp.close()
+        gate = threading.Event()
+
+        class GatedOrchestrator:
+            def execute_task(self, task_id, reclaim=False, on_error=None, owner=None):
+                gate.wait(5)
+                return type("Task", (), {"status": TaskStatus.DONE})()
+
+        q = SqliteTaskQueue(tmp.name)
+        q.enqueue({"task_id": "t1"})
+        worker = WorkerRuntime(q, GatedOrchestrator(), concurrency=2)
+        heartbeat = WorkerHeartbeat(worker, worker_id="w1", extra=lambda: {"slot": 0})
+        self.assertEqual(worker.dispatch(timeout_seconds=0), 1)
+        heartbeat.beat()
+
+        view = describe_workers(q, stale_after_seconds=30)
+        (record,) = view["workers"]
+        self.assertEqual((record["worker_id"], record["slot"], record["stale"]), ("w1", 0, False))
+        self.assertEqual(record["slots_used"], 1)
+        self.assertEqual([job["task_id"] for job in record["running"]], ["t1"])
+        self.assertEqual((view["slots_total"], view["slots_used"]), (2, 1))
+        # 같은 시각 기준으로 heartbeat가 stale_after를 넘기면 stale로 본다.
+        stale_view = describe_workers(q, stale_after_seconds=30, now=record["last_seen"] + 31)
+        self.assertEqual((stale_view["live"], stale_view["stale"]), (0, 1))
+
+        gate.set()
+        worker.drain(5)
+        heartbeat.beat("draining", force=True)
+        self.assertEqual(q.list_workers()[0]["tasks_completed"], 1)
+        heartbeat.remove()
+        self.assertEqual(q.list_workers(), [])
+        worker.close()
+        q.close()
+        os.remove(tmp.name)
+
+    def test_llm_rate_limiter_paces_calls_per_model_and_falls_back_locally(self):
+        self.assertEqual(
+            parse_rate_limits("gpt-4o=500:30000, claude=50"),
+            {"gpt-4o": RateLimit(500, 30000), "claude": RateLimit(50, 0)},
+        )
+
+        limiter = LLMRateLimiter({"gpt-4o": RateLimit(tokens_per_minute=600)})
+        self.assertEqual(limiter.acquire("gpt-4o", tokens=600), 0.0)
+        # 10 tokens/s: bucket이 빈 뒤 5 토큰은 약 0.5초 기다린다. 한도 없는 모델은 바로 통과.
+        waited = limiter.acquire("gpt-4o", tokens=5)
+        self.assertGreater(waited, 0.3)
+        self.assertEqual(limiter.acquire("other-model", tokens=10_000), 0.0)
+        self.assertEqual(limiter.metrics()["throttled_total"], 1)
+        self.assertEqual(limiter.metrics()["wait_seconds"]["count"], 2)
+
+        class BrokenBackend:
+            def reserve(self, key, limit, tokens):
+                raise ConnectionError("redis down")
+
+        fallback = LLMRateLimiter({}, default_limit=RateLimit(requests_per_minute=60), backend=BrokenBackend())
+        self.assertEqual(fallback.acquire("gpt-4o"), 0.0)
+        self.assertEqual(fallback.metrics()["backend_errors_total"], 1)
+
+    def test_content_addressed_cache_evicts_lru_and_reuses_disk_tier(self):
+        with tempfile.TemporaryDirectory() as disk_dir:
+            cache = ContentAddressedCache(maxsize=1, disk_dir=disk_dir)
+            cache.set(("org/repo", "a" * 40, "package.json"), "{}")
+            cache.set(("org/repo", "a" * 40, "docs/plan/x.md"), "plan")
+            self.assertEqual(cache.get(("org/repo", "a" * 40, "docs/plan/x.md")), "plan")
+            # 메모리에서 밀려난 항목은 디스크에서 다시 올라온다.
+            self.assertEqual(cache.get(("org/repo", "a" * 40, "package.json")), "{}")
+            self.assertIsNone(cache.get(("org/repo", "b" * 40, "package.json")))
+            self.assertEqual((cache.stats()["hits"], cache.stats()["disk_hits"], cache.stats()["misses"]), (1, 1, 1))
+
+            # 다른 프로세스(새 인스턴스)도 디스크 계층을 재사용한다.
+            fresh = ContentAddressedCache(disk_dir=disk_dir)
+            self.assertEqual(fresh.get(("org/repo", "a" * 40, "docs/plan/x.md")), "plan")
+
+    def test_run_isolated_returns_result_and_kills_runaway_child(self):
+        events = []
+        pid = run_isolated(_isolated_stage, (0,), timeout_seconds=30, on_event=events.append)
+        self.assertNotEqual(pid, os.getpid())
+        self.assertEqual(events, [{"step": 1}])
+
+        with self.assertRaisesRegex(IsolatedExecutionError, "ValueError: boom"):
+            run_isolated(_isolated_stage, (0, True), timeout_seconds=30)
+
+        started = time.monotonic()
+        with self.assertRaises(TimeoutError):
+            run_isolated(_isolated_stage, (60,), timeout_seconds=1.5, name="runaway")
+        # 폭주한 자식을 기다리지 않고 기한 직후 돌아온다.
+        self.assertLess(time.monotonic() - started, 30)
+        self.assertTrue(issubclass(IsolatedTimeoutError, TimeoutError))
+
+    def test_worker_loop_recycles_after_max_tasks_and_supervisor_restarts_crashes(self):
+        class InstantOrchestrator:
+            def execute_task(self, task_id, reclaim=False, on_error=None, owner=None):
+                return type("Task", (), {"status": TaskStatus.DONE})()
+
+        q = LocalTaskQueue()
+        q.enqueue_many([{"task_id": f"t{i}"} for i in range(5)])
+        reports = []
+        reason = _run_loop(
+            WorkerRuntime(q, InstantOrchestrator(), concurrency=2),
+            threading.Event(),
+            max_tasks=3,
+            report=reports.append,
+        )
+        # N건을 채우면 더 가져오지 않고 종료해 새 프로세스로 교체될 수 있게 한다.
+        self.assertEqual(reason, "max_tasks")
+        self.assertEqual(q.stats()["depth"], 2)
+        self.assertEqual(reports[-1]["processed"], 3)
+
+        supervisor = WorkerSupervisor(1, target=_crashing_child, shutdown_grace_seconds=5)
+        stop = threading.Event()
+        threading.Timer(2.5, stop.set).start()
+        supervisor.run(stop, status_interval_seconds=0)
+        [row] = supervisor.status()
+        self.assertGreaterEqual(row["crashes"], 1)
+        self.assertGreaterEqual(row["restarts"], 1)
+
+    def test_queue_priority_lanes_are_weighted_and_starvation_free(self):
+        q = LocalTaskQueue()
+        for i in range(20):
+            q.enqueue({"task_id": f"low-{i}"}, priority="low")
+        for i in range(20):
+            q.enqueue({"task_id": f"high-{i}"}, priority="high")
+        q.enqueue({"task_id": "normal-0"})
+
+        first = q.dequeue_many(10, timeout_seconds=0)
+        self.assertTrue(first[0]["task_id"].startswith("high-"))
+        lanes = [j["priority"] for j in first]
+        # 가중 라운드로빈: high가 대부분이지만 normal/low도 한 바퀴 안에 최소 한 번은 나온다.
+        self.assertGreater(lanes.count("high"), lanes.count("low"))
+        self.assertIn("normal", lanes)
+        self.assertIn("low", lanes)
+        with self.assertRaises(ValueError):
+            q.enqueue({"task_id": "x"}, priority="urgent")
+
+        tmp = tempfile.NamedTemporaryFile(delete=False)
+        tmp.close()
+        sq = SqliteTaskQueue(tmp.name, priority_aging_seconds=60)
+        sq.enqueue({"task_id": "normal"})
+        sq.enqueue({"task_id": "high"}, priority="high")
+        # 오래 기다린 low job은 aging으로 새 high job보다 먼저 나간다.
+        sq.enqueue({"task_id": "old-low", "enqueued_at": time.time() - 300}, priority="low")
+        order = [j["task_id"] for j in sq.dequeue_many(3, timeout_seconds=0)]
+        self.assertEqual(order, ["old-low", "high", "normal"])
+        sq.close()
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(tmp.name + suffix):
+                os.remove(tmp.name + suffix)
+
+    def test_fair_queue_round_robins_projects_and_respects_caps(self):
+        tmp = tempfile.NamedTemporaryFile(delete=False)
+        tmp.close()
+        repo = ArchitectureRepository(db_path=tmp.name, backend="sqlite")
+        for project_id, cap in (("big", 1), ("small", 0)):
+            repo.upsert_project(
+                Project(
+                    project_id=project_id,
+                    name=project_id,
+                    repo_url="https://example.com/repo.git",
+                    default_branch="master",
+                    tech_stack="python",
+                    max_concurrency=cap,
+                )
+            )
+        self.assertEqual(repo.get_project("big").max_concurrency, 1)
+        self.assertEqual(repo.get_project_concurrency_limits(), {"big": 1})
+
+        queues = (
+            LocalTaskQueue(fair=True, project_limits=repo.get_project_concurrency_limits),
+            SqliteTaskQueue(tmp.name, fair=True, project_limits=repo.get_project_concurrency_limits),
+        )
+        for q in queues:
+            q.enqueue_many([{"task_id": f"big-{i}", "project_id": "big"} for i in range(5)])
+            q.enqueue({"task_id": "small-0", "project_id": "small"})
+
+            # big 프로젝트 backlog가 먼저 쌓여 있어도 small 프로젝트가 같은 배치에 끼어든다.
+            first = q.dequeue_many(5, timeout_seconds=0)
+            self.assertEqual(sorted(j["task_id"] for j in first), ["big-0", "small-0"])
+            # big은 상한 1에 걸려 ack 전까지 더 나가지 않는다.
+            self.assertEqual(q.dequeue_many(5, timeout_seconds=0), [])
+            for job in first:
+                q.ack(job)
+            self.assertEqual([j["task_id"] for j in q.dequeue_many(5, timeout_seconds=0)], ["big-1"])
+
+        queues[1].close()
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(tmp.name + suffix):
+                os.remove(tmp.name + suffix)
+
+    def test_worker_retries_failed_task_with_backoff_then_dead_letters(self):
+        class FailingWorkflow:
+            def execute(self, task):
+                raise RuntimeError("transient LLM error")
+
+        tmp = tempfile.NamedTemporaryFile(delete=False)
+        tmp.close()
+        repo = ArchitectureRepository(db_path=tmp.name, backend="sqlite")
+        repo.upsert_project(
+            Project(
+                project_id="p1",
+                name="project1",
+                repo_url="https://example.com/repo.git",
+                default_branch="master",
+                tech_stack="python",
+            )
+        )
+        task = repo.create_task("p1", "task-1", "desc", TaskSource.CLI)
+        orchestrator = ManagerOrchestrator(repo, workflow_engine=FailingWorkflow())
+        policy = RetryPolicy(max_attempts=2, base_delay_seconds=0.05, jitter_ratio=0)
+
+        for q in (LocalTaskQueue(), SqliteTaskQueue(tmp.name, poll_interval_seconds=0.01)):
+            # 지연 job은 만기 전에는 보이지 않는다.
+            q.enqueue({"task_id": "later"}, delay_seconds=0.05)
+            self.assertIsNone(q.dequeue(timeout_seconds=0))
+            later = q.dequeue(timeout_seconds=1)
+            self.assertEqual(later["task_id"], "later")
+            q.ack(later)
+
+            worker = WorkerRuntime(q, orchestrator, retry_policy=policy)
+            q.enqueue({"task_id": task.task_id, "project_id": "p1"})
+            first = worker.run_once(timeout_seconds=1)
+            self.assertFalse(first.ok)
+            self.assertIn("retry 2/2", first.message)
+            self.assertIsNone(q.dequeue(timeout_seconds=0))
+
+            second = worker.run_once(timeout_seconds=1)
+            self.assertFalse(second.ok)
+            self.assertIn("dead-lettered after 2 attempts", second.message)
+            dead = q.list_dead_letters()
+            self.assertEqual(len(dead), 1)
+            self.assertEqual(dead[0]["payload"]["attempt"], 2)
+            self.assertIsNone(q.dequeue(timeout_seconds=0.1))
+
+        self.assertEqual(repo.get_task(task.task_id).status, TaskStatus.FAILED)
+
+        # 재시도 대기 중 다른 job이 태스크를 선점하면, 도착한 재시도는 그 실행을 가로채지 않는다.
+        calls = []
+
+        class FlakyWorkflow:
+            def execute(self, task):
+                calls.append(task.task_id)
+                raise RuntimeError("transient LLM error")
+
+        q = LocalTaskQueue()
+        worker = WorkerRuntime(q, ManagerOrchestrator(repo, workflow_engine=FlakyWorkflow()), retry_policy=policy)
+        first_job_id = q.enqueue({"task_id": task.task_id, "project_id": "p1"})
+        self.assertIn("retry 2/2", worker.run_once(timeout_seconds=1).message)
+        self.assertIsNotNone(orchestrator.claim_task(task.task_id, owner="manual-job"))
+        retried = worker.run_once(timeout_seconds=1)
+        self.assertEqual(retried.message, "Task already claimed")
+        self.assertEqual(retried.payload["claim_owner"], first_job_id)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(repo.get_task(task.task_id).claimed_by, "manual-job")
+        orchestrator.update_status(task.task_id, TaskStatus.FAILED)
+
+        # 재시도해도 같은 결과인 실패(입력 오류, 4xx)는 시도 횟수와 관계없이 바로 dead-letter로 보낸다.
+        class HTTPError(Exception):
+            def __init__(self, status_code):
+                super().__init__(f"HTTP {status_code}")
+                self.status_code = status_code
+
+        self.assertTrue(policy.is_retryable(None))
+        self.assertTrue(policy.is_retryable(HTTPError(503)))
+        self.assertTrue(policy.is_retryable(HTTPError(429)))
+        self.assertFalse(policy.is_retryable(HTTPError(401)))
+        self.assertFalse(policy.is_retryable(ValueError("bad spec")))
+
+        class BrokenWorkflow:
+            def execute(self, task):
+                raise HTTPError(404)
+
+        q = LocalTaskQueue()
+        worker = WorkerRuntime(q, ManagerOrchestrator(repo, workflow_engine=BrokenWorkflow()), retry_policy=policy)
+        q.enqueue({"task_id": task.task_id, "project_id": "p1"})
+        result = worker.run_once(timeout_seconds=1)
+        self.assertFalse(result.ok)
+        self.assertIn("dead-lettered without retry", result.message)
+        self.assertEqual(len(q.list_dead_letters()), 1)
+        self.assertIsNone(q.dequeue(timeout_seconds=0.1))
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(tmp.name + suffix):
+                os.remove(tmp.name + suffix)
+
+
+    def test_enqueue_unique_suppresses_duplicates_within_window(self):
+        tmp = tempfile.NamedTemporaryFile(delete=False)
+        tmp.close()
+        queues = (LocalTaskQueue(dedup_window_seconds=0.2), SqliteTaskQueue(tmp.name, dedup_window_seconds=0.2))
+        for q in queues:
+            job_id, deduplicated = q.enqueue_unique({"task_id": "t1"}, "task:t1")
+            self.assertFalse(deduplicated)
+            again_id, deduplicated = q.enqueue_unique({"task_id": "t1"}, "task:t1", priority="high")
+            self.assertTrue(deduplicated)
+            self.assertEqual(again_id, job_id)
+
+            # 동시에 들어온 중복 요청도 한 건만 적재된다.
+            results = []
+            threads = [
+                threading.Thread(target=lambda: results.append(q.enqueue_unique({"task_id": "t2"}, "task:t2")))
+                for _ in range(8)
+            ]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            self.assertEqual(sum(1 for _, dup in results if not dup), 1)
+            self.assertEqual(len({jid for jid, _ in results}), 1)
+
+            jobs = q.dequeue_many(10, timeout_seconds=0)
+            self.assertEqual(sorted(j["task_id"] for j in jobs), ["t1", "t2"])
+            for job in jobs:
+                q.ack(job)
+
+            # 창이 지나면 같은 key로 다시 적재된다.
+            time.sleep(0.25)
+            new_id, deduplicated = q.enqueue_unique({"task_id": "t1"}, "task:t1")
+            self.assertFalse(deduplicated)
+            self.assertNotEqual(new_id, job_id)
+            q.ack(q.dequeue(timeout_seconds=0))
+
+        queues[1].close()
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(tmp.name + suffix):
+                os.remove(tmp.name + suffix)
+
+
+    def test_queue_stats_and_worker_latency_histograms(self):
+        tmp = tempfile.NamedTemporaryFile(delete=False)
+        tmp.close()
+        repo = ArchitectureRepository(db_path=tmp.name, backend="sqlite")
+        orchestrator = ManagerOrchestrator(repo)
+        queues = (LocalTaskQueue(), SqliteTaskQueue(tmp.name))
+        for q in queues:
+            q.enqueue({"task_id": "a", "enqueued_at": time.time() - 30})
+            q.enqueue({"task_id": "b"})
+            q.enqueue({"task_id": "later"}, delay_seconds=60)
+            stats = q.stats()
+            self.assertEqual((stats["depth"], stats["delayed"], stats["inflight"]), (2, 1, 0))
+            self.assertGreaterEqual(stats["oldest_age_seconds"], 0.0)
+
+            job = q.dequeue(timeout_seconds=0)
+            stats = q.stats()
+            self.assertEqual((stats["depth"], stats["inflight"]), (1, 1))
+            q.ack(job)
+            self.assertEqual(q.stats()["inflight"], 0)
+
+            # 워커는 dequeue 대기와 실행 시간을 히스토그램에 남긴다 (task_id 없는 job도 실행 1회로 잡힌다).
+            worker = WorkerRuntime(q, orchestrator)
+            worker.run_once(timeout_seconds=0)
+            metrics = worker.metrics()
+            self.assertEqual(metrics["queue_wait_seconds"]["count"], 1)
+            self.assertEqual(metrics["execution_seconds"]["count"], 1)
+            self.assertEqual(metrics["queue_wait_seconds"]["buckets"]["+Inf"], 1)
+
+            text = render_queue_metrics(q.stats(), metrics)
+            self.assertIn(f'agent_queue_depth{{queue="{q.stats()["queue_name"]}"}} 0.0', text)
+            self.assertIn("agent_queue_delayed_jobs", text)
+            self.assertIn("# TYPE agent_queue_wait_seconds histogram", text)
+
+        queues[1].close()
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(tmp.name + suffix):
+                os.remove(tmp.name + suffix)
+
+
+    @unittest.skipUnless(fakeredis, "fakeredis not installed")
+    def test_usage_forwarder_sends_deltas_to_parent_instead_of_writing_the_file(self):
+        import usage_tracking
+
+        deltas = []
+        original_file = usage_tracking._usage_file
+        with tempfile.TemporaryDirectory() as tmp:
+            usage_tracking._usage_file = lambda: usage_tracking.Path(tmp) / "usage.json"
+            try:
+                usage_tracking.set_usage_forwarder(deltas.append)
+                usage_tracking.add_usage(120, 0)
+                usage_tracking.add_usage(0, 30, increment_calls=False)
+                self.assertFalse(usage_tracking._usage_file().exists())
+
+                # 부모는 받은 증분을 그대로 add_usage로 재생한다.
+                usage_tracking.set_usage_forwarder(None)
+                for delta in deltas:
+                    usage_tracking.add_usage(**delta)
+                self.assertEqual(usage_tracking._load(), {"input_tokens": 120, "output_tokens": 30, "calls": 1})
+            finally:
+                usage_tracking.set_usage_forwarder(None)
+                usage_tracking._usage_file = original_file
+
+    def test_redis_reliable_claim_leases_atomically_and_survives_crash(self):
+        server = fakeredis.FakeServer()
+        original = RedisTaskQueue._create_client
+        RedisTaskQueue._create_client = staticmethod(lambda url: fakeredis.FakeRedis(server=server, decode_responses=True))
+        try:
+            for fair in (False, True):
+                name = f"test:q:{'fair' if fair else 'lane'}"
+                crashed = RedisTaskQueue(
+                    "redis://fake", name, reliable=True, fair=fair, consumer_id="c1", visibility_timeout_seconds=0.2
+                )
+                crashed.enqueue({"task_id": "t1", "project_id": "p1"})
+
+                # claim 스크립트 직후(로컬 기록 전) 워커가 죽은 상황
+                def crash(raws, deliveries):
+                    raise SystemExit("worker died")
+
+                crashed._register_inflight = crash
+                with self.assertRaises(SystemExit):
+                    crashed.dequeue_many(1, timeout_seconds=0)
+                raw = crashed.client.lindex(crashed.processing_list, 0)
+                self.assertIsNotNone(raw)
+                # processing list로 옮겨진 job은 이미 lease가 잡혀 있어 reaper가 찾을 수 있다.
+                self.assertIsNotNone(crashed.client.zscore(crashed.inflight_key, f"{crashed.processing_list}|{raw}"))
+
+                survivor = RedisTaskQueue(
+                    "redis://fake", name, reliable=True, fair=fair, consumer_id="c2", visibility_timeout_seconds=30
+                )
+                time.sleep(0.3)
+                self.assertEqual(survivor.reap_expired(), 1)
+                self.assertEqual(survivor.client.llen(crashed.processing_list), 0)
+                [job] = survivor.dequeue_many(1, timeout_seconds=0)
+                self.assertEqual((job["task_id"], job["delivery_count"]), ("t1", 2))
+                # 실행 중 lease를 늘리면 만료 직전이던 job도 reaper가 회수하지 않는다.
+                member = f"{survivor.processing_list}|{survivor.client.lindex(survivor.processing_list, 0)}"
+                survivor.client.zadd(survivor.inflight_key, {member: time.time() - 1})
+                survivor.extend_lease([job])
+                self.assertEqual(survivor.reap_expired(), 0)
+                survivor.ack(job)
+                self.assertEqual(survivor.client.zcard(survivor.inflight_key), 0)
+        finally:
+            RedisTaskQueue._create_client = original
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -110,6 +110,8 @@ class Phase5SecurityObservabilityTests(unittest.TestCase):
         self.assertIn("http_requests_total", payload)
         self.assertIn("ws_connections_total", payload)
         self.assertIn("task_executions_total", payload)
+        self.assertIn("db_pool", payload)
+        self.assertIn("repo_cache", payload)
 
         runtime = self.client.get("/api/runtime/profile")
         self.assertEqual(runtime.status_code, 200)
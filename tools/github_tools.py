@@ -7,20 +7,167 @@ tools/github_tools.py
 from __future__ import annotations
 
 import os
-from typing import List, Optional
-from github import Github
+import re
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Optional
+from github import Auth, Github
 from crewai.tools import BaseTool
 from pydantic import BaseModel, Field
 
+from core.cache import ContentAddressedCache, TTLCache
+
 
 # ─────────────────────────────────────────────
-# 공통 GitHub 클라이언트
+# 공통 GitHub 클라이언트 (프로세스 공용)
+# 토큰별 Github 하나를 재사용해 keep-alive HTTPS 세션 풀을 공유하고,
+# get_repo() 조회(API 1회)는 저장소별로 캐시한다.
 # ─────────────────────────────────────────────
+_clients: dict[str, Github] = {}
+_clients_lock = threading.Lock()
+_repos = TTLCache(maxsize=64, ttl_seconds=float(os.getenv("GITHUB_REPO_CACHE_TTL_SECONDS", "3600")))
+
+
+def _build_github(token: str) -> Github:
+    retry_total = int(os.getenv("GITHUB_RETRY_TOTAL", "3"))
+    backoff = float(os.getenv("GITHUB_RETRY_BACKOFF_SECONDS", "1"))
+    try:
+        # 5xx/secondary rate limit을 backoff 후 재시도 (PyGithub 2.x)
+        from github import GithubRetry
+        retry = GithubRetry(total=retry_total, backoff_factor=backoff)
+    except ImportError:
+        retry = retry_total
+    return Github(
+        auth=Auth.Token(token) if token else None,
+        retry=retry,
+        # 크루의 여러 툴 호출 스레드가 같은 세션을 쓰므로 커넥션 풀을 넉넉히 둔다.
+        pool_size=int(os.getenv("GITHUB_POOL_SIZE", "10")),
+        timeout=int(os.getenv("GITHUB_TIMEOUT_SECONDS", "15")),
+    )
+
+
+def get_github(token: str | None = None) -> Github:
+    """토큰별 공용 Github 클라이언트. token이 없으면 GITHUB_TOKEN (없으면 비인증)."""
+    token = (token if token is not None else os.getenv("GITHUB_TOKEN")) or ""
+    with _clients_lock:
+        client = _clients.get(token)
+        if client is None:
+            client = _clients[token] = _build_github(token)
+        return client
+
+
+def get_repository(repo_name: str | None = None, token: str | None = None):
+    """(토큰, 저장소)별로 캐시한 Repository. repo_name이 없으면 GITHUB_REPO."""
+    repo_name = (repo_name or os.getenv("GITHUB_REPO") or "").strip()
+    if not repo_name:
+        raise ValueError("GITHUB_REPO가 설정되지 않았습니다. 예: GITHUB_REPO=owner/repo")
+    token = (token if token is not None else os.getenv("GITHUB_TOKEN")) or ""
+    key = f"{hash(token)}:{repo_name}"
+    repo = _repos.get(key)
+    if repo is None:
+        repo = get_github(token).get_repo(repo_name)
+        _repos.set(key, repo)
+    return repo
+
+
+def reset_github_clients() -> None:
+    """토큰 교체 등으로 공용 클라이언트/저장소 캐시를 버린다."""
+    with _clients_lock:
+        clients = list(_clients.values())
+        _clients.clear()
+    _repos.clear()
+    for client in clients:
+        try:
+            client.close()
+        except Exception:
+            pass
+
+
 def get_github_client():
-    token = os.getenv("GITHUB_TOKEN")
-    repo_name = os.getenv("GITHUB_REPO")
-    g = Github(token)
-    return g.get_repo(repo_name)
+    """툴 공용 저장소 객체 (GITHUB_TOKEN / GITHUB_REPO)."""
+    return get_repository()
+
+
+# ─────────────────────────────────────────────
+# 파일 내용 캐시: (저장소, 커밋 SHA, 경로) -> 내용
+# 같은 크루의 에이전트들이 docs/skill/*, package.json 등을 반복해서 읽으므로
+# 브랜치를 SHA로 고정해 두고, 같은 SHA의 파일은 다시 받지 않는다.
+# ─────────────────────────────────────────────
+_COMMIT_SHA_RE = re.compile(r"^[0-9a-f]{40}$")
+_file_cache = ContentAddressedCache(
+    maxsize=int(os.getenv("GITHUB_FILE_CACHE_SIZE", "512")),
+    disk_dir=os.getenv("GITHUB_FILE_CACHE_DIR") or None,
+)
+# (저장소, 브랜치) -> [마지막 확인 시각(monotonic), GitRef]
+_branch_heads: dict[tuple[str, str], list] = {}
+_branch_heads_lock = threading.Lock()
+# 크루 실행 1회 동안 고정한 (저장소, 브랜치) -> SHA. 실행 밖(None)에서는 프로세스 공용 TTL만 쓴다.
+_run_pins: ContextVar[dict[tuple[str, str], str] | None] = ContextVar("github_run_pins", default=None)
+
+
+@contextmanager
+def pin_refs_for_run() -> Iterator[None]:
+    """블록(크루 kickoff 1회) 안에서 처음 읽은 브랜치 SHA를 끝까지 고정한다.
+
+    실행마다 새로 고정하므로 이전 실행이 본 head를 TTL 동안 물려받지 않고, 첫 조회 때 ETag로 재검증한다.
+    tool이 실행되는 스레드(crew.kickoff를 호출한 스레드)에서 열어야 한다.
+    """
+    token = _run_pins.set({})
+    try:
+        yield
+    finally:
+        _run_pins.reset(token)
+
+
+def _resolve_commit_sha(repo, ref: str) -> str | None:
+    """브랜치를 커밋 SHA로 고정한다. SHA를 알 수 없는 ref(태그 등)는 None (캐시하지 않음).
+
+    pin_refs_for_run() 안에서는 실행의 첫 조회 때 ETag(If-None-Match)로 재검증한 SHA를 실행 끝까지 쓴다.
+    실행 밖에서는 한 번 받은 ref를 GITHUB_REF_CACHE_TTL_SECONDS 동안 그대로 쓰고 이후 ETag로 재검증한다.
+    바뀌지 않았으면 304라 rate limit을 쓰지 않는다.
+    """
+    if _COMMIT_SHA_RE.match(ref):
+        return ref
+    key = (repo.full_name, ref)
+    pins = _run_pins.get()
+    if pins is not None and key in pins:
+        return pins[key]
+    ttl = 0.0 if pins is not None else float(os.getenv("GITHUB_REF_CACHE_TTL_SECONDS", "300"))
+    with _branch_heads_lock:
+        entry = _branch_heads.get(key)
+    now = time.monotonic()
+    try:
+        if entry is None:
+            entry = [now, repo.get_git_ref(f"heads/{ref}")]
+        elif now - entry[0] >= ttl:
+            entry[1].update()
+            entry[0] = now
+    except Exception:
+        with _branch_heads_lock:
+            _branch_heads.pop(key, None)
+        return None
+    with _branch_heads_lock:
+        _branch_heads[key] = entry
+    sha = entry[1].object.sha
+    if pins is not None:
+        pins[key] = sha
+    return sha
+
+
+def _forget_branch_head(repo, branch: str) -> None:
+    """이 프로세스가 브랜치에 커밋했으면 다음 읽기 때 새 SHA를 받도록 고정을 푼다 (실행 고정 포함)."""
+    key = (repo.full_name, branch)
+    with _branch_heads_lock:
+        _branch_heads.pop(key, None)
+    pins = _run_pins.get()
+    if pins is not None:
+        pins.pop(key, None)
+
+
+def get_file_cache_stats() -> dict:
+    return _file_cache.stats()
 
 
 # ─────────────────────────────────────────────
@@ -171,14 +318,24 @@ class ReadFileTool(BaseTool):
     def _run(self, file_path: str, branch: str = "main") -> str:
         repo = get_github_client()
         try:
-            content = repo.get_contents(file_path, ref=branch)
+            sha = _resolve_commit_sha(repo, branch)
+            key = (repo.full_name, sha, file_path) if sha else None
+            cached = _file_cache.get(key) if key else None
+            if cached is not None:
+                return cached
+            # 캐시 키와 같은 스냅샷을 읽도록 고정한 SHA로 요청한다.
+            content = repo.get_contents(file_path, ref=sha or branch)
             if isinstance(content, list):
                 items = [
                     f"{'[dir] ' if c.type == 'dir' else ''}{c.path}"
                     for c in content
                 ]
-                return f"디렉터리 '{file_path}' 내 항목 ({len(items)}개):\n" + "\n".join(items)
-            return content.decoded_content.decode("utf-8")
+                text = f"디렉터리 '{file_path}' 내 항목 ({len(items)}개):\n" + "\n".join(items)
+            else:
+                text = content.decoded_content.decode("utf-8")
+            if key:
+                _file_cache.set(key, text)
+            return text
         except Exception as e:
             return f"파일을 찾을 수 없습니다: {file_path} ({e})"
 
@@ -210,6 +367,7 @@ class WriteFileTool(BaseTool):
                 sha=existing.sha,
                 branch=branch,
             )
+            _forget_branch_head(repo, branch)
             return f"파일 수정 완료: {file_path} (브랜치: {branch})"
         except Exception:
             # 없으면 새로 생성
@@ -219,6 +377,7 @@ class WriteFileTool(BaseTool):
                 content=content,
                 branch=branch,
             )
+            _forget_branch_head(repo, branch)
             return f"파일 생성 완료: {file_path} (브랜치: {branch})"
 
 
@@ -1,12 +1,14 @@
 """
 usage_hooks.py
 
-CrewAI LLM 호출 전/후 훅: 토큰 사용량 집계, 상한 초과 시 호출 차단.
+CrewAI LLM 호출 전/후 훅: 토큰 사용량 집계, 상한 초과 시 호출 차단, 모델별 RPM/TPM 속도 제한.
 main에서 한 번 등록하면 모든 크루 실행에 적용됨.
 """
 
 import threading
 
+from core.ratelimit import get_llm_rate_limiter
+
 # tiktoken은 선택 의존: 없으면 토큰 수 대신 글자 수 근사
 try:
     import tiktoken
@@ -32,7 +34,7 @@ except ImportError:
 
 
 def _before_llm_call(context):
-    """상한 초과 시 LLM 호출 차단. 입력 토큰 추적 + 로깅."""
+    """상한 초과 시 LLM 호출 차단. 모델별 속도 한도까지 대기. 입력 토큰 추적 + 로깅."""
     from usage_tracking import is_over_limit, add_usage
     if is_over_limit():
         return False
@@ -51,17 +53,25 @@ def _before_llm_call(context):
     except Exception:
         pass
 
-    try:
-        add_usage(input_tokens, 0, increment_calls=True)
-    except Exception:
-        pass
-
     agent_role = getattr(getattr(context, "agent", None), "role", "?")
     iteration = getattr(context, "iterations", "?")
     msg_count = len(getattr(context, "messages", None) or [])
     agent_obj = getattr(context, "agent", None)
     model_name = getattr(getattr(agent_obj, "llm", None), "model", "?")
-    print(f"  [LLM 호출] agent={agent_role} [{model_name}], iteration={iteration}, messages={msg_count}, input_tokens≈{input_tokens}")
+
+    # 429 후 재시도보다 미리 속도를 맞추는 편이 싸다. 한도를 넘으면 실패 대신 자리가 날 때까지 기다린다.
+    waited = 0.0
+    limiter = get_llm_rate_limiter()
+    if limiter is not None:
+        waited = limiter.acquire(str(model_name), input_tokens)
+
+    try:
+        add_usage(input_tokens, 0, increment_calls=True)
+    except Exception:
+        pass
+
+    throttled = f", rate_limit_wait={waited:.1f}s" if waited else ""
+    print(f"  [LLM 호출] agent={agent_role} [{model_name}], iteration={iteration}, messages={msg_count}, input_tokens≈{input_tokens}{throttled}")
     return None
 
 
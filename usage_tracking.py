@@ -9,6 +9,7 @@ import os
 import json
 import threading
 from pathlib import Path
+from typing import Callable
 
 # 기본 저장 경로: 프로젝트 루트의 .agent_usage.json
 def _usage_file() -> Path:
@@ -16,6 +17,14 @@ def _usage_file() -> Path:
 
 _lock = threading.Lock()
 _limit_exceeded_notified = False  # 이번 기간 내 상한 초과 알림 1회만
+# CREW_ISOLATION=process 자식은 파일에 직접 쓰지 않고 증분을 부모로 보낸다 (누적/상한 알림은 부모 한 곳에서).
+_forwarder: Callable[[dict], None] | None = None
+
+
+def set_usage_forwarder(forwarder: Callable[[dict], None] | None) -> None:
+    """add_usage 증분을 forwarder(dict)로 넘긴다. None이면 다시 직접 누적한다."""
+    global _forwarder
+    _forwarder = forwarder
 
 
 def _load() -> dict:
@@ -56,6 +65,11 @@ def add_usage(
 ) -> None:
     """토큰 사용량 누적. increment_calls=True이면 calls +1 (기본값)."""
     global _limit_exceeded_notified
+    if _forwarder is not None:
+        _forwarder(
+            {"input_tokens": input_tokens, "output_tokens": output_tokens, "increment_calls": increment_calls}
+        )
+        return
     with _lock:
         data = _load()
         data["input_tokens"] = data.get("input_tokens", 0) + input_tokens
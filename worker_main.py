@@ -3,49 +3,490 @@ worker_main.py
 
 Phase 4 runtime용 워커 엔트리포인트.
 큐에서 task를 소비해 Orchestrator workflow를 실행한다.
+WORKER_PROCESSES가 2 이상이면 supervisor가 자식 워커 프로세스를 띄워 관리한다
+(크래시 재시작, N건/메모리 상한 초과 시 교체, 멈춘 crew 강제 종료, 자식별 상태 보고).
 """
 
 from __future__ import annotations
 
+import json
+import multiprocessing as mp
 import os
+import queue
+import signal
+import sys
+import threading
 import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable
 
+from core.metrics import collect_queue_stats, merge_histogram_snapshots, render_queue_metrics
 from core.orchestrator import ManagerOrchestrator
 from core.queue import create_task_queue
 from core.repository import ArchitectureRepository
-from core.worker import WorkerRuntime
+from core.worker import RetryPolicy, WorkerHeartbeat, WorkerRuntime
 
+_HISTOGRAMS = ("queue_wait_seconds", "execution_seconds")
 
-def main():
-    db_backend = os.getenv("ARCHITECTURE_DB_BACKEND", "sqlite")
-    db_path = os.getenv("ARCHITECTURE_DB_PATH", ".agent_architecture.db")
-    postgres_dsn = os.getenv("ARCHITECTURE_POSTGRES_DSN")
+
+def _start_metrics_server(
+    port: int,
+    render_metrics: Callable[[], str],
+    render_status: Callable[[], Any] | None = None,
+    is_ready: Callable[[], bool] | None = None,
+) -> None:
+    """GET /metrics 로 큐 깊이/대기 시간/실행 시간을 Prometheus 형식으로, /status 로 자식별 상태를 노출한다.
+
+    /ready 는 drain 중이면 503을 돌려 readinessProbe가 즉시 not-ready로 바뀌게 한다.
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            path = self.path.split("?")[0]
+            status_code = 200
+            if path == "/ready":
+                ready = is_ready() if is_ready is not None else True
+                status_code = 200 if ready else 503
+                body = json.dumps({"ready": ready}).encode("utf-8")
+                content_type = "application/json"
+            elif path == "/metrics":
+                body = render_metrics().encode("utf-8")
+                content_type = "text/plain; version=0.0.4"
+            elif path == "/status" and render_status is not None:
+                body = json.dumps(render_status()).encode("utf-8")
+                content_type = "application/json"
+            else:
+                self.send_error(404)
+                return
+            self.send_response(status_code)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("0.0.0.0", port), Handler)
+    threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+
+
+def _build_runtime() -> WorkerRuntime:
+    repo = ArchitectureRepository(
+        db_path=os.getenv("ARCHITECTURE_DB_PATH", ".agent_architecture.db"),
+        backend=os.getenv("ARCHITECTURE_DB_BACKEND", "sqlite"),
+        postgres_dsn=os.getenv("ARCHITECTURE_POSTGRES_DSN"),
+    )
+    retry_policy = RetryPolicy(
+        max_attempts=int(os.getenv("WORKER_RETRY_MAX_ATTEMPTS", "3")),
+        base_delay_seconds=float(os.getenv("WORKER_RETRY_BASE_DELAY_SECONDS", "5")),
+        max_delay_seconds=float(os.getenv("WORKER_RETRY_MAX_DELAY_SECONDS", "300")),
+    )
+    return WorkerRuntime(
+        create_task_queue(project_limits=repo.get_project_concurrency_limits),
+        ManagerOrchestrator(repo),
+        max_deliveries=int(os.getenv("WORKER_MAX_DELIVERIES", "5")),
+        concurrency=int(os.getenv("WORKER_CONCURRENCY", "1")),
+        retry_policy=retry_policy,
+    )
+
+
+def _rss_mb() -> float:
+    """현재 프로세스 RSS(MB). /proc이 없으면 최대 RSS로 대신한다."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS는 bytes, Linux는 KB 단위
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _drain_timeout_seconds() -> float:
+    return float(os.getenv("WORKER_DRAIN_TIMEOUT_SECONDS", "25"))
+
+
+def _build_heartbeat(runtime: WorkerRuntime, slot: int | None = None) -> WorkerHeartbeat:
+    def extra() -> dict[str, Any]:
+        return {"slot": slot, "rss_mb": round(_rss_mb(), 1)}
+
+    return WorkerHeartbeat(
+        runtime,
+        interval_seconds=float(os.getenv("WORKER_HEARTBEAT_INTERVAL_SECONDS", "10")),
+        extra=extra,
+    )
+
+
+def _run_loop(
+    runtime: WorkerRuntime,
+    stop: threading.Event,
+    *,
+    max_tasks: int = 0,
+    max_memory_mb: float = 0.0,
+    report: Callable[[dict[str, Any]], None] | None = None,
+    log_prefix: str = "[worker]",
+    drain_timeout_seconds: float = 25.0,
+    heartbeat: WorkerHeartbeat | None = None,
+) -> str:
+    """dispatch 루프. 멈추면 drain(새 job 중단 + 실행 중 job 완료 대기) 후 종료 사유를 반환한다.
+
+    사유: stopped(신호) | max_tasks(N건 처리) | max_memory(RSS 상한 초과) | drain_timeout
+    drain_timeout이면 남은 job은 큐에 되돌리고 태스크를 PENDING으로 풀어 둔 상태이며, 멈춘 실행 스레드는
+    join할 수 없으므로 호출자가 프로세스를 바로 끝내야 한다 (os._exit).
+    heartbeat를 주면 루프/drain 중 worker registry에 상태를 올리고, 종료 시 기록을 지운다.
+    """
     poll_interval = float(os.getenv("WORKER_POLL_INTERVAL_SECONDS", "0.5"))
     dequeue_timeout = int(os.getenv("WORKER_DEQUEUE_TIMEOUT_SECONDS", "1"))
+    counts = {"dispatched": 0, "processed": 0, "failed": 0}
+    counts_lock = threading.Lock()
 
-    repo = ArchitectureRepository(
-        db_path=db_path,
-        backend=db_backend,
-        postgres_dsn=postgres_dsn,
+    def on_result(result):
+        print(f"{log_prefix} {result.message} task_id={result.task_id} ok={result.ok}")
+        with counts_lock:
+            counts["processed"] += 1
+            counts["failed"] += 0 if result.ok else 1
+
+    def status(state: str, rss_mb: float) -> dict[str, Any]:
+        with counts_lock:
+            snapshot = dict(counts)
+        return {
+            **snapshot,
+            "state": state,
+            "busy": runtime.concurrency - runtime.free_slots(),
+            "concurrency": runtime.concurrency,
+            "rss_mb": round(rss_mb, 1),
+            "oldest_running_seconds": round(runtime.oldest_running_seconds(), 1),
+            "metrics": runtime.metrics(),
+        }
+
+    reason = "stopped"
+    try:
+        # 슬롯이 빌 때마다 그만큼만 가져와 실행한다. 대기 job이 있는 동안은 sleep 없이 바로 다음 dequeue.
+        while not stop.is_set():
+            if max_tasks and counts["dispatched"] >= max_tasks:
+                reason = "max_tasks"
+                break
+            rss_mb = _rss_mb()
+            if max_memory_mb and rss_mb > max_memory_mb:
+                reason = "max_memory"
+                break
+            remaining = max_tasks - counts["dispatched"] if max_tasks else None
+            dispatched = runtime.dispatch(timeout_seconds=dequeue_timeout, on_result=on_result, max_items=remaining)
+            with counts_lock:
+                counts["dispatched"] += dispatched
+            if report is not None:
+                report(status("running", rss_mb))
+            if heartbeat is not None:
+                heartbeat.beat()
+            if not dispatched and runtime.free_slots() > 0:
+                stop.wait(poll_interval)
+    finally:
+        deadline = time.monotonic() + drain_timeout_seconds
+        if heartbeat is not None:
+            heartbeat.beat("draining", force=True)
+        # drain 중에도 상태를 보고해 supervisor가 heartbeat 끊김으로 오인하지 않게 한다.
+        leftovers = runtime.drain(min(0.5, drain_timeout_seconds))
+        while leftovers and time.monotonic() < deadline:
+            if report is not None:
+                report(status("draining", _rss_mb()))
+            if heartbeat is not None:
+                heartbeat.beat("draining")
+            leftovers = runtime.drain(min(0.5, max(0.0, deadline - time.monotonic())))
+        if leftovers:
+            runtime.abandon(leftovers)
+            print(f"{log_prefix} drain timeout: requeued {len(leftovers)} unfinished job(s)")
+            reason = "drain_timeout"
+            runtime.close(wait=False)
+        else:
+            runtime.close()
+        if heartbeat is not None:
+            heartbeat.remove()
+    return reason
+
+
+def _child_main(slot: int, status_queue) -> None:
+    """supervisor가 띄우는 자식 워커. SIGTERM을 받으면 실행 중 job을 마치고 종료한다."""
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    # Ctrl+C는 supervisor가 받아 종료 순서를 정한다.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    pid = os.getpid()
+    last_report = [0.0]
+
+    def report(status: dict[str, Any]) -> None:
+        now = time.monotonic()
+        if now - last_report[0] >= 1.0:
+            last_report[0] = now
+            status_queue.put({**status, "slot": slot, "pid": pid})
+
+    runtime = _build_runtime()
+    reason = _run_loop(
+        runtime,
+        stop,
+        max_tasks=int(os.getenv("WORKER_MAX_TASKS_PER_CHILD", "0")),
+        max_memory_mb=float(os.getenv("WORKER_MAX_MEMORY_MB", "0")),
+        report=report,
+        log_prefix=f"[worker:{slot}]",
+        drain_timeout_seconds=_drain_timeout_seconds(),
+        heartbeat=_build_heartbeat(runtime, slot),
     )
-    orchestrator = ManagerOrchestrator(repo)
-    task_queue = create_task_queue()
-    runtime = WorkerRuntime(task_queue, orchestrator)
+    # 마지막 히스토그램을 함께 보내 supervisor 집계에서 교체 직전 job이 빠지지 않게 한다.
+    status_queue.put({"slot": slot, "pid": pid, "state": "exited", "reason": reason, "metrics": runtime.metrics()})
+    if reason == "drain_timeout":
+        status_queue.close()
+        status_queue.join_thread()
+        sys.stdout.flush()
+        os._exit(0)
+
+
+class WorkerSupervisor:
+    """자식 워커 프로세스 풀 관리자.
+
+    - 크래시(비정상 종료)한 자식은 백오프 후, 교체(정상 종료)된 자식은 바로 새로 띄운다.
+    - 한 job이 task_timeout_seconds를 넘기거나 heartbeat가 끊긴 자식은 SIGKILL 한다.
+      ack되지 않은 job은 큐의 visibility timeout 뒤 다른 자식에게 재전달된다.
+    """
+
+    def __init__(
+        self,
+        processes: int,
+        target: Callable[[int, Any], None] = _child_main,
+        task_timeout_seconds: float = 0.0,
+        heartbeat_timeout_seconds: float = 120.0,
+        shutdown_grace_seconds: float = 60.0,
+    ):
+        self.processes = max(1, int(processes))
+        self.target = target
+        self.task_timeout_seconds = float(task_timeout_seconds)
+        self.heartbeat_timeout_seconds = float(heartbeat_timeout_seconds)
+        self.shutdown_grace_seconds = float(shutdown_grace_seconds)
+        # 스레드(metrics 서버 등)가 도는 부모를 그대로 fork하지 않도록 forkserver/spawn으로 띄운다.
+        method = "forkserver" if "forkserver" in mp.get_all_start_methods() else "spawn"
+        self._ctx = mp.get_context(method)
+        self._status_queue = self._ctx.Queue()
+        self._children: dict[int, dict[str, Any]] = {}
+        # 교체/종료된 자식의 히스토그램 누적 (집계 지표가 줄어들지 않도록)
+        self._retired_metrics: dict[str, dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def _spawn(self, slot: int) -> None:
+        process = self._ctx.Process(target=self.target, args=(slot, self._status_queue), name=f"worker-{slot}")
+        process.start()
+        child = self._children.setdefault(slot, {"restarts": 0, "crashes": 0})
+        child.update(
+            process=process,
+            heartbeat_at=time.monotonic(),
+            next_start_at=0.0,
+            status={"state": "starting"},
+        )
+
+    def _drain_status(self) -> None:
+        while True:
+            try:
+                status = self._status_queue.get_nowait()
+            except queue.Empty:
+                return
+            child = self._children.get(status.get("slot"))
+            process = child.get("process") if child else None
+            # 이미 교체된 이전 자식이 늦게 보낸 상태는 버린다.
+            if process is None or status.get("pid") != process.pid:
+                continue
+            child["status"] = status
+            child["heartbeat_at"] = time.monotonic()
+
+    def _retire_metrics(self, child: dict[str, Any]) -> None:
+        metrics = child.get("status", {}).get("metrics")
+        if not metrics:
+            return
+        for name in _HISTOGRAMS:
+            merged = merge_histogram_snapshots([s for s in (self._retired_metrics.get(name), metrics[name]) if s])
+            if merged is not None:
+                self._retired_metrics[name] = merged
+
+    def _check(self, slot: int, child: dict[str, Any], stopping: bool) -> None:
+        process = child.get("process")
+        now = time.monotonic()
+        if process is not None and process.is_alive():
+            status = child.get("status", {})
+            stuck = bool(self.task_timeout_seconds) and (
+                status.get("oldest_running_seconds", 0) > self.task_timeout_seconds
+            )
+            silent = bool(self.heartbeat_timeout_seconds) and (
+                now - child["heartbeat_at"] > self.heartbeat_timeout_seconds
+            )
+            if not (stuck or silent):
+                return
+            print(f"[supervisor] killing worker-{slot} pid={process.pid} ({'stuck task' if stuck else 'no heartbeat'})")
+            process.kill()
+            process.join(5)
+        if process is not None:
+            # 종료 직전에 보낸 마지막 상태(사유, 히스토그램)를 먼저 반영한다.
+            self._drain_status()
+            self._retire_metrics(child)
+            if process.exitcode:
+                child["crashes"] += 1
+                # 연속 크래시는 1, 2, 4 ... 최대 30초 간격으로 재시작한다.
+                child["next_start_at"] = now + min(30.0, 2.0 ** (child["crashes"] - 1))
+                print(f"[supervisor] worker-{slot} pid={process.pid} exited with {process.exitcode}")
+            else:
+                child["crashes"] = 0
+                reason = child.get("status", {}).get("reason", "stopped")
+                print(f"[supervisor] worker-{slot} pid={process.pid} exited ({reason})")
+            child["process"] = None
+            child["status"] = {"state": "restarting", "last_exitcode": process.exitcode}
+        if not stopping and now >= child.get("next_start_at", 0.0):
+            child["restarts"] += 1
+            self._spawn(slot)
+
+    def status(self) -> list[dict[str, Any]]:
+        """자식별 상태: pid, state, 처리 건수, 실행 중 슬롯, RSS, 재시작/크래시 횟수."""
+        with self._lock:
+            rows = []
+            for slot, child in sorted(self._children.items()):
+                process = child.get("process")
+                rows.append(
+                    {
+                        **{k: v for k, v in child.get("status", {}).items() if k != "metrics"},
+                        "slot": slot,
+                        "pid": process.pid if process is not None else None,
+                        "alive": bool(process is not None and process.is_alive()),
+                        "restarts": child["restarts"],
+                        "crashes": child["crashes"],
+                    }
+                )
+            return rows
+
+    def metrics(self) -> dict[str, Any] | None:
+        """살아 있는 자식과 교체된 자식의 히스토그램 합계 (render_queue_metrics 입력 형식)."""
+        with self._lock:
+            per_child = [c.get("status", {}).get("metrics") for c in self._children.values()]
+            merged = {}
+            for name in _HISTOGRAMS:
+                snapshots = [m[name] for m in per_child if m]
+                if name in self._retired_metrics:
+                    snapshots.append(self._retired_metrics[name])
+                merged[name] = merge_histogram_snapshots(snapshots)
+        return merged if all(merged.values()) else None
+
+    def run(self, stop: threading.Event, status_interval_seconds: float = 30.0) -> None:
+        with self._lock:
+            for slot in range(self.processes):
+                self._spawn(slot)
+        last_print = time.monotonic()
+        while not stop.is_set():
+            with self._lock:
+                self._drain_status()
+                for slot, child in self._children.items():
+                    self._check(slot, child, stopping=False)
+            if status_interval_seconds and time.monotonic() - last_print >= status_interval_seconds:
+                last_print = time.monotonic()
+                for row in self.status():
+                    print(
+                        f"[supervisor] worker-{row['slot']} pid={row['pid']} state={row.get('state')} "
+                        f"processed={row.get('processed', 0)} busy={row.get('busy', 0)}/{row.get('concurrency', '-')} "
+                        f"rss={row.get('rss_mb', '-')}MB restarts={row['restarts']} crashes={row['crashes']}"
+                    )
+            stop.wait(0.5)
+        self.shutdown()
 
+    def shutdown(self) -> None:
+        """자식에게 SIGTERM을 보내 실행 중 job을 마치게 하고, grace 시간이 지나면 SIGKILL 한다."""
+        with self._lock:
+            processes = [c["process"] for c in self._children.values() if c.get("process") is not None]
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+        deadline = time.monotonic() + self.shutdown_grace_seconds
+        for process in processes:
+            process.join(max(0.0, deadline - time.monotonic()))
+            if process.is_alive():
+                process.kill()
+                process.join(5)
+        with self._lock:
+            self._drain_status()
+            for slot, child in self._children.items():
+                self._check(slot, child, stopping=True)
+
+
+def _run_supervisor(processes: int, metrics_port: int) -> None:
+    supervisor = WorkerSupervisor(
+        processes,
+        task_timeout_seconds=float(os.getenv("WORKER_TASK_TIMEOUT_SECONDS", "0")),
+        heartbeat_timeout_seconds=float(os.getenv("WORKER_HEARTBEAT_TIMEOUT_SECONDS", "120")),
+        # 자식 drain 기한 + 여유. 넘기면 SIGKILL
+        shutdown_grace_seconds=float(os.getenv("WORKER_SHUTDOWN_GRACE_SECONDS", str(_drain_timeout_seconds() + 5))),
+    )
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    signal.signal(signal.SIGINT, lambda *_: stop.set())
+    if metrics_port:
+        task_queue = create_task_queue()
+        _start_metrics_server(
+            metrics_port,
+            lambda: render_queue_metrics(collect_queue_stats(task_queue), supervisor.metrics()),
+            supervisor.status,
+            is_ready=lambda: not stop.is_set(),
+        )
     print(
-        "[worker] started",
-        f"db_backend={db_backend}",
+        "[supervisor] started",
+        f"processes={processes}",
         f"queue_backend={os.getenv('ARCHITECTURE_QUEUE_BACKEND', 'local')}",
+        f"concurrency={os.getenv('WORKER_CONCURRENCY', '1')}",
+        f"max_tasks_per_child={os.getenv('WORKER_MAX_TASKS_PER_CHILD', '0')}",
+        f"max_memory_mb={os.getenv('WORKER_MAX_MEMORY_MB', '0')}",
+        f"metrics_port={metrics_port or '-'}",
         sep=" | ",
     )
+    supervisor.run(stop, status_interval_seconds=float(os.getenv("WORKER_STATUS_INTERVAL_SECONDS", "30")))
 
-    while True:
-        result = runtime.run_once(timeout_seconds=dequeue_timeout)
-        if result.task_id:
-            print(f"[worker] {result.message} task_id={result.task_id} ok={result.ok}")
-        time.sleep(poll_interval)
+
+def main():
+    processes = int(os.getenv("WORKER_PROCESSES", "1"))
+    metrics_port = int(os.getenv("WORKER_METRICS_PORT", "0"))
+    queue_backend = (os.getenv("ARCHITECTURE_QUEUE_BACKEND") or "local").lower()
+    if processes > 1 and queue_backend == "local":
+        # local 큐는 프로세스마다 따로라 자식끼리 job을 나눌 수 없다.
+        print("[worker] WORKER_PROCESSES>1 requires a shared queue backend; running a single process")
+        processes = 1
+    if processes > 1:
+        _run_supervisor(processes, metrics_port)
+        return
+
+    runtime = _build_runtime()
+    stop = threading.Event()
+    if metrics_port:
+        _start_metrics_server(
+            metrics_port,
+            lambda: render_queue_metrics(collect_queue_stats(runtime.task_queue), runtime.metrics()),
+            is_ready=lambda: not (stop.is_set() or runtime.draining),
+        )
+    print(
+        "[worker] started",
+        f"db_backend={os.getenv('ARCHITECTURE_DB_BACKEND', 'sqlite')}",
+        f"queue_backend={queue_backend}",
+        f"concurrency={runtime.concurrency}",
+        f"metrics_port={metrics_port or '-'}",
+        sep=" | ",
+    )
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    signal.signal(signal.SIGINT, lambda *_: stop.set())
+    reason = _run_loop(
+        runtime,
+        stop,
+        drain_timeout_seconds=_drain_timeout_seconds(),
+        heartbeat=_build_heartbeat(runtime),
+    )
+    print(f"[worker] exited ({reason})")
+    if reason == "drain_timeout":
+        sys.stdout.flush()
+        os._exit(0)
 
 
 if __name__ == "__main__":
     main()
-